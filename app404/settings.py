@@ -1,6 +1,10 @@
 from pathlib import Path
+import atexit
 import environ
 import os
+import shutil
+import sys
+import tempfile
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -8,6 +12,8 @@ env = environ.Env(
     DEBUG=(bool, True),
     JWT_ACCESS_TTL_SECONDS=(int, 15 * 60),
     JWT_REFRESH_TTL_SECONDS=(int, 7 * 24 * 60 * 60),
+    JWT_USER_CACHE_TTL_SECONDS=(int, 60),
+    JWT_USER_CACHE_MAX_SIZE=(int, 10_000),
 )
 environ.Env.read_env(BASE_DIR / ".env")
 
@@ -38,6 +44,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     "corsheaders.middleware.CorsMiddleware",
+    "core.middleware.ForwardAuthMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "whitenoise.middleware.WhiteNoiseMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
@@ -84,6 +91,26 @@ for t in TEAM_APPS:
 
 DATABASE_ROUTERS = ["core.db_router.TeamPerAppRouter"]
 
+# Shared by every worker on the host, so team1 quiz queues and game sessions survive
+# requests landing on different workers (see core.cache_backends).
+CACHE_SQLITE_PATH = env("CACHE_SQLITE_PATH", default=str(BASE_DIR / "cache.sqlite3"))
+if sys.argv[1:2] == ["test"]:
+    # Test runs get a throwaway file, so they never read or leave keys in the real cache.
+    # Registered before team1's exit-time session flush, so it is removed after it.
+    _test_cache_dir = tempfile.mkdtemp(prefix="app404-test-cache-")
+    atexit.register(shutil.rmtree, _test_cache_dir, ignore_errors=True)
+    CACHE_SQLITE_PATH = os.path.join(_test_cache_dir, "cache.sqlite3")
+CACHES = {
+    "default": {
+        "BACKEND": "core.cache_backends.SQLiteCache",
+        "LOCATION": CACHE_SQLITE_PATH,
+        "OPTIONS": {
+            "MAX_ENTRIES": env.int("CACHE_MAX_ENTRIES", default=100_000),
+            "L1_MAX_ENTRIES": env.int("CACHE_L1_MAX_ENTRIES", default=1000),
+        },
+    }
+}
+
 
 AUTH_PASSWORD_VALIDATORS = [
     {"NAME": "django.contrib.auth.password_validation.UserAttributeSimilarityValidator"},
@@ -113,10 +140,53 @@ SECURE_PROXY_SSL_HEADER = ("HTTP_X_FORWARDED_PROTO", "http")
 AUTH_USER_MODEL = "core.User"
 
 JWT_SECRET = env("JWT_SECRET", default=SECRET_KEY)
-JWT_ALGORITHM = "HS256"
+JWT_ALGORITHM = env("JWT_ALGORITHM", default="HS256")
+
+# Asymmetric signing (RS256 / EdDSA): PEM private key used to sign new tokens, plus
+# PEM public keys of retired signing keys that are still accepted during rotation.
+# Public keys are served at /api/auth/jwks/ for core.jwt_verifier.
+JWT_PRIVATE_KEY_FILE = env("JWT_PRIVATE_KEY_FILE", default="")
+JWT_VERIFY_KEY_FILES = env.list("JWT_VERIFY_KEY_FILES", default=[])
 JWT_ACCESS_TTL_SECONDS = env("JWT_ACCESS_TTL_SECONDS")
 JWT_REFRESH_TTL_SECONDS = env("JWT_REFRESH_TTL_SECONDS")
 
+# Process-local cache of authenticated users (see core.user_cache).
+# A deactivated user stops authenticating on other workers within this TTL.
+JWT_USER_CACHE_TTL_SECONDS = env("JWT_USER_CACHE_TTL_SECONDS")
+JWT_USER_CACHE_MAX_SIZE = env("JWT_USER_CACHE_MAX_SIZE")
+
+# Where logouts are published so every worker rejects revoked tokens (see core.revocation).
+# core.revocation.LocalRevocationStore keeps them in-process (tests / single worker).
+JWT_REVOCATION_STORE = env("JWT_REVOCATION_STORE", default="core.revocation.DatabaseRevocationStore")
+JWT_REVOCATION_POLL_SECONDS = env.int("JWT_REVOCATION_POLL_SECONDS", default=2)
+
+# Max verified token payloads kept in the per-process decode cache (0 disables it).
+JWT_DECODE_CACHE_SIZE = env.int("JWT_DECODE_CACHE_SIZE", default=10_000)
+
+# DRF views authenticate from the JWT middleware's per-request AuthContext (core.auth.JWTAuthentication),
+# so the token is decoded once per request; session/basic auth stay as fallbacks.
+REST_FRAMEWORK = {
+    "DEFAULT_AUTHENTICATION_CLASSES": [
+        "core.auth.JWTAuthentication",
+        "rest_framework.authentication.SessionAuthentication",
+        "rest_framework.authentication.BasicAuthentication",
+    ],
+}
+
+# Report per-request auth step timings (token decode, user lookup) in a Server-Timing header.
+AUTH_SERVER_TIMING = env.bool("AUTH_SERVER_TIMING", default=DEBUG)
+
+# Batch user lookups (core.user_lookup, /api/users/batch/).
+USER_LOOKUP_MAX_IDS = env.int("USER_LOOKUP_MAX_IDS", default=200)
+USER_LOOKUP_CACHE_TTL_SECONDS = env.int("USER_LOOKUP_CACHE_TTL_SECONDS", default=30)
+
+# Apply user outbox events (core.outbox) from a background thread right after commit.
+# Disable when `manage.py dispatch_user_outbox --loop` runs as a separate process.
+USER_OUTBOX_BACKGROUND_DISPATCH = env.bool("USER_OUTBOX_BACKGROUND_DISPATCH", default=True)
+
+# Upper bound for how long gateways may cache a /api/auth/verify/ answer.
+JWT_FORWARD_AUTH_CACHE_SECONDS = env.int("JWT_FORWARD_AUTH_CACHE_SECONDS", default=5)
+
 JWT_COOKIE_SECURE = env.bool("JWT_COOKIE_SECURE", default=False)
 JWT_COOKIE_SAMESITE = env("JWT_COOKIE_SAMESITE", default="Lax")
 
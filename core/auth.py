@@ -1,5 +1,9 @@
 from functools import wraps
 from django.http import JsonResponse
+from rest_framework.authentication import BaseAuthentication, SessionAuthentication
+
+from core.auth_context import get_auth_context
+
 
 def api_login_required(view_func):
     @wraps(view_func)
@@ -8,3 +12,26 @@ def api_login_required(view_func):
             return JsonResponse({"detail": "Authentication required"}, status=401)
         return view_func(request, *args, **kwargs)
     return _wrapped
+
+
+class JWTAuthentication(BaseAuthentication):
+    """
+    DRF authentication backed by the request's shared AuthContext.
+
+    Reuses whatever the JWT middleware already resolved instead of decoding the token again.
+    Registered first in REST_FRAMEWORK["DEFAULT_AUTHENTICATION_CLASSES"]. A token sent as
+    the access_token cookie goes with cross-site requests too, so those are CSRF-checked
+    like SessionAuthentication; Authorization headers are not.
+    """
+
+    def authenticate(self, request):
+        context = get_auth_context(request)
+        user = context.resolve()
+        if user is None:
+            return None
+        if request.COOKIES.get("access_token"):
+            SessionAuthentication().enforce_csrf(request)
+        return user, context.payload
+
+    def authenticate_header(self, request):
+        return "Bearer"
@@ -0,0 +1,79 @@
+import time
+
+from jwt import ExpiredSignatureError, InvalidTokenError
+
+from core.jwt_utils import decode_token
+from core.user_cache import get_active_user
+
+
+def get_request_token(request):
+    token = request.COOKIES.get("access_token")
+    if not token:
+        auth = request.headers.get("Authorization", "")
+        if auth.startswith("Bearer "):
+            token = auth.split(" ", 1)[1].strip()
+    return token or None
+
+
+class AuthContext:
+    """
+    Token authentication state for one request.
+
+    The JWT middleware, core.auth.JWTAuthentication (DRF) and team helpers all go through
+    the same instance, so a request decodes its token and looks up its user at most once.
+    `timings` holds the seconds spent in each step that actually ran.
+    """
+
+    def __init__(self, request):
+        self._request = request
+        self.evaluated = False
+        self.payload = None
+        self.user = None
+        self.timings = {}
+
+    def resolve(self):
+        """
+        Return the active user for the request's access token, or None.
+        """
+        if self.evaluated:
+            return self.user
+        self.evaluated = True
+
+        token = get_request_token(self._request)
+        if not token:
+            return None
+
+        try:
+            started = time.perf_counter()
+            payload = decode_token(token)
+            self.timings["decode"] = time.perf_counter() - started
+        except (ExpiredSignatureError, InvalidTokenError):
+            return None
+        if payload.get("type") != "access":
+            return None
+
+        started = time.perf_counter()
+        user = get_active_user(payload.get("sub"), payload.get("tv"))
+        self.timings["user_lookup"] = time.perf_counter() - started
+        if not user:
+            return None
+
+        self.payload = payload
+        self.user = user
+        # Kept for views that read the claims directly.
+        self._request.jwt_payload = payload
+        return user
+
+
+def get_auth_context(request) -> AuthContext:
+    # DRF wraps the Django request; the context always lives on the underlying one.
+    request = getattr(request, "_request", request)
+    context = getattr(request, "auth_context", None)
+    if context is None:
+        context = AuthContext(request)
+        request.auth_context = context
+    return context
+
+
+def authenticate_token(request):
+    return get_auth_context(request).resolve()
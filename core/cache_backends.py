@@ -0,0 +1,257 @@
+"""
+SQLite-backed Django cache shared by every worker process on the host.
+
+The default LocMem cache is per process, so state kept in it (team1's quiz queues and
+game sessions) vanishes whenever the next request lands on another worker. This backend
+keeps entries in one SQLite file (WAL mode, so readers do not block the writer) and
+needs no external service.
+
+`add`, `incr`/`decr`, `cas` and `delete_if` are atomic across processes (single statements or
+IMMEDIATE transactions). Integers are stored as SQL integers so `incr` never has to
+unpickle. A small in-process L1 keeps recently read pickles keyed by the row's revision
+(a random number replaced on every write): a hit still checks the revision, but skips
+reading and copying the blob.
+
+    CACHES = {"default": {
+        "BACKEND": "core.cache_backends.SQLiteCache",
+        "LOCATION": "/var/lib/app/cache.sqlite3",
+        "OPTIONS": {"MAX_ENTRIES": 100_000, "L1_MAX_ENTRIES": 2_000},
+    }}
+"""
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS cache_entries (
+    key TEXT PRIMARY KEY,
+    value BLOB,
+    expires REAL,
+    rev INTEGER NOT NULL
+)
+"""
+_LIVE = "(expires IS NULL OR expires > ?)"
+
+
+class SQLiteCache(BaseCache):
+    def __init__(self, location, params):
+        super().__init__(params)
+        options = params.get("OPTIONS", {})
+        self._path = location
+        self._busy_timeout = options.get("BUSY_TIMEOUT", 5.0)
+        self._l1_max = options.get("L1_MAX_ENTRIES", 1000)
+        self._l1 = OrderedDict()
+        self._l1_lock = threading.Lock()
+        self._local = threading.local()
+        self._writes = 0
+
+    # -- connection ----------------------------------------------------------------
+
+    def _conn(self):
+        # One connection per thread, reopened after a fork (gunicorn --preload).
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self._path, timeout=self._busy_timeout, isolation_level=None,
+                                   check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(_SCHEMA)
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def _immediate(self):
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        return conn
+
+    # -- encoding ------------------------------------------------------------------
+
+    @staticmethod
+    def _encode(value):
+        if type(value) is int:
+            return value
+        return pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+
+    @staticmethod
+    def _decode(raw):
+        return raw if isinstance(raw, int) else pickle.loads(raw)
+
+    def _expiry(self, timeout):
+        return self.get_backend_timeout(timeout)
+
+    def _l1_put(self, key, rev, raw):
+        if self._l1_max <= 0 or isinstance(raw, int):
+            return
+        with self._l1_lock:
+            self._l1[key] = (rev, raw)
+            self._l1.move_to_end(key)
+            while len(self._l1) > self._l1_max:
+                self._l1.popitem(last=False)
+
+    def _l1_drop(self, key):
+        with self._l1_lock:
+            self._l1.pop(key, None)
+
+    # -- BaseCache API -------------------------------------------------------------
+
+    def get(self, key, default=None, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        with self._l1_lock:
+            cached = self._l1.get(key)
+        known_rev = cached[0] if cached else None
+        row = self._conn().execute(
+            f"SELECT rev, CASE WHEN rev = ? THEN NULL ELSE value END FROM cache_entries WHERE key = ? AND {_LIVE}",
+            (known_rev, key, time.time()),
+        ).fetchone()
+        if row is None:
+            if cached:
+                self._l1_drop(key)
+            return default
+        rev, raw = row
+        if rev == known_rev:
+            raw = cached[1]
+        else:
+            self._l1_put(key, rev, raw)
+        return self._decode(raw)
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        self._conn().execute(
+            "INSERT INTO cache_entries (key, value, expires, rev) VALUES (?, ?, ?, random()) "
+            "ON CONFLICT(key) DO UPDATE SET value = excluded.value, expires = excluded.expires, rev = random()",
+            (key, self._encode(value), self._expiry(timeout)),
+        )
+        self._after_write()
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        """Store only if the key is missing or expired; True if stored (atomic across workers)."""
+        key = self.make_and_validate_key(key, version=version)
+        conn = self._conn()
+        cursor = conn.execute(
+            "INSERT INTO cache_entries (key, value, expires, rev) VALUES (?, ?, ?, random()) "
+            "ON CONFLICT(key) DO UPDATE SET value = excluded.value, expires = excluded.expires, rev = random() "
+            "WHERE cache_entries.expires IS NOT NULL AND cache_entries.expires <= ?",
+            (key, self._encode(value), self._expiry(timeout), time.time()),
+        )
+        self._after_write()
+        return cursor.rowcount == 1
+
+    def cas(self, key, expected, value, timeout=DEFAULT_TIMEOUT, version=None):
+        """
+        Compare-and-set: replace the value only if it currently equals `expected`
+        (None: only if the key is missing). True if replaced.
+        """
+        key = self.make_and_validate_key(key, version=version)
+        conn = self._immediate()
+        try:
+            row = conn.execute(
+                f"SELECT value FROM cache_entries WHERE key = ? AND {_LIVE}", (key, time.time())
+            ).fetchone()
+            current = self._decode(row[0]) if row else None
+            if current != expected:
+                conn.execute("ROLLBACK")
+                return False
+            conn.execute(
+                "INSERT INTO cache_entries (key, value, expires, rev) VALUES (?, ?, ?, random()) "
+                "ON CONFLICT(key) DO UPDATE SET value = excluded.value, expires = excluded.expires, rev = random()",
+                (key, self._encode(value), self._expiry(timeout)),
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+        self._after_write()
+        return True
+
+    def delete_if(self, key, expected, version=None):
+        """Delete the key only if its live value equals `expected` (e.g. a lock owner's token). True if deleted."""
+        key = self.make_and_validate_key(key, version=version)
+        self._l1_drop(key)
+        conn = self._immediate()
+        try:
+            row = conn.execute(
+                f"SELECT value FROM cache_entries WHERE key = ? AND {_LIVE}", (key, time.time())
+            ).fetchone()
+            if row is None or self._decode(row[0]) != expected:
+                conn.execute("ROLLBACK")
+                return False
+            conn.execute("DELETE FROM cache_entries WHERE key = ?", (key,))
+            conn.execute("COMMIT")
+        except BaseException:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+        return True
+
+    def incr(self, key, delta=1, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        conn = self._immediate()
+        try:
+            cursor = conn.execute(
+                f"UPDATE cache_entries SET value = value + ?, rev = random() "
+                f"WHERE key = ? AND {_LIVE} AND typeof(value) = 'integer'",
+                (delta, key, time.time()),
+            )
+            if cursor.rowcount != 1:
+                conn.execute("ROLLBACK")
+                raise ValueError("Key '%s' not found" % key)
+            row = conn.execute("SELECT value FROM cache_entries WHERE key = ?", (key,)).fetchone()
+            conn.execute("COMMIT")
+        except BaseException:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+        return row[0]
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        cursor = self._conn().execute(
+            f"UPDATE cache_entries SET expires = ? WHERE key = ? AND {_LIVE}",
+            (self._expiry(timeout), key, time.time()),
+        )
+        return cursor.rowcount == 1
+
+    def delete(self, key, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        self._l1_drop(key)
+        cursor = self._conn().execute("DELETE FROM cache_entries WHERE key = ?", (key,))
+        return cursor.rowcount == 1
+
+    def has_key(self, key, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        return self._conn().execute(
+            f"SELECT 1 FROM cache_entries WHERE key = ? AND {_LIVE}", (key, time.time())
+        ).fetchone() is not None
+
+    def clear(self):
+        with self._l1_lock:
+            self._l1.clear()
+        self._conn().execute("DELETE FROM cache_entries")
+
+    def close(self, **kwargs):
+        # Keep the per-thread connection open across requests; SQLite connections are cheap to hold.
+        pass
+
+    # -- culling -------------------------------------------------------------------
+
+    def _after_write(self):
+        self._writes += 1
+        if self._writes % 1000:
+            return
+        conn = self._conn()
+        conn.execute("DELETE FROM cache_entries WHERE expires IS NOT NULL AND expires <= ?", (time.time(),))
+        count = conn.execute("SELECT COUNT(*) FROM cache_entries").fetchone()[0]
+        if count > self._max_entries:
+            # Same policy as Django's database cache: drop 1/CULL_FREQUENCY, soonest to expire first.
+            conn.execute(
+                "DELETE FROM cache_entries WHERE key IN ("
+                "SELECT key FROM cache_entries ORDER BY expires IS NULL, expires LIMIT ?)",
+                (count // self._cull_frequency if self._cull_frequency else count,),
+            )
@@ -0,0 +1,101 @@
+import base64
+import hashlib
+import json
+import threading
+
+from django.conf import settings
+from jwt import InvalidTokenError, get_algorithm_by_name
+
+SYMMETRIC_ALGORITHMS = {"HS256", "HS384", "HS512"}
+
+# Members that identify a public key in an RFC 7638 thumbprint, per key type.
+_THUMBPRINT_MEMBERS = {
+    "RSA": ("e", "kty", "n"),
+    "EC": ("crv", "kty", "x", "y"),
+    "OKP": ("crv", "kty", "x"),
+}
+
+
+def is_asymmetric(algorithm=None) -> bool:
+    return (algorithm or settings.JWT_ALGORITHM) not in SYMMETRIC_ALGORITHMS
+
+
+def _read(path) -> bytes:
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def _thumbprint(jwk: dict) -> str:
+    members = {k: jwk[k] for k in _THUMBPRINT_MEMBERS[jwk["kty"]]}
+    digest = hashlib.sha256(json.dumps(members, sort_keys=True, separators=(",", ":")).encode()).digest()
+    return base64.urlsafe_b64encode(digest).rstrip(b"=").decode()
+
+
+class KeySet:
+    """
+    Signing key plus every public key still accepted for verification.
+
+    Key ids are RFC 7638 thumbprints, so rotating is just: deploy the new private key,
+    keep the old key's public half in JWT_VERIFY_KEY_FILES until its tokens expire.
+    """
+
+    def __init__(self, algorithm, private_pem, public_pems=()):
+        self.algorithm = algorithm
+        self._alg = get_algorithm_by_name(algorithm)
+
+        self.signing_key = self._alg.prepare_key(private_pem)
+        public_keys = [self.signing_key.public_key()] + [self._alg.prepare_key(pem) for pem in public_pems]
+
+        self.public_keys = {}
+        self._jwks = []
+        for key in public_keys:
+            jwk = self._alg.to_jwk(key, as_dict=True)
+            kid = _thumbprint(jwk)
+            if kid in self.public_keys:
+                continue
+            self.public_keys[kid] = key
+            self._jwks.append({**jwk, "kid": kid, "use": "sig", "alg": algorithm})
+        self.signing_kid = self._jwks[0]["kid"]
+
+    def verification_key(self, kid):
+        key = self.public_keys.get(kid)
+        if key is None:
+            raise InvalidTokenError("Unknown signing key")
+        return key
+
+    def jwks(self) -> dict:
+        return {"keys": list(self._jwks)}
+
+
+_lock = threading.Lock()
+_cached = {}
+
+
+def get_keyset() -> KeySet:
+    """
+    KeySet for the configured asymmetric algorithm, loaded once per settings combination.
+    """
+    config = (
+        settings.JWT_ALGORITHM,
+        settings.JWT_PRIVATE_KEY_FILE,
+        tuple(settings.JWT_VERIFY_KEY_FILES),
+    )
+    keyset = _cached.get(config)
+    if keyset is None:
+        with _lock:
+            keyset = _cached.get(config)
+            if keyset is None:
+                algorithm, private_path, public_paths = config
+                if not private_path:
+                    raise RuntimeError(f"JWT_PRIVATE_KEY_FILE is required for {algorithm}")
+                keyset = KeySet(algorithm, _read(private_path), [_read(p) for p in public_paths])
+                _cached.clear()
+                _cached[config] = keyset
+    return keyset
+
+
+def public_jwks() -> dict:
+    if not is_asymmetric():
+        # Never publish a shared HMAC secret.
+        return {"keys": []}
+    return get_keyset().jwks()
@@ -2,11 +2,26 @@ import time
 import jwt
 from django.conf import settings
 
+from core.jwt_keys import get_keyset, is_asymmetric
+from core.token_cache import token_cache
+
 
 def _now() -> int:
     return int(time.time())
 
 
+def _encode(payload: dict) -> str:
+    if is_asymmetric():
+        keyset = get_keyset()
+        return jwt.encode(
+            payload,
+            keyset.signing_key,
+            algorithm=settings.JWT_ALGORITHM,
+            headers={"kid": keyset.signing_kid},
+        )
+    return jwt.encode(payload, settings.JWT_SECRET, algorithm=settings.JWT_ALGORITHM)
+
+
 def create_access_token(user) -> str:
     payload = {
         "type": "access",
@@ -16,7 +31,7 @@ def create_access_token(user) -> str:
         "iat": _now(),
         "exp": _now() + settings.JWT_ACCESS_TTL_SECONDS,
     }
-    return jwt.encode(payload, settings.JWT_SECRET, algorithm=settings.JWT_ALGORITHM)
+    return _encode(payload)
 
 
 def create_refresh_token(user) -> str:
@@ -27,8 +42,20 @@ def create_refresh_token(user) -> str:
         "iat": _now(),
         "exp": _now() + settings.JWT_REFRESH_TTL_SECONDS,
     }
-    return jwt.encode(payload, settings.JWT_SECRET, algorithm=settings.JWT_ALGORITHM)
+    return _encode(payload)
 
 
-def decode_token(token: str) -> dict:
+def _verify(token: str) -> dict:
+    if is_asymmetric():
+        kid = jwt.get_unverified_header(token).get("kid")
+        key = get_keyset().verification_key(kid)
+        return jwt.decode(token, key, algorithms=[settings.JWT_ALGORITHM])
     return jwt.decode(token, settings.JWT_SECRET, algorithms=[settings.JWT_ALGORITHM])
+
+
+def decode_token(token: str) -> dict:
+    payload = token_cache.get(token)
+    if payload is None:
+        payload = _verify(token)
+        token_cache.set(token, payload)
+    return payload
@@ -0,0 +1,86 @@
+"""
+Local access-token verification for team services.
+
+Only needs PyJWT (with the crypto extra) and the standard library, so a team backend
+running outside the core process can use it as well:
+
+    verifier = TokenVerifier(jwks_url="http://core:8000/api/auth/jwks/")
+    claims = verifier.verify(request.COOKIES["access_token"])
+
+Keys are fetched once and cached; a token signed with an unknown key id triggers at
+most one refetch per `min_refresh_interval`, so steady-state verification does no
+network or DB access. Note that this checks the signature and expiry only: a token
+revoked by logout stays valid here until it expires (at most JWT_ACCESS_TTL_SECONDS).
+"""
+import json
+import threading
+import time
+import urllib.request
+
+import jwt
+from jwt import InvalidTokenError
+
+
+class TokenVerifier:
+    def __init__(self, jwks_url=None, jwks=None, algorithms=("RS256", "EdDSA"),
+                 cache_ttl=300, min_refresh_interval=30, timeout=2.0, leeway=0):
+        if jwks_url is None and jwks is None:
+            raise ValueError("jwks_url or jwks is required")
+        self.jwks_url = jwks_url
+        self.algorithms = list(algorithms)
+        self.cache_ttl = cache_ttl
+        self.min_refresh_interval = min_refresh_interval
+        self.timeout = timeout
+        self.leeway = leeway
+
+        self._keys = {}
+        self._fetched_at = 0.0
+        self._lock = threading.Lock()
+        if jwks is not None:
+            self._load(jwks)
+
+    def _load(self, jwks):
+        keys = {}
+        for jwk in jwks.get("keys", []):
+            if jwk.get("alg") not in self.algorithms or not jwk.get("kid"):
+                continue
+            keys[jwk["kid"]] = jwt.PyJWK(jwk).key
+        self._keys = keys
+        self._fetched_at = time.monotonic()
+
+    def _fetch(self):
+        with urllib.request.urlopen(self.jwks_url, timeout=self.timeout) as resp:
+            return json.loads(resp.read().decode("utf-8"))
+
+    def _refresh(self, force=False):
+        if self.jwks_url is None:
+            return
+        with self._lock:
+            age = time.monotonic() - self._fetched_at
+            if age < self.min_refresh_interval or (not force and age < self.cache_ttl):
+                return
+            try:
+                self._load(self._fetch())
+            except (OSError, ValueError):
+                # Keep serving the keys we have; retry after min_refresh_interval.
+                self._fetched_at = time.monotonic() - self.cache_ttl + self.min_refresh_interval
+
+    def _key_for(self, kid):
+        self._refresh()
+        key = self._keys.get(kid)
+        if key is None:
+            self._refresh(force=True)
+            key = self._keys.get(kid)
+        if key is None:
+            raise InvalidTokenError("Unknown signing key")
+        return key
+
+    def verify(self, token, expected_type="access") -> dict:
+        """
+        Return the token's claims, or raise jwt.InvalidTokenError.
+        """
+        kid = jwt.get_unverified_header(token).get("kid")
+        payload = jwt.decode(token, self._key_for(kid), algorithms=self.algorithms, leeway=self.leeway)
+        if expected_type is not None and payload.get("type") != expected_type:
+            raise InvalidTokenError("Unexpected token type")
+        return payload
@@ -0,0 +1,54 @@
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client, override_settings
+
+from core.jwt_utils import create_access_token
+
+User = get_user_model()
+
+VERIFY_PATH = "/api/auth/verify/"
+
+
+class Command(BaseCommand):
+    help = "Measure /api/auth/verify/ requests/sec through the full middleware stack vs ForwardAuthMiddleware"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--email", required=True, help="Existing active user to mint the access token for")
+        parser.add_argument("--requests", type=int, default=5000)
+        parser.add_argument("--host", default="localhost", help="Host header (must be in ALLOWED_HOSTS)")
+
+    def _run(self, middleware, token, n, host):
+        with override_settings(MIDDLEWARE=middleware):
+            client = Client(HTTP_HOST=host)
+            client.cookies["access_token"] = token
+
+            # Warm up the handler, the key set and the user cache.
+            res = client.get(VERIFY_PATH)
+            if res.status_code != 200:
+                raise CommandError(f"verify returned {res.status_code}")
+
+            start = time.perf_counter()
+            for _ in range(n):
+                client.get(VERIFY_PATH)
+            elapsed = time.perf_counter() - start
+        return n / elapsed
+
+    def handle(self, *args, **options):
+        user = User.objects.filter(email=options["email"].strip().lower(), is_active=True).first()
+        if not user:
+            raise CommandError("User not found or inactive.")
+
+        token = create_access_token(user)
+        n = options["requests"]
+        fast = list(settings.MIDDLEWARE)
+        full = [m for m in fast if m != "core.middleware.ForwardAuthMiddleware"]
+
+        before = self._run(full, token, n, options["host"])
+        after = self._run(fast, token, n, options["host"])
+
+        self.stdout.write(f"full middleware stack: {before:,.0f} req/s")
+        self.stdout.write(f"ForwardAuthMiddleware: {after:,.0f} req/s")
+        self.stdout.write(self.style.SUCCESS(f"speedup: {after / before:.2f}x"))
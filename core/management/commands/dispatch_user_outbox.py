@@ -0,0 +1,34 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.outbox import dispatch_pending, replay_users
+
+
+class Command(BaseCommand):
+    help = "Apply pending user events to team databases (core.outbox)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500)
+        parser.add_argument("--loop", action="store_true", help="Keep polling the outbox")
+        parser.add_argument("--interval", type=float, default=2.0, help="Seconds between polls with --loop")
+        parser.add_argument(
+            "--replay",
+            action="store_true",
+            help="Backfill: send every existing user to the handlers before dispatching",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+
+        if options["replay"]:
+            replayed = replay_users(batch_size=batch_size)
+            self.stdout.write(self.style.SUCCESS(f"Replayed {replayed} users."))
+
+        while True:
+            applied = dispatch_pending(batch_size=batch_size)
+            if applied:
+                self.stdout.write(f"Applied {applied} events.")
+            if not options["loop"]:
+                break
+            time.sleep(options["interval"])
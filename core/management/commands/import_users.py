@@ -0,0 +1,135 @@
+import csv
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.core.validators import validate_email
+from django.db import transaction
+
+from core.models import UserOutboxEvent
+from core.outbox import dispatch_pending
+
+User = get_user_model()
+
+
+def _init_worker():
+    # Needed when the pool uses "spawn"; a no-op for forked workers.
+    import django
+    django.setup()
+
+
+def _hash_passwords(passwords):
+    return [make_password(p or None) for p in passwords]
+
+
+def _read_rows(path, fmt):
+    with open(path, newline="", encoding="utf-8") as f:
+        if fmt == "csv":
+            for line_no, row in enumerate(csv.DictReader(f), start=2):
+                yield line_no, row
+        else:
+            for line_no, line in enumerate(f, start=1):
+                if line.strip():
+                    yield line_no, line
+
+
+class Command(BaseCommand):
+    help = (
+        "Bulk-create users from CSV or JSONL (email, password, first_name, last_name, age). "
+        "Existing emails are skipped, so re-running after a failure resumes the import."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path")
+        parser.add_argument("--format", choices=["csv", "jsonl"], help="Defaults to the file extension")
+        parser.add_argument("--batch-size", type=int, default=500)
+        parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Password hashing processes")
+
+    def _parse(self, row):
+        if isinstance(row, str):
+            row = json.loads(row)
+        email = (row.get("email") or "").strip().lower()
+        validate_email(email)
+        age = row.get("age")
+        age = int(age) if age not in (None, "") else None
+        return {
+            "email": email,
+            "password": row.get("password") or "",
+            "first_name": (row.get("first_name") or "").strip(),
+            "last_name": (row.get("last_name") or "").strip(),
+            "age": age,
+        }
+
+    def _write_batch(self, pool, batch, workers):
+        existing = set(User.objects.filter(email__in=[r["email"] for r in batch]).values_list("email", flat=True))
+        batch = [r for r in batch if r["email"] not in existing]
+        if not batch:
+            return 0, len(existing)
+
+        passwords = [r.pop("password") for r in batch]
+        chunk = max(1, -(-len(passwords) // workers))
+        parts = [passwords[i:i + chunk] for i in range(0, len(passwords), chunk)]
+        hashes = [h for part in pool.map(_hash_passwords, parts) for h in part]
+
+        users = [User(password=h, **r) for r, h in zip(batch, hashes)]
+        with transaction.atomic():
+            User.objects.bulk_create(users)
+            # bulk_create sends no post_save, so queue the team provisioning events here.
+            UserOutboxEvent.objects.bulk_create([
+                UserOutboxEvent(user_id=u.id, event=UserOutboxEvent.CREATED, email=u.email) for u in users
+            ])
+        return len(users), len(existing)
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        fmt = options["format"] or ("jsonl" if path.endswith((".jsonl", ".ndjson")) else "csv")
+        batch_size = options["batch_size"]
+        workers = max(1, options["workers"])
+        if not os.path.exists(path):
+            raise CommandError(f"{path} does not exist.")
+
+        created = skipped = invalid = 0
+        seen = set()
+        batch = []
+        started = time.perf_counter()
+
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+            def flush():
+                nonlocal created, skipped
+                n_created, n_skipped = self._write_batch(pool, batch, workers)
+                created += n_created
+                skipped += n_skipped
+                batch.clear()
+                rate = created / (time.perf_counter() - started)
+                self.stdout.write(f"created {created}, skipped {skipped}, invalid {invalid} ({rate:,.0f} users/s)")
+
+            for line_no, row in _read_rows(path, fmt):
+                try:
+                    parsed = self._parse(row)
+                except (ValidationError, ValueError, TypeError, AttributeError):
+                    invalid += 1
+                    self.stderr.write(f"line {line_no}: invalid row, skipped")
+                    continue
+                if parsed["email"] in seen:
+                    skipped += 1
+                    continue
+                seen.add(parsed["email"])
+                batch.append(parsed)
+                if len(batch) >= batch_size:
+                    flush()
+            if batch:
+                flush()
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {created} users in {elapsed:.1f}s ({created / elapsed if elapsed else 0:,.0f} users/s); "
+            f"{skipped} already existed, {invalid} invalid."
+        ))
+
+        applied = dispatch_pending()
+        self.stdout.write(f"Applied {applied} user events to team databases.")
@@ -1,45 +1,61 @@
-from django.contrib.auth import get_user_model
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
 from django.utils.deprecation import MiddlewareMixin
-from jwt import ExpiredSignatureError, InvalidTokenError
+from django.utils.functional import SimpleLazyObject
 
-from core.jwt_utils import decode_token
-
-User = get_user_model()
+from core.auth_context import authenticate_token, get_auth_context
+from core.views import verify
 
 
 class JWTAuthenticationMiddleware(MiddlewareMixin):
     """
     If a valid access_token cookie (or Authorization header) exists, set request.user accordingly.
+
+    request.user is lazy: the token is only decoded and the user resolved on first access,
+    so routes that never look at the user (health checks, public pages) skip JWT verification
+    and the user lookup. request.auth_evaluated tells whether that happened for this request.
     """
 
     def process_request(self, request):
-        if hasattr(request, "user") and getattr(request.user, "is_authenticated", False):
-            return
-
-        token = request.COOKIES.get("access_token")
-        if not token:
-            auth = request.headers.get("Authorization", "")
-            if auth.startswith("Bearer "):
-                token = auth.split(" ", 1)[1].strip()
-
-        if not token:
-            return
-
-        try:
-            payload = decode_token(token)
-            if payload.get("type") != "access":
-                return
-
-            user_id = payload.get("sub")
-            tv = payload.get("tv")
-            user = User.objects.filter(id=user_id, is_active=True).first()
-            if not user:
-                return
-
-            if user.token_version != tv:
-                return
-
-            request.user = user
-            request.jwt_payload = payload
-        except (ExpiredSignatureError, InvalidTokenError):
-            return
+        session_user = getattr(request, "user", None)
+        request.auth_evaluated = False
+        request.auth_context = get_auth_context(request)
+        request.user = SimpleLazyObject(lambda: self._resolve_user(request, session_user))
+
+    def _resolve_user(self, request, session_user):
+        request.auth_evaluated = True
+
+        if session_user is not None and getattr(session_user, "is_authenticated", False):
+            return session_user
+
+        user = authenticate_token(request)
+        if user is not None:
+            return user
+        return session_user if session_user is not None else AnonymousUser()
+
+    def process_response(self, request, response):
+        context = getattr(request, "auth_context", None)
+        if context is not None and context.timings and getattr(settings, "AUTH_SERVER_TIMING", False):
+            entries = [f"auth-{step.replace('_', '-')};dur={seconds * 1000:.3f}" for step, seconds in context.timings.items()]
+            existing = response.get("Server-Timing")
+            response["Server-Timing"] = ", ".join(([existing] if existing else []) + entries)
+        return response
+
+
+class ForwardAuthMiddleware:
+    """
+    Answer /api/auth/verify/ before the rest of the stack.
+
+    Gateways call it on every proxied request (nginx auth_request), and it needs nothing
+    from sessions, CSRF, messages or clickjacking protection. Place it right after CORS.
+    """
+
+    path = "/api/auth/verify/"
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if request.path_info == self.path:
+            return verify(request)
+        return self.get_response(request)
@@ -0,0 +1,27 @@
+# Generated by Django 4.2.27 on 2026-10-17 01:51
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_token_revocation'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserOutboxEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('user_id', models.UUIDField()),
+                ('event', models.CharField(choices=[('created', 'Created'), ('updated', 'Updated')], max_length=20)),
+                ('email', models.EmailField(max_length=254)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'db_table': 'user_outbox',
+            },
+        ),
+    ]
@@ -1,5 +1,5 @@
 import uuid
-from django.db import models
+from django.db import models, router, transaction
 from django.contrib.auth.models import AbstractBaseUser, PermissionsMixin, BaseUserManager
 from django.utils import timezone
 
@@ -48,5 +48,42 @@ class User(AbstractBaseUser, PermissionsMixin):
     USERNAME_FIELD = "email"
     REQUIRED_FIELDS = []
 
+    def save(self, *args, **kwargs):
+        # The post_save receiver writes the UserOutboxEvent; keep it in the same transaction as the row.
+        using = kwargs.get("using") or router.db_for_write(type(self), instance=self)
+        with transaction.atomic(using=using):
+            super().save(*args, **kwargs)
+
     def __str__(self):
         return self.email
+
+
+class TokenRevocation(models.Model):
+    """
+    Append-only log of token_version bumps, polled by every worker (see core.revocation).
+    Tokens of `user_id` carrying a version below `token_version` are revoked.
+    """
+    user_id = models.UUIDField()
+    token_version = models.PositiveIntegerField()
+    created_at = models.DateTimeField(default=timezone.now, db_index=True)
+
+    class Meta:
+        db_table = "token_revocations"
+
+
+class UserOutboxEvent(models.Model):
+    """
+    User changes waiting to be applied to team databases (see core.outbox).
+    Written in the same transaction as the User row and deleted once every handler applied it.
+    """
+    CREATED = "created"
+    UPDATED = "updated"
+    EVENT_CHOICES = [(CREATED, "Created"), (UPDATED, "Updated")]
+
+    user_id = models.UUIDField()
+    event = models.CharField(max_length=20, choices=EVENT_CHOICES)
+    email = models.EmailField()
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        db_table = "user_outbox"
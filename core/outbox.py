@@ -0,0 +1,107 @@
+"""
+Transactional outbox for provisioning users into team databases.
+
+Saving a User records a UserOutboxEvent on the default database in the same
+transaction; nothing touches a team database on the request path. Registered handlers
+(e.g. team2's UserDetails provisioning) receive events in batches from the dispatcher,
+which runs in a per-process background thread woken after commit, or from the
+`dispatch_user_outbox` management command. Handlers must be idempotent: a batch is
+retried as a whole if any handler fails.
+"""
+import logging
+import threading
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import connections, transaction
+
+from core.models import UserOutboxEvent
+
+logger = logging.getLogger(__name__)
+
+_handlers = {}
+
+
+def register_user_event_handler(name, handler):
+    """
+    `handler(events)` gets a list of UserOutboxEvent (user_id, event, email) in id order.
+    """
+    _handlers[name] = handler
+
+
+def record_user_event(user, created):
+    UserOutboxEvent.objects.create(
+        user_id=user.id,
+        event=UserOutboxEvent.CREATED if created else UserOutboxEvent.UPDATED,
+        email=user.email,
+    )
+    if getattr(settings, "USER_OUTBOX_BACKGROUND_DISPATCH", False):
+        transaction.on_commit(_dispatcher.wake)
+
+
+def _apply(events):
+    for name, handler in _handlers.items():
+        handler(events)
+
+
+def dispatch_pending(batch_size=500):
+    """
+    Apply pending events in batches until the outbox is empty. Returns the number applied.
+    """
+    applied = 0
+    while True:
+        events = list(UserOutboxEvent.objects.order_by("id")[:batch_size])
+        if not events:
+            return applied
+        _apply(events)
+        UserOutboxEvent.objects.filter(id__in=[e.id for e in events]).delete()
+        applied += len(events)
+
+
+def replay_users(batch_size=500):
+    """
+    Backfill: feed every existing user to the handlers as an update event.
+    """
+    User = get_user_model()
+    replayed = 0
+    rows = User.objects.order_by("id").values_list("id", "email")
+    batch = []
+    for user_id, email in rows.iterator(chunk_size=batch_size):
+        batch.append(UserOutboxEvent(user_id=user_id, event=UserOutboxEvent.UPDATED, email=email))
+        if len(batch) >= batch_size:
+            _apply(batch)
+            replayed += len(batch)
+            batch = []
+    if batch:
+        _apply(batch)
+        replayed += len(batch)
+    return replayed
+
+
+class _BackgroundDispatcher:
+    def __init__(self):
+        self._event = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def wake(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="user-outbox", daemon=True)
+                self._thread.start()
+        self._event.set()
+
+    def _run(self):
+        while True:
+            self._event.wait()
+            self._event.clear()
+            try:
+                dispatch_pending()
+            except Exception:
+                # Rows stay in the outbox; the next wake-up or the management command retries them.
+                logger.exception("User outbox dispatch failed")
+            finally:
+                connections.close_all()
+
+
+_dispatcher = _BackgroundDispatcher()
@@ -0,0 +1,135 @@
+"""
+Token revocation shared across worker processes.
+
+Logout bumps User.token_version; each worker keeps a local map of the minimum valid
+version per user and refreshes it from the configured store at most every
+JWT_REVOCATION_POLL_SECONDS. A revoked token is therefore rejected everywhere within
+that delay, even while the user itself is served from core.user_cache.
+
+An entry is only needed while tokens issued before it can still be presented, so entries
+(and TokenRevocation rows) are dropped once they are older than the retention window,
+JWT_REFRESH_TTL_SECONDS: every token below the stored version has expired by then.
+"""
+import threading
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+
+class BaseRevocationStore:
+    def __init__(self, poll_seconds=2, retention_seconds=3600):
+        self.poll_seconds = poll_seconds
+        self.retention_seconds = retention_seconds
+        # str(user_id) -> (minimum valid token_version, revoked_at as a unix timestamp)
+        self._min_versions = {}
+        self._lock = threading.Lock()
+        self._pruned_at = 0.0
+
+    def revoke(self, user_id, token_version):
+        """
+        Revoke every token of `user_id` whose version is below `token_version`.
+        """
+        self._remember(user_id, token_version)
+
+    def is_revoked(self, user_id, token_version) -> bool:
+        self.poll()
+        entry = self._min_versions.get(str(user_id))
+        if entry is None or entry[1] < self._cutoff():
+            return False
+        return token_version < entry[0]
+
+    def poll(self):
+        now = time.monotonic()
+        if now - self._pruned_at >= max(self.poll_seconds, 1):
+            self._pruned_at = now
+            self._prune()
+
+    def _cutoff(self):
+        return time.time() - self.retention_seconds
+
+    def _prune(self):
+        cutoff = self._cutoff()
+        with self._lock:
+            expired = [key for key, (_, revoked_at) in self._min_versions.items() if revoked_at < cutoff]
+            for key in expired:
+                del self._min_versions[key]
+
+    def _remember(self, user_id, token_version, revoked_at=None):
+        key = str(user_id)
+        revoked_at = time.time() if revoked_at is None else revoked_at
+        with self._lock:
+            current = self._min_versions.get(key)
+            if current is None or token_version > current[0]:
+                self._min_versions[key] = (token_version, revoked_at)
+
+
+class LocalRevocationStore(BaseRevocationStore):
+    """
+    Process-local only; for tests and single-worker development servers.
+    """
+
+
+class DatabaseRevocationStore(BaseRevocationStore):
+    """
+    Revocations in the core.TokenRevocation table on the default database.
+
+    Workers poll for rows newer than the last one they saw (one indexed query per
+    poll interval) and prune their local map on the same schedule. Rows older than the
+    retention window are deleted on write.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._cursor = None
+        self._polled_at = 0.0
+
+    def revoke(self, user_id, token_version):
+        from core.models import TokenRevocation
+
+        super().revoke(user_id, token_version)
+        TokenRevocation.objects.create(user_id=user_id, token_version=token_version)
+        TokenRevocation.objects.filter(created_at__lt=self._horizon()).delete()
+
+    def _horizon(self):
+        return timezone.now() - timedelta(seconds=self.retention_seconds)
+
+    def poll(self):
+        from core.models import TokenRevocation
+
+        now = time.monotonic()
+        if now - self._polled_at < self.poll_seconds:
+            return
+        self._polled_at = now
+
+        rows = TokenRevocation.objects.order_by("id")
+        if self._cursor is None:
+            rows = rows.filter(created_at__gte=self._horizon())
+        else:
+            rows = rows.filter(id__gt=self._cursor)
+
+        for row_id, user_id, token_version, created_at in rows.values_list(
+            "id", "user_id", "token_version", "created_at"
+        ):
+            self._remember(user_id, token_version, created_at.timestamp())
+            self._cursor = row_id
+        if self._cursor is None:
+            self._cursor = 0
+        self._prune()
+
+
+_stores = {}
+
+
+def get_revocation_store() -> BaseRevocationStore:
+    path = settings.JWT_REVOCATION_STORE
+    store = _stores.get(path)
+    if store is None:
+        store = _stores.setdefault(path, import_string(path)(
+            poll_seconds=settings.JWT_REVOCATION_POLL_SECONDS,
+            # Keep entries until every token issued before them has expired.
+            retention_seconds=max(settings.JWT_REFRESH_TTL_SECONDS, settings.JWT_ACCESS_TTL_SECONDS, 60),
+        ))
+    return store
@@ -0,0 +1,14 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from core.outbox import record_user_event
+
+User = get_user_model()
+
+
+@receiver(post_save, sender=User)
+def queue_user_event(sender, instance, created, update_fields=None, **kwargs):
+    # Team profiles only mirror the email; token_version bumps and the like are not events.
+    if created or update_fields is None or "email" in update_fields:
+        record_user_event(instance, created)
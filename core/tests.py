@@ -1,4 +1,4 @@
-from django.test import TestCase
+from django.test import SimpleTestCase, TestCase, override_settings
 from django.contrib.auth import get_user_model
 
 User = get_user_model()
@@ -22,3 +22,358 @@ class AuthFlowTests(TestCase):
         # logout
         res3 = self.client.post("/api/auth/logout/", data="{}", content_type="application/json")
         self.assertEqual(res3.status_code, 200)
+
+
+
+def _make_user(email, password="pass1234"):
+    # bulk_create skips post_save, so team2's cross-database signals don't fire here.
+    user = User(email=email)
+    user.set_password(password)
+    User.objects.bulk_create([user])
+    return user
+
+
+@override_settings(JWT_REVOCATION_STORE="core.revocation.LocalRevocationStore")
+class UserCacheTests(TestCase):
+    def setUp(self):
+        from core.user_cache import user_cache
+        user_cache.clear()
+        self.user = _make_user("c@test.com")
+
+    def _auth_header(self, user):
+        from core.jwt_utils import create_access_token
+        return {"HTTP_AUTHORIZATION": f"Bearer {create_access_token(user)}"}
+
+    def test_cached_user_skips_db(self):
+        headers = self._auth_header(self.user)
+        self.assertEqual(self.client.get("/api/auth/me/", **headers).status_code, 200)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get("/api/auth/me/", **headers).status_code, 200)
+
+    def test_revoke_drops_cached_token(self):
+        from core.user_cache import revoke_user_tokens
+        headers = self._auth_header(self.user)
+        self.assertEqual(self.client.get("/api/auth/me/", **headers).status_code, 200)
+        self.user.token_version = 1
+        User.objects.filter(id=self.user.id).update(token_version=1)
+        revoke_user_tokens(self.user)
+        self.assertEqual(self.client.get("/api/auth/me/", **headers).status_code, 401)
+
+
+@override_settings(JWT_REVOCATION_STORE="core.revocation.LocalRevocationStore")
+class LazyAuthTests(TestCase):
+    def test_health_skips_auth(self):
+        from core.jwt_utils import create_access_token
+        user = _make_user("lazy@test.com")
+        headers = {"HTTP_AUTHORIZATION": f"Bearer {create_access_token(user)}"}
+        with self.assertNumQueries(0):
+            res = self.client.get("/api/health/", **headers)
+        self.assertEqual(res.status_code, 200)
+        self.assertFalse(res.wsgi_request.auth_evaluated)
+
+        res = self.client.get("/api/auth/me/", **headers)
+        self.assertEqual(res.status_code, 200)
+        self.assertTrue(res.wsgi_request.auth_evaluated)
+
+
+class AsymmetricJWTTests(TestCase):
+    def setUp(self):
+        import os
+        import tempfile
+        from cryptography.hazmat.primitives import serialization
+        from cryptography.hazmat.primitives.asymmetric import ed25519
+
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.key_path = os.path.join(tmp.name, "jwt.pem")
+        with open(self.key_path, "wb") as f:
+            f.write(ed25519.Ed25519PrivateKey.generate().private_bytes(
+                serialization.Encoding.PEM,
+                serialization.PrivateFormat.PKCS8,
+                serialization.NoEncryption(),
+            ))
+
+    def test_jwks_verifies_tokens_locally(self):
+        from core.jwt_utils import create_access_token, decode_token
+        from core.jwt_verifier import TokenVerifier
+
+        user = _make_user("rsa@test.com")
+        with override_settings(JWT_ALGORITHM="EdDSA", JWT_PRIVATE_KEY_FILE=self.key_path):
+            token = create_access_token(user)
+            self.assertEqual(decode_token(token)["sub"], str(user.id))
+
+            jwks = self.client.get("/api/auth/jwks/").json()
+            self.assertEqual(len(jwks["keys"]), 1)
+            self.assertNotIn("d", jwks["keys"][0])
+
+            claims = TokenVerifier(jwks=jwks).verify(token)
+            self.assertEqual(claims["sub"], str(user.id))
+
+    def test_jwks_empty_for_hmac(self):
+        self.assertEqual(self.client.get("/api/auth/jwks/").json(), {"keys": []})
+
+
+@override_settings(JWT_REVOCATION_STORE="core.revocation.LocalRevocationStore")
+class ForwardAuthTests(TestCase):
+    def test_verify_from_cached_claims(self):
+        from core.jwt_utils import create_access_token
+        user = _make_user("fwd@test.com")
+        self.client.cookies["access_token"] = create_access_token(user)
+
+        res = self.client.get("/api/auth/verify/")
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res["X-User-Id"], str(user.id))
+        self.assertTrue(res["Cache-Control"].startswith("max-age="))
+        self.assertIn("Cookie", res["Vary"])
+
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get("/api/auth/verify/").status_code, 200)
+
+    def test_verify_rejects_missing_token(self):
+        res = self.client.get("/api/auth/verify/")
+        self.assertEqual(res.status_code, 401)
+        self.assertEqual(res["Cache-Control"], "no-store")
+
+
+class DecodedTokenCacheTests(TestCase):
+    def test_repeated_decode_hits_cache(self):
+        from core.jwt_utils import create_access_token, decode_token
+        from core.token_cache import token_cache
+
+        token_cache.clear()
+        token = create_access_token(_make_user("tc@test.com"))
+        first = decode_token(token)
+        second = decode_token(token)
+        self.assertEqual(first, second)
+        self.assertEqual(token_cache.stats()["hits"], 1)
+        self.assertEqual(token_cache.stats()["misses"], 1)
+
+    def test_entry_expires_with_token(self):
+        from core.token_cache import DecodedTokenCache
+
+        cache = DecodedTokenCache(max_size=2)
+        cache.set("expired", {"sub": "x", "exp": 1})
+        self.assertIsNone(cache.get("expired"))
+        for i in range(3):
+            cache.set(f"t{i}", {"sub": str(i), "exp": 2 ** 40})
+        self.assertIsNone(cache.get("t0"))
+        self.assertEqual(cache.get("t2")["sub"], "2")
+
+
+class AuthContextTests(TestCase):
+    def test_single_resolution_per_request(self):
+        from django.test import RequestFactory
+        from rest_framework.request import Request
+        from core.auth import JWTAuthentication
+        from core.auth_context import get_auth_context
+        from core.jwt_utils import create_access_token
+
+        user = _make_user("ctx@test.com")
+        request = RequestFactory().get("/", HTTP_AUTHORIZATION=f"Bearer {create_access_token(user)}")
+
+        self.assertEqual(get_auth_context(request).resolve().id, user.id)
+        context = get_auth_context(request)
+        self.assertEqual(set(context.timings), {"decode", "user_lookup"})
+
+        with self.assertNumQueries(0):
+            drf_user, payload = JWTAuthentication().authenticate(Request(request))
+        self.assertEqual(drf_user.id, user.id)
+        self.assertIs(get_auth_context(Request(request)), context)
+        self.assertEqual(payload["sub"], str(user.id))
+
+    def test_drf_view_reuses_the_middleware_context(self):
+        from unittest import mock
+        from django.test import RequestFactory
+        from rest_framework.response import Response
+        from rest_framework.views import APIView
+        from core import auth_context
+        from core.auth import JWTAuthentication
+        from core.jwt_utils import create_access_token
+        from core.middleware import JWTAuthenticationMiddleware
+
+        class WhoAmI(APIView):
+            def get(self, request):
+                return Response({"id": str(request.user.id), "authenticator": type(request.successful_authenticator)})
+
+        user = _make_user("drf@test.com")
+        request = RequestFactory().get("/", HTTP_AUTHORIZATION=f"Bearer {create_access_token(user)}")
+        JWTAuthenticationMiddleware(lambda r: None).process_request(request)
+        self.assertEqual(request.user.id, user.id)  # the middleware resolves first
+
+        with mock.patch.object(auth_context, "decode_token", wraps=auth_context.decode_token) as decode:
+            response = WhoAmI.as_view()(request)
+        self.assertEqual(response.data["id"], str(user.id))
+        self.assertIs(response.data["authenticator"], JWTAuthentication)
+        decode.assert_not_called()
+
+
+class RevocationStoreTests(TestCase):
+    def test_revocation_reaches_other_workers(self):
+        from core.revocation import DatabaseRevocationStore
+
+        user = _make_user("rev@test.com")
+        worker_a = DatabaseRevocationStore(poll_seconds=0)
+        worker_b = DatabaseRevocationStore(poll_seconds=0)
+        self.assertFalse(worker_b.is_revoked(user.id, 0))
+
+        worker_a.revoke(user.id, 1)
+        self.assertTrue(worker_b.is_revoked(user.id, 0))
+        self.assertFalse(worker_b.is_revoked(user.id, 1))
+
+    def test_entries_are_dropped_after_the_retention_window(self):
+        import time
+        from datetime import timedelta
+        from django.utils import timezone
+        from core.models import TokenRevocation
+        from core.revocation import DatabaseRevocationStore, LocalRevocationStore
+
+        old, recent = _make_user("old@test.com"), _make_user("recent@test.com")
+        stale_row = TokenRevocation.objects.create(
+            user_id=old.id, token_version=1, created_at=timezone.now() - timedelta(seconds=120)
+        )
+        worker = DatabaseRevocationStore(poll_seconds=0, retention_seconds=60)
+        worker._remember(old.id, 1, revoked_at=time.time() - 120)
+        worker.revoke(recent.id, 1)
+
+        self.assertFalse(TokenRevocation.objects.filter(id=stale_row.id).exists())
+        self.assertFalse(worker.is_revoked(old.id, 0))
+        self.assertTrue(worker.is_revoked(recent.id, 0))
+        self.assertEqual(set(worker._min_versions), {str(recent.id)})
+
+        local = LocalRevocationStore(poll_seconds=0, retention_seconds=60)
+        local._remember(old.id, 1, revoked_at=time.time() - 120)
+        local.poll()
+        self.assertEqual(local._min_versions, {})
+
+
+class UserOutboxTests(TestCase):
+    def test_user_events_are_queued_and_dispatched(self):
+        from unittest import mock
+        from core import outbox
+        from core.models import UserOutboxEvent
+
+        user = User.objects.create_user(email="ob@test.com", password="pass1234")
+        user.token_version += 1
+        user.save(update_fields=["token_version"])
+        self.assertEqual(list(UserOutboxEvent.objects.values_list("event", flat=True)), ["created"])
+
+        seen = []
+        with mock.patch.dict(outbox._handlers, {"test": seen.extend}, clear=True):
+            self.assertEqual(outbox.dispatch_pending(), 1)
+            self.assertEqual(outbox.replay_users(), 1)
+        self.assertEqual([e.user_id for e in seen], [user.id, user.id])
+        self.assertFalse(UserOutboxEvent.objects.exists())
+
+    def test_user_row_rolls_back_when_the_event_cannot_be_written(self):
+        from unittest import mock
+        from django.db import DatabaseError
+        from core import outbox
+
+        with mock.patch.object(outbox.UserOutboxEvent.objects, "create", side_effect=DatabaseError("outbox down")):
+            with self.assertRaises(DatabaseError):
+                User.objects.create_user(email="lost@test.com", password="pass1234")
+        self.assertFalse(User.objects.filter(email="lost@test.com").exists())
+
+        user = User.objects.create_user(email="kept@test.com", password="pass1234")
+        user.email = "changed@test.com"
+        with mock.patch.object(outbox.UserOutboxEvent.objects, "create", side_effect=DatabaseError("outbox down")):
+            with self.assertRaises(DatabaseError):
+                user.save()
+        self.assertEqual(User.objects.get(id=user.id).email, "kept@test.com")
+
+
+class ImportUsersCommandTests(TestCase):
+    def test_import_skips_existing_and_invalid_rows(self):
+        import os
+        import tempfile
+        from io import StringIO
+        from unittest import mock
+        from django.core.management import call_command
+        from core import outbox
+
+        _make_user("old@test.com")
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "users.jsonl")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write('{"email": "New@Test.com", "password": "pass1234", "age": 20}\n')
+                f.write('{"email": "old@test.com", "password": "pass1234"}\n')
+                f.write('{"email": "not-an-email"}\n')
+                f.write('not json\n')
+
+            with mock.patch.dict(outbox._handlers, {}, clear=True):
+                call_command("import_users", path, workers=1, stdout=StringIO(), stderr=StringIO())
+
+        user = User.objects.get(email="new@test.com")
+        self.assertTrue(user.check_password("pass1234"))
+        self.assertEqual(user.age, 20)
+        self.assertEqual(User.objects.count(), 2)
+
+
+@override_settings(JWT_REVOCATION_STORE="core.revocation.LocalRevocationStore")
+class UserBatchLookupTests(TestCase):
+    def test_batch_lookup(self):
+        from core.jwt_utils import create_access_token
+        from core.user_lookup import get_user_summaries, summary_cache
+
+        summary_cache.clear()
+        a = _make_user("a1@test.com")
+        b = _make_user("b1@test.com")
+        self.client.cookies["access_token"] = create_access_token(a)
+
+        res = self.client.get(f"/api/users/batch/?ids={a.id},{b.id},not-a-uuid")
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(set(res.json()["users"]), {str(a.id), str(b.id)})
+
+        with self.assertNumQueries(0):
+            self.assertEqual(len(get_user_summaries([a.id, str(b.id)])), 2)
+
+
+class SQLiteCacheTests(SimpleTestCase):
+    def _caches(self):
+        import os
+        import shutil
+        import tempfile
+        from core.cache_backends import SQLiteCache
+
+        tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp, ignore_errors=True)
+        path = os.path.join(tmp, "cache.sqlite3")
+        # Two instances on one file stand in for two worker processes.
+        return SQLiteCache(path, {}), SQLiteCache(path, {})
+
+    def test_shared_between_instances(self):
+        a, b = self._caches()
+        a.set("state", {"score": 1})
+        self.assertEqual(b.get("state"), {"score": 1})
+        self.assertEqual(b.get("state"), {"score": 1})  # L1 hit, revision unchanged
+
+        a.set("state", {"score": 2})
+        self.assertEqual(b.get("state"), {"score": 2})
+        a.delete("state")
+        self.assertIsNone(b.get("state"))
+
+        a.set("short", 1, timeout=-1)
+        self.assertIsNone(b.get("short"))
+
+    def test_atomic_operations(self):
+        a, b = self._caches()
+        self.assertTrue(a.add("lock", 1, timeout=5))
+        self.assertFalse(b.add("lock", 1, timeout=5))
+        a.set("lock", 1, timeout=-1)
+        self.assertTrue(b.add("lock", 1, timeout=5))
+
+        a.set("n", 10)
+        self.assertEqual(b.incr("n", 5), 15)
+        self.assertEqual(a.decr("n"), 14)
+        with self.assertRaises(ValueError):
+            a.incr("missing")
+
+        self.assertTrue(a.cas("queue", None, [1]))
+        self.assertFalse(b.cas("queue", None, [2]))
+        self.assertTrue(b.cas("queue", [1], [1, 2]))
+        self.assertEqual(a.get("queue"), [1, 2])
+
+        a.set("owned", "token-a", timeout=5)
+        self.assertFalse(b.delete_if("owned", "token-b"))
+        self.assertTrue(b.delete_if("owned", "token-a"))
+        self.assertFalse(a.delete_if("owned", "token-a"))
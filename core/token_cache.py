@@ -0,0 +1,64 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+
+
+class DecodedTokenCache:
+    """
+    Bounded LRU of already-verified token payloads, keyed by the SHA-256 of the raw token.
+
+    Each entry is dropped at the token's own `exp`, so a hit can never outlive the token.
+    Only successfully verified tokens are stored; failures are never cached.
+    """
+
+    def __init__(self, max_size=10_000):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(token):
+        return hashlib.sha256(token.encode("utf-8")).digest()
+
+    def get(self, token):
+        key = self._key(token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] <= time.time():
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        return dict(entry[1])
+
+    def set(self, token, payload):
+        exp = payload.get("exp")
+        if self.max_size <= 0 or exp is None:
+            return
+        key = self._key(token)
+        with self._lock:
+            self._entries[key] = (exp, dict(payload))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"size": len(self._entries), "max_size": self.max_size, "hits": self.hits, "misses": self.misses}
+
+
+token_cache = DecodedTokenCache(max_size=getattr(settings, "JWT_DECODE_CACHE_SIZE", 10_000))
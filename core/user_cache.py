@@ -0,0 +1,102 @@
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+
+from core.revocation import get_revocation_store
+
+User = get_user_model()
+
+
+class UserCache:
+    """
+    Process-local, size-bounded TTL cache of active users keyed by user id.
+
+    Entries are dropped on logout (token_version bump) via revoke_user_tokens(); logouts
+    on other workers reach this one through core.revocation, and other changes made
+    elsewhere (e.g. deactivation) are picked up once the entry expires.
+    """
+
+    def __init__(self, ttl_seconds=60, max_size=10_000):
+        self.ttl_seconds = ttl_seconds
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id):
+        key = str(user_id)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, user = entry
+            if expires_at <= now:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+        # Hand out a copy so request code mutating the user can't leak into the cache.
+        return copy.copy(user)
+
+    def set(self, user):
+        if self.ttl_seconds <= 0 or self.max_size <= 0:
+            return
+        key = str(user.id)
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, copy.copy(user))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_id):
+        with self._lock:
+            self._entries.pop(str(user_id), None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+user_cache = UserCache(
+    ttl_seconds=getattr(settings, "JWT_USER_CACHE_TTL_SECONDS", 60),
+    max_size=getattr(settings, "JWT_USER_CACHE_MAX_SIZE", 10_000),
+)
+
+
+def get_active_user(user_id, token_version):
+    """
+    Return the active user whose token_version matches, or None.
+
+    A cached user with a different token_version is re-read from the DB once, so
+    tokens issued after a logout on another worker are accepted immediately.
+    """
+    if get_revocation_store().is_revoked(user_id, token_version):
+        return None
+
+    user = user_cache.get(user_id)
+    if user is not None and user.token_version == token_version:
+        return user
+
+    user = User.objects.filter(id=user_id, is_active=True).first()
+    if not user:
+        user_cache.invalidate(user_id)
+        return None
+
+    user_cache.set(user)
+    if user.token_version != token_version:
+        return None
+    return user
+
+
+def revoke_user_tokens(user):
+    """
+    Call after bumping user.token_version: revokes older tokens on every worker.
+    """
+    get_revocation_store().revoke(user.id, user.token_version)
+    user_cache.invalidate(user.id)
@@ -0,0 +1,77 @@
+import threading
+import time
+from collections import OrderedDict
+from uuid import UUID
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+
+User = get_user_model()
+
+SUMMARY_FIELDS = ("id", "first_name", "last_name", "email")
+
+
+class _SummaryCache:
+    def __init__(self, ttl_seconds, max_size):
+        self.ttl_seconds = ttl_seconds
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_many(self, keys):
+        now = time.monotonic()
+        found = {}
+        with self._lock:
+            for key in keys:
+                entry = self._entries.get(key)
+                if entry is None:
+                    continue
+                if entry[0] <= now:
+                    del self._entries[key]
+                    continue
+                found[key] = entry[1]
+        return found
+
+    def set_many(self, values):
+        if self.ttl_seconds <= 0:
+            return
+        expires_at = time.monotonic() + self.ttl_seconds
+        with self._lock:
+            for key, value in values.items():
+                self._entries[key] = (expires_at, value)
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+summary_cache = _SummaryCache(
+    ttl_seconds=getattr(settings, "USER_LOOKUP_CACHE_TTL_SECONDS", 30),
+    max_size=getattr(settings, "USER_LOOKUP_CACHE_MAX_SIZE", 50_000),
+)
+
+
+def get_user_summaries(user_ids) -> dict:
+    """
+    Map each known user id (UUID) to {"id", "first_name", "last_name", "email"}.
+
+    Resolves all ids not already cached with a single query on the default database;
+    unknown or malformed ids are left out of the result.
+    """
+    ids = set()
+    for user_id in user_ids:
+        try:
+            ids.add(user_id if isinstance(user_id, UUID) else UUID(str(user_id)))
+        except (TypeError, ValueError):
+            continue
+
+    found = summary_cache.get_many(ids)
+    missing = ids - found.keys()
+    if missing:
+        fetched = {row["id"]: row for row in User.objects.filter(id__in=missing).values(*SUMMARY_FIELDS)}
+        summary_cache.set_many(fetched)
+        found.update(fetched)
+    return {user_id: dict(summary) for user_id, summary in found.items()}
@@ -1,5 +1,7 @@
 import json
+import time
 from django.http import JsonResponse
+from django.utils.cache import patch_vary_headers
 from django.views.decorators.http import require_POST
 from django.views.decorators.csrf import csrf_exempt
 from django.contrib.auth import authenticate, get_user_model
@@ -7,8 +9,13 @@ from django.core.validators import validate_email
 from django.core.exceptions import ValidationError
 from django.contrib.auth.password_validation import validate_password
 
+from core.jwt_keys import public_jwks
 from core.jwt_utils import create_access_token, create_refresh_token, decode_token
 from core.auth import api_login_required
+from core.token_cache import token_cache
+from core.auth_context import authenticate_token
+from core.user_cache import revoke_user_tokens
+from core.user_lookup import get_user_summaries
 
 User = get_user_model()
 
@@ -40,7 +47,13 @@ def _clear_auth_cookies(resp: JsonResponse, settings):
 
 
 def health(request):
-    return JsonResponse({"status": "ok"})
+    return JsonResponse({"status": "ok", "token_cache": token_cache.stats()})
+
+
+def jwks(request):
+    resp = JsonResponse(public_jwks())
+    resp["Cache-Control"] = "public, max-age=300"
+    return resp
 
 
 @csrf_exempt
@@ -177,6 +190,7 @@ def logout_api(request):
     if user and getattr(user, "is_authenticated", False):
         user.token_version += 1
         user.save(update_fields=["token_version"])
+        revoke_user_tokens(user)
 
     resp = JsonResponse({"ok": True})
     _clear_auth_cookies(resp, settings)
@@ -189,13 +203,65 @@ def me(request):
     return JsonResponse({"ok": True, "user": {"email": u.email, "first_name": u.first_name, "last_name": u.last_name, "age": u.age}})
 
 
-@api_login_required
 def verify(request):
-    u = request.user
+    """
+    Forward-auth check for gateways (nginx auth_request).
+
+    Normally served by core.middleware.ForwardAuthMiddleware, so only the token signature is
+    checked and the user comes from the process-local cache. Successful answers carry a short
+    max-age (capped at the token's exp) and Vary on the credentials so the gateway can
+    microcache them per token.
+    """
+    from django.conf import settings
+
+    user = authenticate_token(request)
+    if user is None:
+        resp = JsonResponse({"detail": "Authentication required"}, status=401)
+        resp["Cache-Control"] = "no-store"
+        patch_vary_headers(resp, ("Cookie", "Authorization"))
+        return resp
+
     resp = JsonResponse({"ok": True})
-    resp["X-User-Id"] = str(u.id)
-    resp["X-User-Email"] = u.email
-    resp["X-User-First-Name"] = u.first_name or ""
-    resp["X-User-Last-Name"] = u.last_name or ""
-    resp["X-User-Age"] = str(u.age or "")
+    resp["X-User-Id"] = str(user.id)
+    resp["X-User-Email"] = user.email
+    resp["X-User-First-Name"] = user.first_name or ""
+    resp["X-User-Last-Name"] = user.last_name or ""
+    resp["X-User-Age"] = str(user.age or "")
+
+    ttl = request.jwt_payload["exp"] - int(time.time())
+    resp["Cache-Control"] = f"max-age={max(0, min(settings.JWT_FORWARD_AUTH_CACHE_SECONDS, ttl))}"
+    patch_vary_headers(resp, ("Cookie", "Authorization"))
     return resp
+
+
+@csrf_exempt
+@api_login_required
+def users_batch(request):
+    """
+    Display names for many users at once: GET ?ids=a,b,c or POST {"ids": [...]}.
+    """
+    from django.conf import settings
+
+    if request.method == "POST":
+        try:
+            ids = json.loads(request.body.decode("utf-8")).get("ids") or []
+        except Exception:
+            return JsonResponse({"error": "Invalid JSON"}, status=400)
+    elif request.method == "GET":
+        ids = [i for i in request.GET.get("ids", "").split(",") if i.strip()]
+    else:
+        return JsonResponse({"error": "Method not allowed"}, status=405)
+
+    if not isinstance(ids, list):
+        return JsonResponse({"error": "ids must be a list"}, status=400)
+    if len(ids) > settings.USER_LOOKUP_MAX_IDS:
+        return JsonResponse({"error": f"at most {settings.USER_LOOKUP_MAX_IDS} ids per request"}, status=400)
+
+    summaries = get_user_summaries(i.strip() if isinstance(i, str) else i for i in ids)
+    return JsonResponse({
+        "ok": True,
+        "users": {
+            str(user_id): {"first_name": s["first_name"], "last_name": s["last_name"]}
+            for user_id, s in summaries.items()
+        },
+    })
@@ -5,6 +5,7 @@ from django.conf import settings
 
 from core.jwt_utils import create_access_token, create_refresh_token
 from core.views import _set_auth_cookies  # reuse same cookie logic
+from core.user_cache import revoke_user_tokens
 
 User = get_user_model()
 
@@ -77,6 +78,7 @@ def logout_page(request):
     if getattr(request, "user", None) is not None and request.user.is_authenticated:
         request.user.token_version += 1
         request.user.save(update_fields=["token_version"])
+        revoke_user_tokens(request.user)
 
     resp = redirect("home")
     resp.delete_cookie("access_token", path="/")
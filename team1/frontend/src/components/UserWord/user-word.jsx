@@ -5,6 +5,8 @@ import { SettingsContext } from '../../context/SettingsContext';
 import './user-word.css';
 import SERVER_URL from "../../config";
 
+const cursorOf = (link) => (link ? new URL(link).searchParams.get('cursor') : null);
+
 // --- Sub-Component: Flashcard (Double-Sided) ---
 const Flashcard = ({ uw, onReview, onDelete, onUpdate, strings }) => {
   const [isFlipped, setIsFlipped] = useState(false);
@@ -144,6 +146,8 @@ const UserWordManager = () => {
   const [myWords, setMyWords] = useState([]);
   const [selectedBox, setSelectedBox] = useState('new');
   const [isFetchingBox, setIsFetchingBox] = useState(false);
+  const [nextCursor, setNextCursor] = useState(null);  // Cursor of the box's next page (null: all loaded)
+  const [isLoadingMore, setIsLoadingMore] = useState(false);
   const [isExact, setIsExact] = useState(false);
 
   const isStartBox = selectedBox === 'new';
@@ -153,7 +157,8 @@ const UserWordManager = () => {
     setIsFetchingBox(true);
     try {
       const data = await userWordService.getUserWordsByLeitner(selectedBox);
-      setMyWords(Array.isArray(data) ? data : []);
+      setMyWords(Array.isArray(data) ? data : (data?.results || []));
+      setNextCursor(cursorOf(data?.next));
     } catch (err) {
       console.error("Fetch Box Error:", err);
     } finally {
@@ -161,6 +166,21 @@ const UserWordManager = () => {
     }
   }, [selectedBox]);
 
+  // Append the box's next page (boxes can hold more cards than one page)
+  const loadMoreWords = async () => {
+    if (!nextCursor) return;
+    setIsLoadingMore(true);
+    try {
+      const data = await userWordService.getUserWordsByLeitner(selectedBox, nextCursor);
+      setMyWords((words) => [...words, ...(data?.results || [])]);
+      setNextCursor(cursorOf(data?.next));
+    } catch (err) {
+      console.error("Load More Error:", err);
+    } finally {
+      setIsLoadingMore(false);
+    }
+  };
+
   useEffect(() => {
     fetchMyWords();
   }, [fetchMyWords]);
@@ -184,7 +204,7 @@ const UserWordManager = () => {
       if (searchTerm.trim()) {
         setIsSearching(true);
         try {
-          const data = await wordService.getAllWords(searchTerm, 1, isExact);
+          const data = await wordService.getAllWords(searchTerm, null, isExact);
           setSearchResults(data.results || data || []);
         } catch (err) {
           console.error("Search Error:", err);
@@ -399,6 +419,12 @@ const UserWordManager = () => {
             ))
           )}
         </div>
+
+        {!isFetchingBox && nextCursor && (
+          <button className="refresh-btn load-more-btn" onClick={loadMoreWords} disabled={isLoadingMore}>
+            {isLoadingMore ? "..." : (strings.load_more || "Load more")}
+          </button>
+        )}
       </div>
     </div>
   );
@@ -2,33 +2,31 @@ import React, { useEffect, useState } from 'react';
 import { wordService } from '../../services/word-service';
 import './WordList.css';
 
+const cursorOf = (link) => (link ? new URL(link).searchParams.get('cursor') : null);
+
 const WordList = () => {
     const [words, setWords] = useState([]);
     const [loading, setLoading] = useState(true);
     const [search, setSearch] = useState('');  // State to manage search query
-    const [page, setPage] = useState(1);  // State for pagination
-    const [totalPages, setTotalPages] = useState(1);  // To manage total pages from pagination
+    const [cursor, setCursor] = useState(null);  // Cursor of the current page (null: first page)
+    const [links, setLinks] = useState({ next: null, previous: null });  // Cursors of the neighbouring pages
+    const [truncated, setTruncated] = useState(false);  // Search kept only its best matches
 
     useEffect(() => {
-        // Fetch words based on search query and page
-        wordService.getAllWords(search, page)
+        // Fetch words based on search query and cursor
+        wordService.getAllWords(search, cursor)
             .then(data => {
                 setWords(data.results);
-                setTotalPages(data.total_pages);  // Assuming the response includes total pages
+                setLinks({ next: cursorOf(data.next), previous: cursorOf(data.previous) });
+                setTruncated(Boolean(data.truncated));
                 setLoading(false);
             })
             .catch(err => console.error(err));
-    }, [search, page]);  // Re-fetch when search or page changes
+    }, [search, cursor]);  // Re-fetch when search or cursor changes
 
     const handleSearchChange = (event) => {
         setSearch(event.target.value);
-        setPage(1);  // Reset to first page when search term changes
-    };
-
-    const handlePageChange = (newPage) => {
-        if (newPage >= 1 && newPage <= totalPages) {
-            setPage(newPage);
-        }
+        setCursor(null);  // Back to the first page when search term changes
     };
 
     if (loading) return <div>Loading...</div>;
@@ -45,6 +43,8 @@ const WordList = () => {
                 placeholder="Search for a word (English or Persian)"
             />
 
+            {truncated && <p className="search-truncated">Showing the best matches only. Refine your search to see others.</p>}
+
             <ul className="word-grid">
                 {words.map(word => (
                     <li key={word.id} className="word-card">
@@ -57,9 +57,8 @@ const WordList = () => {
 
             {/* Pagination Controls */}
             <div className="pagination">
-                <button onClick={() => handlePageChange(page - 1)} disabled={page <= 1}>Previous</button>
-                <span>Page {page} of {totalPages}</span>
-                <button onClick={() => handlePageChange(page + 1)} disabled={page >= totalPages}>Next</button>
+                <button onClick={() => setCursor(links.previous)} disabled={!links.previous}>Previous</button>
+                <button onClick={() => setCursor(links.next)} disabled={!links.next}>Next</button>
             </div>
         </div>
     );
@@ -64,9 +64,11 @@ export const userWordService = {
     return await handleResponse(response);
   },
 
-  // GET BOX CONTENTS
-  getUserWordsByLeitner: async (leitnerType) => {
-    const response = await fetch(`${BASE_URL}/userwords/leitner/${leitnerType}/`, {
+  // GET BOX CONTENTS - one page; pass the `next` page's cursor to continue
+  getUserWordsByLeitner: async (leitnerType, cursor = null) => {
+    const params = new URLSearchParams({ page_size: 100 });
+    if (cursor) params.set('cursor', cursor);
+    const response = await fetch(`${BASE_URL}/userwords/leitner/${leitnerType}/?${params}`, {
       method: 'GET',
       headers: {
         "Content-Type": "application/json",
@@ -102,4 +104,19 @@ export const userWordService = {
     });
     return await handleResponse(response);
   },
-};
\ No newline at end of file
+
+  // REVIEW - [{user_word_id, result: "correct" | "wrong"}, ...] in one request
+  reviewUserWords: async (reviews) => {
+    const response = await fetch(`${BASE_URL}/userwords/review/`, {
+      method: 'POST',
+      body: JSON.stringify({ reviews }),
+      headers: {
+        "Content-Type": "application/json",
+        "Accept": "application/json",
+        "X-CSRFToken": getCookie('csrftoken'),
+      },
+      credentials: 'include',
+    });
+    return await handleResponse(response);
+  },
+};
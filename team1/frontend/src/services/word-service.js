@@ -1,9 +1,11 @@
 import {BASE_URL} from "../config";
 
 export const wordService = {
-  getAllWords: async (search = "", page = 1, exact = false) => {
+  // `cursor` comes from the `next` / `previous` links of the previous response.
+  getAllWords: async (search = "", cursor = null, exact = false) => {
+    const cursorParam = cursor ? `&cursor=${encodeURIComponent(cursor)}` : "";
     const response = await fetch(
-      `${BASE_URL}/words/?search=${encodeURIComponent(search)}&page=${page}&exact=${exact}`,
+      `${BASE_URL}/words/?search=${encodeURIComponent(search)}&exact=${exact}${cursorParam}`,
       {
         method: "GET",
         headers: {
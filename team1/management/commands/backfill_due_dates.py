@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from team1.services.user_words_service import backfill_next_due_dates
+
+
+class Command(BaseCommand):
+    help = "Fill next_due_date on user words saved before it was tracked."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        updated = backfill_next_due_dates(batch_size=options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"Set next_due_date on {updated} user words."))
@@ -0,0 +1,22 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from team1.services.distractor_service import DISTRACTOR_SET_SIZE, precompute_all, refresh_stale_sets
+
+
+class Command(BaseCommand):
+    help = "Recompute the ranked distractor candidates stored for every word (backfill / periodic refresh)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--size", type=int, default=DISTRACTOR_SET_SIZE, help="Candidates stored per word")
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument("--stale-only", action="store_true", help="Only recompute sets flagged stale by word/category edits")
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        refresh = refresh_stale_sets if options["stale_only"] else precompute_all
+        written = refresh(k=options["size"], batch_size=options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(
+            f"Stored distractor sets for {written} words in {time.perf_counter() - started:.1f}s."
+        ))
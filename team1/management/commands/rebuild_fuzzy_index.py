@@ -0,0 +1,19 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from team1.services.fuzzy_index import rebuild_trigram_table
+
+
+class Command(BaseCommand):
+    help = "Recompute the stored word trigrams behind the fuzzy (typo-tolerant) word lookup."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=2000)
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        written = rebuild_trigram_table(batch_size=options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(
+            f"Stored trigrams for {written} words in {time.perf_counter() - started:.1f}s."
+        ))
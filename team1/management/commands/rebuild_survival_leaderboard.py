@@ -0,0 +1,19 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from team1.services.leaderboard import rebuild_leaderboard
+
+
+class Command(BaseCommand):
+    help = "Recompute the survival leaderboard (best score per user per period) from all survival games."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=5000)
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        written = rebuild_leaderboard(batch_size=options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(
+            f"Wrote {written} leaderboard entries in {time.perf_counter() - started:.1f}s."
+        ))
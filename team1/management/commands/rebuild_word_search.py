@@ -0,0 +1,24 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from team1.services.word_search import create_search_index, rebuild_index
+
+
+class Command(BaseCommand):
+    help = (
+        "Create and fill the full-text word search index (FTS5 on SQLite, FULLTEXT on MySQL) from all live words. "
+        "Requests never build it, so run this on deployment."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=2000)
+
+    def handle(self, *args, **options):
+        if create_search_index() is None:
+            raise CommandError("Full-text search is not available on the team1 database.")
+        started = time.perf_counter()
+        indexed = rebuild_index(batch_size=options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(
+            f"Indexed {indexed} words in {time.perf_counter() - started:.1f}s."
+        ))
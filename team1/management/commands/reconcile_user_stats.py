@@ -0,0 +1,22 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from team1.services.stats_service import reconcile
+
+
+class Command(BaseCommand):
+    help = "Recount every user's UserStats rollup from UserWord/Quiz/SurvivalGame and fix drifted rows."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument("--dry-run", action="store_true", help="Report drift without writing")
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        checked, fixed, created = reconcile(batch_size=options["batch_size"], dry_run=options["dry_run"])
+        verb = "Would fix" if options["dry_run"] else "Fixed"
+        self.stdout.write(self.style.SUCCESS(
+            f"Checked {checked} users in {time.perf_counter() - started:.1f}s. "
+            f"{verb} {fixed} drifted rows, {created} missing rows."
+        ))
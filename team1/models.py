@@ -1,5 +1,5 @@
 import uuid
-from django.db import models
+from django.db import models, router, transaction
 from django.utils import timezone
 
 
@@ -14,7 +14,10 @@ class TimeStampedSoftDeleteModel(models.Model):
     def save(self, *args, **kwargs):
         if self.pk is not None:
             self.updated_at = timezone.now()
-        super().save(*args, **kwargs)
+        # post_save receivers (e.g. the UserStats rollup) run in the same transaction as the write.
+        using = kwargs.get("using") or router.db_for_write(type(self), instance=self)
+        with transaction.atomic(using=using):
+            super().save(*args, **kwargs)
 
 
 class Category(TimeStampedSoftDeleteModel):
@@ -44,11 +47,41 @@ class Word(TimeStampedSoftDeleteModel):
 
     class Meta:
         db_table = "words"
+        indexes = [
+            models.Index(fields=["created_at", "id"], name="words_created"),
+        ]
 
     def __str__(self):
         return self.english
 
 
+class WordDistractorSet(models.Model):
+    """Ranked distractor candidates for a word, precomputed by services.distractor_service."""
+    word = models.OneToOneField(
+        Word, on_delete=models.CASCADE, primary_key=True, related_name="distractor_set", db_column="word_id"
+    )
+    distractor_ids = models.JSONField(default=list)
+    # Set when the word or its category's words changed; recomputed on next read or by precompute_distractors.
+    is_stale = models.BooleanField(default=False, db_index=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = "word_distractors"
+
+
+class WordTrigramSet(models.Model):
+    """A word's distinct trigrams per field, source of the in-memory fuzzy index (services.fuzzy_index)."""
+    word = models.OneToOneField(
+        Word, on_delete=models.CASCADE, primary_key=True, related_name="trigram_set", db_column="word_id"
+    )
+    english_trigrams = models.JSONField(default=list)
+    persian_trigrams = models.JSONField(default=list)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = "word_trigrams"
+
+
 class UserWord(TimeStampedSoftDeleteModel):
     user_word_id = models.BigAutoField(primary_key=True)
     description = models.TextField()
@@ -57,6 +90,8 @@ class UserWord(TimeStampedSoftDeleteModel):
     image = models.ImageField(upload_to='user_words/', null=True, blank=True)
 
     last_check_date = models.DateField(null=True, blank=True)
+    # First day the card is due; kept in step with leitner_type/last_check_date by services.user_words_service.
+    next_due_date = models.DateField(null=True, blank=True)
 
     word = models.ForeignKey(
         'Word', on_delete=models.CASCADE, db_column="word_id", related_name="user_words"
@@ -74,6 +109,8 @@ class UserWord(TimeStampedSoftDeleteModel):
         indexes = [
             models.Index(fields=["word"]),
             models.Index(fields=["user_id"]),
+            models.Index(fields=["user_id", "created_at", "user_word_id"], name="user_words_user_created"),
+            models.Index(fields=["user_id", "is_deleted", "next_due_date"], name="user_words_due"),
         ]
 
 
@@ -91,6 +128,7 @@ class Quiz(TimeStampedSoftDeleteModel):
         indexes = [
             models.Index(fields=["user_id"]),
             models.Index(fields=["user_id", "date"]),
+            models.Index(fields=["user_id", "created_at", "quiz_id"], name="quiz_user_created"),
         ]
 
 
@@ -100,10 +138,70 @@ class SurvivalGame(TimeStampedSoftDeleteModel):
     score = models.IntegerField(null=True, blank=True)
     lives = models.IntegerField(null=True, blank=True)
     date = models.DateField(null=True, blank=True)
+    # Words the game has drawn, written with score/lives so a session reopened from the row does not repeat them.
+    used_word_ids = models.JSONField(default=list, blank=True)
 
     class Meta:
         db_table = "survival_game"
         indexes = [
             models.Index(fields=["user_id"]),
             models.Index(fields=["user_id", "date"]),
+            models.Index(fields=["user_id", "created_at", "survival_game_id"], name="survival_game_user_created"),
         ]
+
+
+class SurvivalLeaderboardEntry(models.Model):
+    """A user's best survival score in one leaderboard period, maintained by services.leaderboard."""
+    PERIOD_ALL_TIME = "all"
+    PERIOD_WEEK = "week"
+    PERIOD_DAY = "day"
+    PERIOD_CHOICES = [(PERIOD_ALL_TIME, "All time"), (PERIOD_WEEK, "Week"), (PERIOD_DAY, "Day")]
+
+    id = models.BigAutoField(primary_key=True)
+    period_type = models.CharField(max_length=4, choices=PERIOD_CHOICES)
+    period_start = models.DateField()
+    user_id = models.UUIDField()
+    best_score = models.IntegerField()
+    achieved_at = models.DateTimeField()
+
+    class Meta:
+        db_table = "survival_leaderboard"
+        constraints = [
+            models.UniqueConstraint(fields=["period_type", "period_start", "user_id"], name="survival_leaderboard_user"),
+        ]
+        indexes = [
+            models.Index(fields=["period_type", "period_start", "-best_score", "achieved_at"],
+                         name="survival_leaderboard_rank"),
+        ]
+
+
+class UserStats(models.Model):
+    """Per-user dashboard rollup, kept in step with UserWord/Quiz/SurvivalGame writes by services.stats_service."""
+    user_id = models.UUIDField(primary_key=True)
+
+    words_total = models.IntegerField(default=0)
+    words_new = models.IntegerField(default=0)
+    words_1day = models.IntegerField(default=0)
+    words_3days = models.IntegerField(default=0)
+    words_7days = models.IntegerField(default=0)
+    words_mastered = models.IntegerField(default=0)
+
+    # *_scored count only rows with a score: averages are score_sum / scored, ignoring NULLs like AVG().
+    quiz_daily_count = models.IntegerField(default=0)
+    quiz_daily_scored = models.IntegerField(default=0)
+    quiz_daily_score_sum = models.BigIntegerField(default=0)
+    quiz_weekly_count = models.IntegerField(default=0)
+    quiz_weekly_scored = models.IntegerField(default=0)
+    quiz_weekly_score_sum = models.BigIntegerField(default=0)
+    quiz_monthly_count = models.IntegerField(default=0)
+    quiz_monthly_scored = models.IntegerField(default=0)
+    quiz_monthly_score_sum = models.BigIntegerField(default=0)
+
+    game_count = models.IntegerField(default=0)
+    game_scored = models.IntegerField(default=0)
+    game_score_sum = models.BigIntegerField(default=0)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = "user_stats"
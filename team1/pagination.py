@@ -1,7 +1,154 @@
-from rest_framework.pagination import PageNumberPagination
+import base64
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
 
 
 class CustomPagination(PageNumberPagination):
     page_size = 10  # Default page size
     page_size_query_param = 'page_size'
     max_page_size = 100
+
+
+class KeysetPagination(BasePagination):
+    """
+    Cursor pagination over (ordering_field, pk), newest first by default.
+
+    A cursor holds the last row's (ordering_field, pk), so every page is one index range
+    read with no COUNT(*) and no OFFSET; any other ordering on the queryset is replaced.
+    Only querysets ordered by a rank expression (search results through `in_rank_order`,
+    which are capped in size) are paged by position, and only up to `max_position` rows
+    (TEAM1_PAGINATION_MAX_POSITION); a cursor past that is rejected.
+    `?include_count=true` adds `count`, a cached and possibly stale total. Views set
+    `truncated` on search results to report that only the best matches were kept.
+    """
+    page_size = 10
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    cursor_query_param = 'cursor'
+    count_query_param = 'include_count'
+    ordering_field = 'created_at'
+    descending = True
+    truncated = None
+
+    @property
+    def max_position(self):
+        return getattr(settings, 'TEAM1_PAGINATION_MAX_POSITION', 1000)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.size = self.get_page_size(request)
+        cursor = self.decode_cursor(request)
+        self.count = self.approximate_count(queryset) if self.include_count(request) else None
+
+        field = self.ordering_field
+        if self.is_ranked(queryset):
+            return self._paginate_by_position(queryset, cursor.get('o', 0) if cursor else 0)
+        if cursor and 'o' in cursor:
+            raise NotFound('Invalid cursor.')
+
+        reverse = bool(cursor and cursor.get('r'))
+        # Walking back from a cursor scans against the page order.
+        ascending = self.descending == reverse
+        if cursor:
+            try:
+                value = queryset.model._meta.get_field(field).to_python(cursor['c'])
+            except ValidationError:
+                raise NotFound('Invalid cursor.')
+            after = '__gt' if ascending else '__lt'
+            queryset = queryset.filter(
+                Q(**{field + after: value}) | Q(**{field: value, 'pk' + after: cursor['i']})
+            )
+        order = (field, 'pk') if ascending else ('-' + field, '-pk')
+        rows = list(queryset.order_by(*order)[:self.size + 1])
+        has_more = len(rows) > self.size
+        rows = rows[:self.size]
+        if reverse:
+            rows.reverse()
+
+        self.next_cursor = self.previous_cursor = None
+        if rows:
+            first, last = rows[0], rows[-1]
+            if has_more or reverse:
+                self.next_cursor = {'c': getattr(last, field).isoformat(), 'i': last.pk}
+            if cursor and (has_more or not reverse):
+                self.previous_cursor = {'c': getattr(first, field).isoformat(), 'i': first.pk, 'r': 1}
+        return rows
+
+    @staticmethod
+    def is_ranked(queryset):
+        """Ordered by expressions (a rank), not field names."""
+        ordering = queryset.query.order_by
+        return bool(ordering) and all(hasattr(o, 'resolve_expression') for o in ordering)
+
+    def _paginate_by_position(self, queryset, offset):
+        if offset > self.max_position:
+            raise NotFound('Invalid cursor.')
+        end = min(offset + self.size, self.max_position)
+        rows = list(queryset[offset:end + 1])
+        self.next_cursor = {'o': end} if len(rows) > end - offset and end < self.max_position else None
+        self.previous_cursor = {'o': max(offset - self.size, 0)} if offset else None
+        return rows[:end - offset]
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params.get(self.page_size_query_param, self.page_size))
+        except (TypeError, ValueError):
+            return self.page_size
+        return min(max(size, 1), self.max_page_size)
+
+    def include_count(self, request):
+        return request.query_params.get(self.count_query_param, 'false').lower() == 'true'
+
+    def approximate_count(self, queryset):
+        sql, params = queryset.query.sql_with_params()
+        key = 'approx_count:' + hashlib.md5(f"{sql}{params}".encode()).hexdigest()
+        count = cache.get(key)
+        if count is None:
+            count = queryset.count()
+            cache.set(key, count, getattr(settings, 'TEAM1_APPROX_COUNT_TTL', 300))
+        return count
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            cursor = json.loads(base64.urlsafe_b64decode(encoded.encode()))
+            if 'o' in cursor:
+                return {'o': max(int(cursor['o']), 0)}
+            return {'c': str(cursor['c']), 'i': int(cursor['i']), 'r': 1 if cursor.get('r') else 0}
+        except (TypeError, ValueError, KeyError, AttributeError):
+            raise NotFound('Invalid cursor.')
+
+    def encode_cursor(self, cursor):
+        if cursor is None:
+            return None
+        encoded = base64.urlsafe_b64encode(json.dumps(cursor, separators=(',', ':')).encode()).decode()
+        return replace_query_param(self.request.build_absolute_uri(), self.cursor_query_param, encoded)
+
+    def get_paginated_response(self, data):
+        body = {
+            'next': self.encode_cursor(self.next_cursor),
+            'previous': self.encode_cursor(self.previous_cursor),
+            'results': data,
+        }
+        if self.count is not None:
+            body['count'] = self.count
+        if self.truncated is not None:
+            body['truncated'] = self.truncated
+        return Response(body)
+
+
+class DueDatePagination(KeysetPagination):
+    """Soonest due first, over (next_due_date, pk)."""
+    ordering_field = 'next_due_date'
+    descending = False
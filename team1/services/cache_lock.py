@@ -0,0 +1,45 @@
+"""
+Per-key mutex over the shared cache, for read-modify-write of cached state across workers.
+
+The lock entry holds a random owner token and is only released by its owner
+(`delete_if`, a compare-and-delete), so a holder that overran the TTL cannot release a
+lock another request has taken since. Keep TEAM1_CACHE_LOCK_TTL above the longest
+critical section, e.g. a first word pool build plus a batch of questions.
+"""
+import logging
+import time
+import uuid
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+
+@contextmanager
+def cache_lock(key):
+    lock_key = f"{key}:lock"
+    token = uuid.uuid4().hex
+    ttl = getattr(settings, "TEAM1_CACHE_LOCK_TTL", 60)
+    deadline = time.monotonic() + getattr(settings, "TEAM1_CACHE_LOCK_WAIT", 10)
+    while not cache.add(lock_key, token, ttl):
+        if time.monotonic() > deadline:
+            raise TimeoutError(f"Could not lock {key}")
+        time.sleep(0.005)
+    try:
+        yield
+    finally:
+        if not _release(lock_key, token):
+            logger.warning("Lock on %s expired before it was released", key)
+
+
+def _release(lock_key, token):
+    delete_if = getattr(cache, "delete_if", None)
+    if delete_if is not None:
+        return delete_if(lock_key, token)
+    # Backends without compare-and-delete: only a narrow window remains between get and delete.
+    if cache.get(lock_key) != token:
+        return False
+    cache.delete(lock_key)
+    return True
@@ -1,35 +1,18 @@
-from django.db.models import Count, Avg
-from team1.models import UserWord, Quiz, SurvivalGame
+from team1.models import Quiz, SurvivalGame
+from team1.services.stats_service import ensure_user_stats
 
 QUIZ_TYPE_DAILY = 1
 QUIZ_TYPE_WEEKLY = 2
 QUIZ_TYPE_MONTHLY = 3
 
 
-def get_user_dashboard_stats(*, user_id):
-    total_user_words = UserWord.objects.filter(is_deleted=False, user_id=user_id).count()
+def _quiz_summary(count, scored, score_sum):
+    return {"count": count, "avg_score": score_sum / scored if scored else 0.0}
 
-    box_counts_qs = (
-        UserWord.objects
-        .filter(is_deleted=False, user_id=user_id)
-        .values("leitner_type")  # استفاده از leitner_type جدید
-        .annotate(count=Count("user_word_id"))
-    )
-    box_counts = {row["leitner_type"]: row["count"] for row in box_counts_qs}
 
-    quiz_aggs = (
-        Quiz.objects
-        .filter(is_deleted=False, user_id=user_id)
-        .values("type")
-        .annotate(count=Count("quiz_id"), avg_score=Avg("score"))
-    )
-    quiz_stats = {}
-    for row in quiz_aggs:
-        t = row["type"]
-        quiz_stats[int(t) if t is not None else 0] = {
-            "count": row["count"],
-            "avg_score": float(row["avg_score"]) if row["avg_score"] is not None else 0.0,
-        }
+def get_user_dashboard_stats(*, user_id):
+    # Totals come from the UserStats rollup (one row); only the "recent" lists hit the history tables.
+    stats = ensure_user_stats(user_id)
 
     recent_quizzes = list(
         Quiz.objects
@@ -38,8 +21,6 @@ def get_user_dashboard_stats(*, user_id):
         .values("quiz_id", "type", "score", "date", "created_at")
     )
 
-    game_count = SurvivalGame.objects.filter(is_deleted=False, user_id=user_id).count()
-    game_avg = SurvivalGame.objects.filter(is_deleted=False, user_id=user_id).aggregate(avg=Avg("score"))["avg"]
     recent_games = list(
         SurvivalGame.objects
         .filter(is_deleted=False, user_id=user_id)
@@ -49,24 +30,24 @@ def get_user_dashboard_stats(*, user_id):
 
     return {
         "words": {
-            "total": total_user_words,
+            "total": stats.words_total,
             "by_leitner": {
-                "new": box_counts.get('new', 0),
-                "1_day": box_counts.get('1day', 0),
-                "3_days": box_counts.get('3days', 0),
-                "7_days": box_counts.get('7days', 0),
-                "mastered": box_counts.get('mastered', 0),
+                "new": stats.words_new,
+                "1_day": stats.words_1day,
+                "3_days": stats.words_3days,
+                "7_days": stats.words_7days,
+                "mastered": stats.words_mastered,
             },
         },
         "quizzes": {
-            "daily": quiz_stats.get(QUIZ_TYPE_DAILY, {"count": 0, "avg_score": 0.0}),
-            "weekly": quiz_stats.get(QUIZ_TYPE_WEEKLY, {"count": 0, "avg_score": 0.0}),
-            "monthly": quiz_stats.get(QUIZ_TYPE_MONTHLY, {"count": 0, "avg_score": 0.0}),
+            "daily": _quiz_summary(stats.quiz_daily_count, stats.quiz_daily_scored, stats.quiz_daily_score_sum),
+            "weekly": _quiz_summary(stats.quiz_weekly_count, stats.quiz_weekly_scored, stats.quiz_weekly_score_sum),
+            "monthly": _quiz_summary(stats.quiz_monthly_count, stats.quiz_monthly_scored, stats.quiz_monthly_score_sum),
             "recent": recent_quizzes,
         },
         "games": {
-            "count": game_count,
-            "avg_score": float(game_avg) if game_avg is not None else 0.0,
+            "count": stats.game_count,
+            "avg_score": stats.game_score_sum / stats.game_scored if stats.game_scored else 0.0,
             "recent": recent_games,
         },
     }
@@ -0,0 +1,165 @@
+import random
+from typing import Dict, Iterable, List, Optional
+
+from team1.models import Word, WordDistractorSet
+from team1.services.persian_text import normalize_persian
+from team1.services.word_pool import WordPool, get_word_pool, is_eligible
+
+DISTRACTOR_SET_SIZE = 12
+# Random same-category words considered when ranking one word's candidates.
+_CANDIDATE_SAMPLE = 200
+
+
+def rank_distractors(word: Word, pool: Optional[WordPool] = None, k: int = DISTRACTOR_SET_SIZE, rng=random) -> List[int]:
+    """
+    Up to `k` distractor ids for `word`, best first: same category, Persian text distinct
+    from the word and from each other, closest English length; topped up from any category.
+    """
+    pool = pool or get_word_pool()
+    text = normalize_persian(word.persian)
+    exclude_ids = {word.id}
+    exclude_texts = {text}
+    target_len = len(word.english or "")
+
+    ranked: List[Word] = []
+    if word.category_id:
+        candidates = pool.sample(_CANDIDATE_SAMPLE, exclude_ids=exclude_ids, exclude_texts=exclude_texts,
+                                 category_id=word.category_id, rng=rng)
+        candidates.sort(key=lambda w: abs(len(w.english) - target_len))
+        ranked = candidates[:k]
+
+    if len(ranked) < k:
+        exclude_ids.update(w.id for w in ranked)
+        exclude_texts.update(normalize_persian(w.persian) for w in ranked)
+        ranked += pool.sample(k - len(ranked), exclude_ids=exclude_ids, exclude_texts=exclude_texts, rng=rng)
+
+    return [w.id for w in ranked]
+
+
+def refresh_distractor_set(word: Word, k: int = DISTRACTOR_SET_SIZE):
+    """Recompute and store one word's candidates now."""
+    if word.is_deleted:
+        WordDistractorSet.objects.filter(word_id=word.id).delete()
+        return
+    WordDistractorSet.objects.update_or_create(
+        word_id=word.id, defaults={"distractor_ids": rank_distractors(word, k=k), "is_stale": False}
+    )
+
+
+def mark_word_changed(word: Word, old_category_id=None):
+    """
+    Flag the sets a Word write affects without computing anything: the word's own set
+    (created empty if missing, dropped for a deleted or ineligible word) and those of the
+    words in its old and new category, which may now rank it or no longer can.
+    """
+    if word.is_deleted or not is_eligible(word.english, word.persian):
+        WordDistractorSet.objects.filter(word_id=word.id).delete()
+    else:
+        WordDistractorSet.objects.bulk_create(
+            [WordDistractorSet(word_id=word.id, is_stale=True)],
+            update_conflicts=True, unique_fields=["word"], update_fields=["is_stale"],
+        )
+    mark_categories_stale([word.category_id, old_category_id])
+
+
+def mark_categories_stale(category_ids: Iterable[Optional[int]]):
+    category_ids = {c for c in category_ids if c is not None}
+    if category_ids:
+        WordDistractorSet.objects.filter(word__category_id__in=category_ids, is_stale=False).update(is_stale=True)
+
+
+def mark_words_stale(word_ids: Iterable[int]):
+    word_ids = list(word_ids)
+    if word_ids:
+        WordDistractorSet.objects.filter(word_id__in=word_ids, is_stale=False).update(is_stale=True)
+
+
+def _recompute(word_ids: Iterable[int], k: int = DISTRACTOR_SET_SIZE) -> Dict[int, List[int]]:
+    """Rank and store the sets of `word_ids` from the in-memory pool (words not in it get an empty set)."""
+    pool = get_word_pool()
+    rows = []
+    for word_id in word_ids:
+        word = pool.get(word_id)
+        ranked = rank_distractors(word, pool, k) if word is not None else []
+        rows.append(WordDistractorSet(word_id=word_id, distractor_ids=ranked, is_stale=False))
+    WordDistractorSet.objects.bulk_create(
+        rows, update_conflicts=True, unique_fields=["word"], update_fields=["distractor_ids", "is_stale", "updated_at"]
+    )
+    return {row.word_id: row.distractor_ids for row in rows}
+
+
+def precompute_all(k: int = DISTRACTOR_SET_SIZE, batch_size: int = 1000) -> int:
+    """Recompute every eligible word's candidates from the in-memory pool, upserting in batches."""
+    word_ids = list(get_word_pool().word_ids())
+    for i in range(0, len(word_ids), batch_size):
+        _recompute(word_ids[i:i + batch_size], k)
+    return len(word_ids)
+
+
+def refresh_stale_sets(k: int = DISTRACTOR_SET_SIZE, batch_size: int = 1000) -> int:
+    """Recompute only the sets flagged stale. Returns the number refreshed."""
+    refreshed = 0
+    while True:
+        word_ids = list(WordDistractorSet.objects.filter(is_stale=True).values_list("word_id", flat=True)[:batch_size])
+        if not word_ids:
+            return refreshed
+        _recompute(word_ids, k)
+        refreshed += len(word_ids)
+
+
+def load_distractor_sets(word_ids: Iterable[int]) -> Dict[int, List[int]]:
+    """Stored candidate ids for many words in one query; stale sets among them are recomputed first."""
+    sets, stale = {}, []
+    rows = WordDistractorSet.objects.filter(word_id__in=list(word_ids)).values_list("word_id", "distractor_ids", "is_stale")
+    for word_id, distractor_ids, is_stale in rows:
+        sets[word_id] = distractor_ids
+        if is_stale:
+            stale.append(word_id)
+    if stale:
+        sets.update(_recompute(stale))
+    return sets
+
+
+def pick_from_candidates(word: Word, candidate_ids: List[int], k: int = 3, exclude_ids: Iterable[int] = (),
+                         exclude_texts: Iterable[str] = (), rng=random) -> List[Word]:
+    """
+    Up to `k` words from a stored candidate list, checked against the word pool.
+
+    Candidates that have since been deleted or now share a Persian text are skipped, so
+    fewer than `k` may come back; callers top up from the word pool.
+    """
+    if not candidate_ids:
+        return []
+
+    pool = get_word_pool()
+    exclude_ids = set(exclude_ids) | {word.id}
+    seen_texts = set(exclude_texts) | {normalize_persian(word.persian)}
+
+    # Prefer the best-ranked half, shuffled, so repeated questions vary.
+    head = list(candidate_ids[: max(k * 2, 1)])
+    tail = list(candidate_ids[len(head):])
+    rng.shuffle(head)
+
+    picked: List[Word] = []
+    for word_id in head + tail:
+        if len(picked) >= k:
+            break
+        if word_id in exclude_ids:
+            continue
+        candidate = pool.get(word_id)
+        if candidate is None:
+            continue
+        text = pool.text_of(word_id)
+        if text in seen_texts:
+            continue
+        picked.append(candidate)
+        seen_texts.add(text)
+        exclude_ids.add(word_id)
+    return picked
+
+
+def get_precomputed_distractors(word: Word, k: int = 3, exclude_ids: Iterable[int] = (),
+                                exclude_texts: Iterable[str] = (), rng=random) -> List[Word]:
+    """`k` distractors drawn from the word's stored candidates (one primary-key lookup unless the set is stale)."""
+    candidate_ids = load_distractor_sets([word.id]).get(word.id, [])
+    return pick_from_candidates(word, candidate_ids, k, exclude_ids, exclude_texts, rng)
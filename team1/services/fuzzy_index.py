@@ -0,0 +1,245 @@
+"""
+Typo-tolerant word lookup over a trigram index.
+
+Each word's distinct trigrams (English lowercased, Persian through `normalize_persian`,
+every token padded like pg_trgm: two spaces before, one after) are stored in
+`word_trigrams` and loaded into one process-wide inverted index: per field, a sorted
+array of word ids per trigram. A query is scored against the field matching its script
+with trigram Jaccard similarity, shared / (query + word - shared).
+
+Only words sharing at least `min_similarity * len(query trigrams)` trigrams can reach the
+threshold, so ids are counted from the shortest posting lists alone and the longest
+lists are only probed (bisect) for those candidates.
+
+Word saves keep `word_trigrams` current (team1.signals) and patch the loaded index once
+the save commits. Requests never fill the table: `manage.py rebuild_fuzzy_index` does
+(run it once per deployment and after bulk writes).
+"""
+import heapq
+import logging
+import math
+import re
+import threading
+import time
+from array import array
+from bisect import bisect_left, insort
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from django.conf import settings
+from django.db import transaction
+
+from team1.models import Word, WordTrigramSet
+from team1.services.persian_text import normalize_persian
+from team1.services.word_pool import PERSIAN_CHARS
+
+logger = logging.getLogger(__name__)
+
+FIELDS = ("english", "persian")
+_TOKEN = re.compile(r"\w+")
+
+
+def trigrams(text, field="english") -> List[str]:
+    """Sorted distinct trigrams of `text` as indexed for `field`."""
+    text = normalize_persian(text) if field == "persian" else (text or "").lower()
+    grams = set()
+    for token in _TOKEN.findall(text):
+        padded = f"  {token} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return sorted(grams)
+
+
+def _word_trigrams(english, persian) -> Dict[str, List[str]]:
+    return {"english": trigrams(english, "english"), "persian": trigrams(persian, "persian")}
+
+
+class TrigramIndex:
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._postings: Dict[str, Dict[str, array]] = {f: {} for f in FIELDS}
+        self._sizes: Dict[str, Dict[int, int]] = {f: {} for f in FIELDS}
+        self.built_at = 0.0
+
+    @classmethod
+    def build(cls):
+        index = cls()
+        lists = {f: {} for f in FIELDS}
+        rows = (
+            WordTrigramSet.objects
+            .filter(word__is_deleted=False)
+            .values_list("word_id", "english_trigrams", "persian_trigrams")
+        )
+        for word_id, *field_grams in rows.iterator(chunk_size=5000):
+            for field, grams in zip(FIELDS, field_grams):
+                if not grams:
+                    continue
+                index._sizes[field][word_id] = len(grams)
+                for gram in grams:
+                    lists[field].setdefault(gram, []).append(word_id)
+        for field in FIELDS:
+            index._postings[field] = {gram: array("q", sorted(ids)) for gram, ids in lists[field].items()}
+        index.built_at = time.monotonic()
+        if not len(index) and Word.objects.filter(is_deleted=False).exists():
+            logger.warning("word_trigrams is empty; run `manage.py rebuild_fuzzy_index` to enable fuzzy lookup")
+        return index
+
+    def __len__(self):
+        return len(self._sizes["english"].keys() | self._sizes["persian"].keys())
+
+    def remove_word(self, word_id, old: Dict[str, Iterable[str]]):
+        with self._lock:
+            for field in FIELDS:
+                if self._sizes[field].pop(word_id, None) is None:
+                    continue
+                postings = self._postings[field]
+                for gram in old.get(field, ()):
+                    ids = postings.get(gram)
+                    if ids is None:
+                        continue
+                    i = bisect_left(ids, word_id)
+                    if i < len(ids) and ids[i] == word_id:
+                        del ids[i]
+                    if not ids:
+                        del postings[gram]
+
+    def add_word(self, word_id, new: Dict[str, Iterable[str]]):
+        with self._lock:
+            for field in FIELDS:
+                grams = list(new.get(field, ()))
+                if not grams:
+                    continue
+                self._sizes[field][word_id] = len(grams)
+                postings = self._postings[field]
+                for gram in grams:
+                    insort(postings.setdefault(gram, array("q")), word_id)
+
+    def search(self, query, k: int, min_similarity: float) -> List[Tuple[int, float]]:
+        """Up to `k` (word id, similarity) pairs at or above `min_similarity`, most similar first."""
+        field = "persian" if PERSIAN_CHARS.search(query or "") else "english"
+        grams = trigrams(query, field)
+        if not grams or k <= 0:
+            return []
+        q = len(grams)
+        need = max(1, math.ceil(min_similarity * q - 1e-9))
+
+        with self._lock:
+            postings = self._postings[field]
+            sizes = self._sizes[field]
+            lists = sorted((postings[g] for g in grams if g in postings), key=len)
+            if len(lists) < need:
+                return []
+            # A word missing from all of the q - need + 1 shortest lists shares fewer than `need` trigrams.
+            split = len(lists) - need + 1
+            shared = Counter()
+            for ids in lists[:split]:
+                shared.update(ids)
+            for ids in lists[split:]:
+                n = len(ids)
+                for word_id in shared:
+                    i = bisect_left(ids, word_id)
+                    if i < n and ids[i] == word_id:
+                        shared[word_id] += 1
+
+            scored = []
+            for word_id, s in shared.items():
+                size = sizes.get(word_id)
+                if size is None:  # removed without its old trigrams; the posting is stale
+                    continue
+                similarity = s / (q + size - s)
+                if similarity >= min_similarity:
+                    scored.append((word_id, similarity))
+        return heapq.nlargest(k, scored, key=lambda item: (item[1], -item[0]))
+
+
+_index: Optional[TrigramIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_fuzzy_index() -> TrigramIndex:
+    """The shared index, reloaded after TEAM1_FUZZY_INDEX_MAX_AGE seconds to pick up other workers' edits."""
+    global _index
+    max_age = getattr(settings, "TEAM1_FUZZY_INDEX_MAX_AGE", 300)
+    index = _index
+    if index is None or time.monotonic() - index.built_at > max_age:
+        with _index_lock:
+            if _index is index:
+                _index = TrigramIndex.build()
+            index = _index
+    return index
+
+
+def reset_fuzzy_index():
+    global _index
+    with _index_lock:
+        _index = None
+
+
+def fuzzy_word_ids(query, limit: Optional[int] = None, min_similarity: Optional[float] = None) -> List[int]:
+    """Ids of the live words closest to `query`, most similar first."""
+    if limit is None:
+        limit = getattr(settings, "TEAM1_FUZZY_MAX_RESULTS", 20)
+    if min_similarity is None:
+        min_similarity = getattr(settings, "TEAM1_FUZZY_MIN_SIMILARITY", 0.3)
+    return [word_id for word_id, _ in get_fuzzy_index().search(query, limit, min_similarity)]
+
+
+def refresh_word_trigrams(word: Word):
+    """Store one saved word's trigrams; a loaded index is patched once the save commits."""
+    old = WordTrigramSet.objects.filter(word_id=word.id).first()
+    old_grams = {"english": old.english_trigrams, "persian": old.persian_trigrams} if old else {}
+    if word.is_deleted:
+        if old:
+            old.delete()
+        new_grams = {}
+    else:
+        new_grams = _word_trigrams(word.english, word.persian)
+        if old is None:
+            WordTrigramSet.objects.create(
+                word_id=word.id, english_trigrams=new_grams["english"], persian_trigrams=new_grams["persian"]
+            )
+        elif old_grams != new_grams:
+            old.english_trigrams, old.persian_trigrams = new_grams["english"], new_grams["persian"]
+            old.save()
+
+    def apply():
+        index = _index
+        if index is not None:
+            index.remove_word(word.id, old_grams)
+            index.add_word(word.id, new_grams)
+
+    transaction.on_commit(apply, using="team1")
+
+
+def forget_word(word: Word):
+    """Drop a hard-deleted word from a loaded index after commit (its row goes with the word via CASCADE)."""
+    old_grams = _word_trigrams(word.english, word.persian)
+
+    def apply():
+        index = _index
+        if index is not None:
+            index.remove_word(word.id, old_grams)
+
+    transaction.on_commit(apply, using="team1")
+
+
+def rebuild_trigram_table(batch_size: int = 2000) -> int:
+    """Recompute every live word's trigrams and drop the loaded index. Returns the number of words written."""
+    written = 0
+    rows = Word.objects.filter(is_deleted=False).values_list("id", "english", "persian")
+    with transaction.atomic(using="team1"):
+        WordTrigramSet.objects.all().delete()
+        batch = []
+        for word_id, english, persian in rows.iterator(chunk_size=batch_size):
+            grams = _word_trigrams(english, persian)
+            batch.append(WordTrigramSet(
+                word_id=word_id, english_trigrams=grams["english"], persian_trigrams=grams["persian"]
+            ))
+            if len(batch) >= batch_size:
+                WordTrigramSet.objects.bulk_create(batch)
+                written += len(batch)
+                batch = []
+        if batch:
+            WordTrigramSet.objects.bulk_create(batch)
+            written += len(batch)
+    reset_fuzzy_index()
+    return written
@@ -0,0 +1,51 @@
+"""
+Look-ahead buffer of prepared survival questions.
+
+Works on a state dict holding `items` (prepared questions), `used` (an IdSet of words the
+game has drawn) and `active` (the question awaiting an answer); services.game_session keeps
+that state in the game's cached session and calls these under the session lock.
+"""
+import random
+from typing import Dict, Optional, Tuple
+
+from django.conf import settings
+
+from team1.services.question_generator import build_game_questions
+
+
+def _buffer_size():
+    return getattr(settings, "TEAM1_GAME_BUFFER_SIZE", 5)
+
+
+def top_up(state, rng=random):
+    """Refill the look-ahead to the buffer size in one batch, on words the game has not used yet."""
+    missing = _buffer_size() - len(state["items"])
+    if missing <= 0:
+        return
+    for q in build_game_questions(count=missing, used_word_ids=state["used"], rng=rng):
+        answer_text = next(o["text"] for o in q["options"] if o["word_id"] == q["answer_word_id"])
+        options = tuple((o["word_id"], o["text"]) for o in q["options"])
+        state["items"].append((q["prompt"], q["answer_word_id"], answer_text, options))
+
+
+def pop_question(state, rng=random) -> Optional[Dict]:
+    """
+    Pop the next prepared question as {"prompt", "options"} and make it the one awaiting an
+    answer; None once every word has been used. The buffer is topped up once it drops to
+    TEAM1_GAME_LOW_WATER questions, so most calls are a plain pop.
+    """
+    if len(state["items"]) <= getattr(settings, "TEAM1_GAME_LOW_WATER", 1):
+        top_up(state, rng)
+    if not state["items"]:
+        return None
+
+    prompt, answer_id, answer_text, options = state["items"].pop(0)
+    state["active"] = (answer_id, answer_text)
+    return {"prompt": prompt, "options": [{"word_id": word_id, "text": text} for word_id, text in options]}
+
+
+def take_active(state) -> Optional[Tuple[int, str]]:
+    """(answer_id, answer_text) of the question last handed out, cleared so it is graded once."""
+    active = state["active"]
+    state["active"] = None
+    return active
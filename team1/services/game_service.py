@@ -1,8 +1,7 @@
-from django.db.models import Max
 from django.utils import timezone
 
-from core.models import User
-from team1.models import SurvivalGame
+from team1.models import SurvivalGame, SurvivalLeaderboardEntry
+from team1.services.leaderboard import recompute_user, record_score, top_scores, user_rank
 
 
 def create_survival_game(user_id, score, lives):
@@ -13,6 +12,7 @@ def create_survival_game(user_id, score, lives):
         lives=lives,
         date=timezone.now().date()
     )
+    record_score(user_id, score, game.date)
     return game
 
 def get_user_survival_games(user_id):
@@ -31,11 +31,17 @@ def update_survival_game(game_id, user_id, score=None, lives=None):
     # Update a specific survival game
     game = get_survival_game_by_id(game_id, user_id)
     if game:
+        previous_score = game.score
         if score is not None:
             game.score = score
         if lives is not None:
             game.lives = lives
         game.save()
+        if previous_score is not None and game.score < previous_score:
+            # record_score only keeps improvements; the old best may have been this game.
+            recompute_user(user_id, game.date)
+        else:
+            record_score(user_id, game.score, game.date)
         return game
     return None
 
@@ -44,60 +50,23 @@ def delete_survival_game(game_id, user_id):
     try:
         game = SurvivalGame.objects.get(survival_game_id=game_id, user_id=user_id)
         game.delete()
+        if game.score is not None:
+            recompute_user(user_id, game.date)
     except SurvivalGame.DoesNotExist:
         raise ValueError("Survival game not found or you are not authorized to delete this game.")
 
 
-def get_top_survival_game_rankings():
+def get_top_survival_game_rankings(period_type=SurvivalLeaderboardEntry.PERIOD_ALL_TIME, limit=5):
     """
-    Returns a list of dictionaries containing user details and their max score.
+    Returns a list of dictionaries containing user details and their max score,
+    read from the incrementally maintained leaderboard (services.leaderboard).
     """
-    # 1. Get top 5 user_ids and their max scores
-    top_games = (
-        SurvivalGame.objects
-        .values("user_id")
-        .annotate(max_score=Max("score"))
-        .order_by("-max_score")[:5]
-    )
-
-    # 2. Extract the list of UUIDs
-    user_ids = [game['user_id'] for game in top_games]
-
-    # 3. Fetch User details for these IDs in one query
-    users = User.objects.filter(id__in=user_ids).values(
-        'id', 'first_name', 'last_name', 'email'
-    )
-
-    # 4. Create a lookup dictionary for fast access: {uuid: user_data}
-    user_map = {u['id']: u for u in users}
+    return top_scores(period_type, limit)
 
-    # 5. Merge the data
-    results = []
-    for game in top_games:
-        uid = game['user_id']
-        user_info = user_map.get(uid, {})
 
-        results.append({
-            "user_id": uid,
-            "max_score": game['max_score'],
-            "first_name": user_info.get('first_name', ''),
-            "last_name": user_info.get('last_name', ''),
-            "email": user_info.get('email', '')
-        })
-
-    return results
-
-
-def get_user_survival_game_rank(user_id):
+def get_user_survival_game_rank(user_id, period_type=SurvivalLeaderboardEntry.PERIOD_ALL_TIME):
     """
     Returns a tuple: (rank_integer, full_user_data_dict)
-    or (None, None) if not in top 5.
+    or (None, None) if the user has no score in the period.
     """
-    all_top_users = get_top_survival_game_rankings()
-
-    for index, data in enumerate(all_top_users):
-        # Compare UUIDs (convert to str to be safe)
-        if str(data["user_id"]) == str(user_id):
-            return index + 1, data
-
-    return None, None
\ No newline at end of file
+    return user_rank(user_id, period_type)
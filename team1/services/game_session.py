@@ -0,0 +1,234 @@
+"""
+Server-side survival game sessions.
+
+A running game lives in one cache entry: score, lives, and the look-ahead buffer state of
+services.game_queue (prepared questions, the words already used and the question awaiting
+an answer, with its text). Every change happens under a per-game lock (services.cache_lock),
+so concurrent clicks cannot lose an update. The SurvivalGame row is written behind: at game over, once
+TEAM1_GAME_CHECKPOINT_ANSWERS answers or TEAM1_GAME_CHECKPOINT_SECONDS have passed since
+the last write, and by a per-process background flusher (also run at exit) for sessions
+that went idle before a checkpoint was due; idle sessions are thus written long before
+their cache entry expires. Each write also stores the words used so far, so a session
+reopened from the row (cache expiry or eviction) resumes score, lives and used words.
+If a worker dies, the answers since the last write (at most TEAM1_GAME_CHECKPOINT_ANSWERS,
+or TEAM1_GAME_CHECKPOINT_SECONDS worth) are lost.
+"""
+import atexit
+import logging
+import random
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections, transaction
+from django.utils import timezone
+
+from team1.models import SurvivalGame
+from team1.services.cache_lock import cache_lock
+from team1.services.game_queue import pop_question, take_active, top_up
+from team1.services.id_set import IdSet
+from team1.services.leaderboard import record_score
+from team1.services.stats_service import apply_delta
+
+logger = logging.getLogger(__name__)
+
+SESSION_TIMEOUT = 60 * 60
+
+
+def _session_key(user_id, game_id):
+    return f"team1:game_session:{user_id}:{game_id}"
+
+
+def _new_session(game) -> Dict:
+    return {
+        "user_id": str(game.user_id),
+        "game_id": game.survival_game_id,
+        "date": game.date,
+        "score": game.score or 0,
+        "lives": game.lives or 0,
+        "row_score": game.score or 0,
+        "row_scored": game.score is not None,
+        "items": [],
+        "used": IdSet(game.used_word_ids or ()),
+        "active": None,
+        "unflushed": 0,
+        "flushed_at": time.time(),
+    }
+
+
+def start_game_session(game, rng=random):
+    """Open the session of a new game and prepare its first questions."""
+    session = _new_session(game)
+    top_up(session, rng)
+    cache.set(_session_key(game.user_id, game.survival_game_id), session, SESSION_TIMEOUT)
+
+
+@contextmanager
+def game_session(user_id, game_id):
+    """
+    Lock and yield the game's session dict (None if the user has no such game), saving it
+    back on exit and writing the SurvivalGame row when a checkpoint is due. A session that
+    has expired from the cache is reopened from the row.
+    """
+    key = _session_key(user_id, game_id)
+    with cache_lock(key):
+        session = cache.get(key)
+        if session is None:
+            game = SurvivalGame.objects.filter(survival_game_id=game_id, user_id=user_id).first()
+            if game is None:
+                yield None
+                return
+            session = _new_session(game)
+
+        yield session
+
+        if session["unflushed"] and _checkpoint_due(session):
+            _flush(session)
+        if session["unflushed"]:
+            _flusher.track(user_id, game_id)
+        cache.set(key, session, SESSION_TIMEOUT)
+
+
+def next_game_question(session, rng=random) -> Optional[Dict]:
+    """Pop the next prepared question and make it the one awaiting an answer (see services.game_queue)."""
+    return pop_question(session, rng)
+
+
+def answer_game_question(session, selected_word_id) -> Optional[Dict]:
+    """
+    Grade the active question (once) and apply it to score/lives. None if no question is
+    awaiting an answer.
+    """
+    active = take_active(session)
+    if active is None:
+        return None
+    correct_id, correct_text = active
+
+    is_correct = int(selected_word_id) == int(correct_id)
+    if is_correct:
+        session["score"] += 1
+    else:
+        session["lives"] -= 1
+    session["unflushed"] += 1
+
+    return {
+        "is_correct": is_correct,
+        "correct_word_id": correct_id,
+        "correct_answer_text": correct_text,
+        "score": session["score"],
+        "lives": session["lives"],
+        "game_over": session["lives"] <= 0,
+    }
+
+
+def _checkpoint_due(session):
+    return (
+        session["lives"] <= 0
+        or session["unflushed"] >= getattr(settings, "TEAM1_GAME_CHECKPOINT_ANSWERS", 10)
+        or time.time() - session["flushed_at"] >= getattr(settings, "TEAM1_GAME_CHECKPOINT_SECONDS", 30)
+    )
+
+
+def _flush(session):
+    with transaction.atomic(using="team1"):
+        updated = SurvivalGame.objects.filter(survival_game_id=session["game_id"], user_id=session["user_id"]).update(
+            score=session["score"], lives=session["lives"], used_word_ids=list(session["used"]),
+            updated_at=timezone.now(),
+        )
+        # update() sends no signals, so move the UserStats rollup here.
+        if updated:
+            apply_delta(session["user_id"], {
+                "game_score_sum": session["score"] - session.get("row_score", 0),
+                "game_scored": 0 if session.get("row_scored", True) else 1,
+            })
+    session["row_score"] = session["score"]
+    session["row_scored"] = True
+    record_score(session["user_id"], session["score"], session.get("date"))
+    session["unflushed"] = 0
+    session["flushed_at"] = time.time()
+
+
+def flush_game_session(user_id, game_id):
+    """Write a session's pending score/lives now (no-op if already written or gone)."""
+    key = _session_key(user_id, game_id)
+    with cache_lock(key):
+        session = cache.get(key)
+        if session is None or not session["unflushed"]:
+            return False
+        _flush(session)
+        cache.set(key, session, SESSION_TIMEOUT)
+        return True
+
+
+def current_score_and_lives(user_id, game_id):
+    """(score, lives) of a live session, possibly ahead of the row; None without one."""
+    session = cache.get(_session_key(user_id, game_id))
+    return (session["score"], session["lives"]) if session else None
+
+
+def sync_game_session(game):
+    """Adopt score/lives written to the row directly (PATCH), so a later flush does not undo them."""
+    key = _session_key(game.user_id, game.survival_game_id)
+    with cache_lock(key):
+        session = cache.get(key)
+        if session is None:
+            return
+        session["score"] = game.score or 0
+        session["lives"] = game.lives or 0
+        session["row_score"] = game.score or 0
+        session["row_scored"] = game.score is not None
+        session["unflushed"] = 0
+        session["flushed_at"] = time.time()
+        cache.set(key, session, SESSION_TIMEOUT)
+
+
+def drop_game_session(user_id, game_id):
+    """Forget a session without writing it (the game row was edited or deleted directly)."""
+    cache.delete(_session_key(user_id, game_id))
+
+
+class _IdleFlusher:
+    """Writes sessions this process left unflushed once they have been idle for a checkpoint interval."""
+
+    def __init__(self):
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def track(self, user_id, game_id):
+        with self._lock:
+            self._pending[(str(user_id), int(game_id))] = time.monotonic()
+            if not getattr(settings, "TEAM1_GAME_BACKGROUND_FLUSH", True):
+                return
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="team1-game-sessions", daemon=True)
+                self._thread.start()
+
+    def flush_idle(self, max_idle=None):
+        if max_idle is None:
+            max_idle = getattr(settings, "TEAM1_GAME_CHECKPOINT_SECONDS", 30)
+        now = time.monotonic()
+        with self._lock:
+            due = [k for k, touched in self._pending.items() if now - touched >= max_idle]
+            for k in due:
+                del self._pending[k]
+        for user_id, game_id in due:
+            try:
+                flush_game_session(user_id, game_id)
+            except Exception:
+                logger.exception("Flushing survival game %s failed", game_id)
+
+    def _run(self):
+        while True:
+            time.sleep(getattr(settings, "TEAM1_GAME_CHECKPOINT_SECONDS", 30))
+            try:
+                self.flush_idle()
+            finally:
+                connections.close_all()
+
+
+_flusher = _IdleFlusher()
+atexit.register(_flusher.flush_idle, 0)
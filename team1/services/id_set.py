@@ -0,0 +1,111 @@
+from array import array
+from bisect import bisect_left
+from typing import Dict, Iterable, Iterator, Union
+
+# Ids are grouped by id >> 16; a group keeps its low 16 bits as a sorted array('H') until it
+# holds this many ids, then switches to an 8 KiB bitmap (the same split as roaring bitmaps).
+_ARRAY_MAX = 4096
+_BITMAP_BYTES = 1 << 13
+
+
+class IdSet:
+    """
+    Compact set of non-negative integer ids, e.g. the words a survival game has used.
+
+    Membership is a bit test or a binary search over at most 4096 shorts, and the pickled
+    form is about two bytes per id for the usual few-hundred-id game, instead of a Python
+    list or set of ints. Supports the set operations the question generator uses:
+    `in`, `add`, `update`, `len` and iteration.
+    """
+
+    __slots__ = ("_groups", "_len")
+
+    def __init__(self, ids: Iterable[int] = ()):
+        self._groups: Dict[int, Union[array, bytearray]] = {}
+        self._len = 0
+        self.update(ids)
+
+    def __len__(self):
+        return self._len
+
+    def __bool__(self):
+        return self._len > 0
+
+    def __contains__(self, word_id) -> bool:
+        group = self._groups.get(word_id >> 16)
+        if group is None:
+            return False
+        low = word_id & 0xFFFF
+        if isinstance(group, bytearray):
+            return bool(group[low >> 3] & (1 << (low & 7)))
+        i = bisect_left(group, low)
+        return i < len(group) and group[i] == low
+
+    def add(self, word_id: int):
+        if word_id < 0:
+            raise ValueError("IdSet holds non-negative ids only")
+        high, low = word_id >> 16, word_id & 0xFFFF
+        group = self._groups.get(high)
+        if group is None:
+            self._groups[high] = array("H", [low])
+            self._len += 1
+            return
+
+        if isinstance(group, bytearray):
+            mask = 1 << (low & 7)
+            if not group[low >> 3] & mask:
+                group[low >> 3] |= mask
+                self._len += 1
+            return
+
+        i = bisect_left(group, low)
+        if i < len(group) and group[i] == low:
+            return
+        group.insert(i, low)
+        self._len += 1
+        if len(group) > _ARRAY_MAX:
+            bitmap = bytearray(_BITMAP_BYTES)
+            for v in group:
+                bitmap[v >> 3] |= 1 << (v & 7)
+            self._groups[high] = bitmap
+
+    def update(self, ids: Iterable[int]):
+        for word_id in ids:
+            self.add(word_id)
+
+    def __iter__(self) -> Iterator[int]:
+        for high in sorted(self._groups):
+            group = self._groups[high]
+            base = high << 16
+            if isinstance(group, bytearray):
+                for byte_index, byte in enumerate(group):
+                    if byte:
+                        for bit in range(8):
+                            if byte & (1 << bit):
+                                yield base + (byte_index << 3) + bit
+            else:
+                for low in group:
+                    yield base + low
+
+    def __eq__(self, other):
+        if isinstance(other, IdSet):
+            return self._len == other._len and list(self) == list(other)
+        return NotImplemented
+
+    def __repr__(self):
+        return f"IdSet(<{self._len} ids>)"
+
+    def __getstate__(self):
+        return self._len, [(high, group.tobytes() if isinstance(group, array) else bytes(group), isinstance(group, bytearray))
+                           for high, group in self._groups.items()]
+
+    def __setstate__(self, state):
+        self._len, groups = state
+        self._groups = {}
+        for high, raw, is_bitmap in groups:
+            if is_bitmap:
+                self._groups[high] = bytearray(raw)
+            else:
+                group = array("H")
+                group.frombytes(raw)
+                self._groups[high] = group
@@ -0,0 +1,162 @@
+"""
+Survival leaderboard: each user's best score per period (all time, ISO week, day).
+
+Entries are upserted whenever a game's score is written (game sessions flush it, PATCH
+sets it), keeping only improvements, so reads never touch `survival_game`. A write that
+lowers or removes a score recomputes that user's entries for the game's periods from
+their games instead. Top-N is an index range read and a user's exact rank is one count
+over the same index (entries ahead of them); ties go to whoever reached the score first.
+`manage.py rebuild_survival_leaderboard` recomputes everything from the games table.
+"""
+from datetime import date, timedelta
+from typing import Iterable, List, Optional, Tuple
+
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from core.user_lookup import get_user_summaries
+from team1.models import SurvivalGame, SurvivalLeaderboardEntry as Entry
+
+PERIODS = (Entry.PERIOD_ALL_TIME, Entry.PERIOD_WEEK, Entry.PERIOD_DAY)
+_ALL_TIME_START = date(1970, 1, 1)
+
+
+def period_start(period_type: str, day: date) -> date:
+    if period_type == Entry.PERIOD_ALL_TIME:
+        return _ALL_TIME_START
+    if period_type == Entry.PERIOD_WEEK:
+        return day - timedelta(days=day.weekday())
+    if period_type == Entry.PERIOD_DAY:
+        return day
+    raise ValueError(f"Unknown leaderboard period {period_type!r}")
+
+
+def record_score(user_id, score, day: Optional[date] = None):
+    """
+    Fold one game's score into the user's entries for every period containing `day`
+    (default today). One query when nothing improves.
+    """
+    if score is None:
+        return
+    day = day or timezone.localdate()
+    now = timezone.now()
+    starts = {p: period_start(p, day) for p in PERIODS}
+
+    match = Q()
+    for p, start in starts.items():
+        match |= Q(period_type=p, period_start=start)
+    existing = {e.period_type: e for e in Entry.objects.filter(match, user_id=user_id)}
+
+    missing = [
+        Entry(period_type=p, period_start=start, user_id=user_id, best_score=score, achieved_at=now)
+        for p, start in starts.items() if p not in existing
+    ]
+    if missing:
+        # A concurrent first write for the same period loses here and is retried as an update below.
+        Entry.objects.bulk_create(missing, ignore_conflicts=True)
+
+    for p, start in starts.items():
+        if p not in existing or existing[p].best_score < score:
+            Entry.objects.filter(
+                period_type=p, period_start=start, user_id=user_id, best_score__lt=score
+            ).update(best_score=score, achieved_at=now)
+
+
+def _fold(best, user_id, score, day, created_at):
+    day = day or timezone.localtime(created_at).date()
+    for p in PERIODS:
+        key = (p, period_start(p, day), user_id)
+        current = best.get(key)
+        # Fed in creation order, so only a strictly higher score moves achieved_at.
+        if current is None or score > current[0]:
+            best[key] = (score, created_at)
+
+
+def recompute_user(user_id, day: Optional[date] = None):
+    """
+    Recompute the user's entries for every period containing `day` from their games, for
+    writes that lower a score (which `record_score` would ignore). Periods left without a
+    scored game lose the entry.
+    """
+    day = day or timezone.localdate()
+    starts = {p: period_start(p, day) for p in PERIODS}
+    best = {}
+    rows = (
+        SurvivalGame.objects
+        .filter(user_id=user_id, score__isnull=False)
+        .values_list("score", "date", "created_at")
+        .order_by("created_at")
+    )
+    for score, game_day, created_at in rows:
+        _fold(best, user_id, score, game_day, created_at)
+
+    with transaction.atomic(using="team1"):
+        for p, start in starts.items():
+            found = best.get((p, start, user_id))
+            if found is None:
+                Entry.objects.filter(period_type=p, period_start=start, user_id=user_id).delete()
+            else:
+                Entry.objects.update_or_create(
+                    period_type=p, period_start=start, user_id=user_id,
+                    defaults={"best_score": found[0], "achieved_at": found[1]},
+                )
+
+
+def _board(period_type, day):
+    day = day or timezone.localdate()
+    return Entry.objects.filter(period_type=period_type, period_start=period_start(period_type, day))
+
+
+def _with_users(entries: Iterable[Entry]) -> List[dict]:
+    entries = list(entries)
+    user_map = get_user_summaries(e.user_id for e in entries)
+    results = []
+    for e in entries:
+        user_info = user_map.get(e.user_id, {})
+        results.append({
+            "user_id": e.user_id,
+            "max_score": e.best_score,
+            "first_name": user_info.get('first_name', ''),
+            "last_name": user_info.get('last_name', ''),
+            "email": user_info.get('email', ''),
+        })
+    return results
+
+
+def top_scores(period_type=Entry.PERIOD_ALL_TIME, limit=5, day: Optional[date] = None) -> List[dict]:
+    return _with_users(_board(period_type, day).order_by("-best_score", "achieved_at")[:limit])
+
+
+def user_rank(user_id, period_type=Entry.PERIOD_ALL_TIME, day: Optional[date] = None) -> Tuple[Optional[int], Optional[dict]]:
+    """(1-based rank, user data) of `user_id` in the period, or (None, None) if they have no score in it."""
+    board = _board(period_type, day)
+    entry = board.filter(user_id=user_id).first()
+    if entry is None:
+        return None, None
+    ahead = board.filter(
+        Q(best_score__gt=entry.best_score) | Q(best_score=entry.best_score, achieved_at__lt=entry.achieved_at)
+    ).count()
+    return ahead + 1, _with_users([entry])[0]
+
+
+def rebuild_leaderboard(batch_size=5000) -> int:
+    """Recompute every entry from `survival_game`. Returns the number of entries written."""
+    best = {}
+    rows = (
+        SurvivalGame.objects
+        .filter(score__isnull=False)
+        .values_list("user_id", "score", "date", "created_at")
+        .order_by("created_at")
+    )
+    for user_id, score, day, created_at in rows.iterator(chunk_size=batch_size):
+        _fold(best, user_id, score, day, created_at)
+
+    entries = [
+        Entry(period_type=p, period_start=start, user_id=user_id, best_score=score, achieved_at=achieved_at)
+        for (p, start, user_id), (score, achieved_at) in best.items()
+    ]
+    with transaction.atomic(using="team1"):
+        Entry.objects.all().delete()
+        Entry.objects.bulk_create(entries, batch_size=batch_size)
+    return len(entries)
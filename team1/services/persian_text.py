@@ -0,0 +1,25 @@
+import re
+
+# Arabic code points commonly typed instead of their Persian forms.
+_CHAR_MAP = str.maketrans({
+    "\u064a": "\u06cc",  # Arabic yeh -> Persian yeh
+    "\u0649": "\u06cc",  # Alef maksura -> Persian yeh
+    "\u0643": "\u06a9",  # Arabic kaf -> Persian kaf
+    "\u0629": "\u0647",  # Teh marbuta -> heh
+    "\u200c": " ",  # ZWNJ
+})
+
+# Harakat, superscript alef and tatweel.
+_DIACRITICS = re.compile(r"[\u064b-\u0652\u0670\u0640]")
+_SPACES = re.compile(r"\s+")
+
+
+def normalize_persian(text) -> str:
+    """
+    Canonical form used to compare and index Persian text: unified yeh/kaf,
+    no diacritics, ZWNJ treated as a space, collapsed whitespace.
+    """
+    if not text:
+        return ""
+    text = _DIACRITICS.sub("", text.translate(_CHAR_MAP))
+    return _SPACES.sub(" ", text).strip()
@@ -1,122 +1,40 @@
 import random
-import re
 from typing import Iterable, List, Dict, Set, Optional
 
-from django.db.models import Min, Max
 from team1.models import Word, UserWord
-
-
-def _word_bounds():
-    agg = Word.objects.filter(is_deleted=False).aggregate(min_id=Min("id"), max_id=Max("id"))
-    return (agg["min_id"] or 1), (agg["max_id"] or 1)
+from team1.services.distractor_service import get_precomputed_distractors, load_distractor_sets, pick_from_candidates
+from team1.services.persian_text import normalize_persian
+from team1.services.word_pool import get_word_pool
 
 
 def _pick_random_word_excluding(exclude_ids: Set[int]) -> Optional[Word]:
-    min_id, max_id = _word_bounds()
-    if min_id > max_id:
-        return None
-
-    for _ in range(40):
-        rid = random.randint(min_id, max_id)
-
-        w = (
-            Word.objects
-            .filter(is_deleted=False, id__gte=rid)
-            .exclude(id__in=exclude_ids)
-            .order_by("id")
-            .first()
-        )
-
-        if not w:
-            w = (
-                Word.objects
-                .filter(is_deleted=False, id__lt=rid)
-                .exclude(id__in=exclude_ids)
-                .order_by("-id")
-                .first()
-            )
-
-        if w and w.english and w.persian:
-            if re.search(r'[\u0600-\u06FF]', w.english):
-                continue
+    picked = get_word_pool().sample(1, exclude_ids=exclude_ids)
+    return picked[0] if picked else None
 
-            return w
 
-    return None
-
-
-def _pick_distractors(*, correct_word: Word, exclude_ids: Set[int], k: int = 3) -> List[Word]:
-    distractors: List[Word] = []
+def _pick_distractors(*, correct_word: Word, exclude_ids: Set[int], k: int = 3,
+                      exclude_texts: Iterable[str] = (), rng=random) -> List[Word]:
+    pool = get_word_pool()
     local_exclude_ids = set(exclude_ids)
     local_exclude_ids.add(correct_word.id)
 
-    seen_texts = set()
+    seen_texts = set(exclude_texts)
     if correct_word.persian:
-        seen_texts.add(correct_word.persian.strip())
-
-    def take_from_queryset(qs, need: int):
-        nonlocal distractors, local_exclude_ids, seen_texts
-        if need <= 0:
-            return 0
-
-        candidates_ids = list(qs.exclude(id__in=local_exclude_ids).values_list("id", flat=True)[: need * 50])
-
-        if not candidates_ids:
-            return 0
-
-        random.shuffle(candidates_ids)
-        picked_count = 0
-
-        candidate_objs = list(Word.objects.filter(id__in=candidates_ids[:need * 5]))
-        random.shuffle(candidate_objs)
-
-        for w in candidate_objs:
-            if w.id in local_exclude_ids:
-                continue
-
-            if not w.english or not w.persian:
-                continue
-            if re.search(r'[\u0600-\u06FF]', w.english):
-                continue
-
-            text = w.persian.strip()
-            if text in seen_texts:
-                local_exclude_ids.add(w.id)
-                continue
-
-            distractors.append(w)
-            local_exclude_ids.add(w.id)
-            seen_texts.add(text)
-            picked_count += 1
-
-            if picked_count >= need:
-                break
-
-        return picked_count
+        seen_texts.add(normalize_persian(correct_word.persian))
 
+    distractors: List[Word] = []
+    # Same category first, then anywhere; the pool guarantees distinct Persian texts.
     if correct_word.category_id:
-        needed = k - len(distractors)
-        take_from_queryset(
-            Word.objects.filter(is_deleted=False, category_id=correct_word.category_id),
-            needed
+        distractors = pool.sample(
+            k, exclude_ids=local_exclude_ids, exclude_texts=seen_texts, category_id=correct_word.category_id, rng=rng
         )
 
-    attempts = 0
-    while len(distractors) < k and attempts < 100:
-        attempts += 1
-        w = _pick_random_word_excluding(local_exclude_ids)
-        if not w:
-            break
-
-        text = (w.persian or "").strip()
-
-        if text in seen_texts:
-            local_exclude_ids.add(w.id)
-            continue
-
-        distractors.append(w)
-        local_exclude_ids.add(w.id)
-        seen_texts.add(text)
+    if len(distractors) < k:
+        local_exclude_ids.update(w.id for w in distractors)
+        seen_texts.update(normalize_persian(w.persian) for w in distractors)
+        distractors += pool.sample(
+            k - len(distractors), exclude_ids=local_exclude_ids, exclude_texts=seen_texts, rng=rng
+        )
 
     return distractors[:k]
 
@@ -131,9 +49,16 @@ def build_mcq_for_word(*, word: Word, exclude_option_texts: Optional[Set[str]] =
     if not correct["text"]:
         raise ValueError("Word has empty persian")
 
-    # اینجا ۳ گزینه غلط را می‌گیریم. خود تابع _pick_distractors تضمین می‌کند
-    # که متن فارسی آن‌ها با `word` و با یکدیگر تکراری نباشد.
-    distractors = _pick_distractors(correct_word=word, exclude_ids=set(), k=3)
+    # اینجا ۳ گزینه غلط را می‌گیریم: اول از مجموعه‌ی از پیش محاسبه‌شده‌ی کلمه،
+    # و اگر کم بود از _pick_distractors. متن فارسی گزینه‌ها با `word` و با یکدیگر تکراری نیست.
+    distractors = get_precomputed_distractors(word, k=3)
+    if len(distractors) < 3:
+        distractors += _pick_distractors(
+            correct_word=word,
+            exclude_ids={w.id for w in distractors},
+            exclude_texts={normalize_persian(w.persian) for w in distractors},
+            k=3 - len(distractors),
+        )
 
     options = [correct] + [{"word_id": w.id, "text": (w.persian or "").strip()} for w in distractors]
 
@@ -164,7 +89,52 @@ def build_mcq_for_word(*, word: Word, exclude_option_texts: Optional[Set[str]] =
     }
 
 
-def build_quiz_questions_for_user(*, user_id, count: int) -> List[Dict]:
+def build_mcq_batch(words: List[Word], *, rng=random) -> List[Dict]:
+    """
+    One question per word (same shape as build_mcq_for_word) with a single query for the
+    stored distractor sets of the whole batch; everything else comes from the word pool.
+
+    A word is offered at most once across the batch: distractors do not repeat between
+    questions and never show another question's answer. If the pool is too small for that,
+    a question falls back to options that are only distinct within itself. Words with an
+    empty Persian text are skipped. Pass a seeded `random.Random` for reproducible output.
+    """
+    words = [w for w in words if (w.persian or "").strip()]
+    candidate_sets = load_distractor_sets(w.id for w in words)
+
+    used_ids = {w.id for w in words}
+    used_texts = {normalize_persian(w.persian) for w in words}
+
+    questions: List[Dict] = []
+    for word in words:
+        distractors = pick_from_candidates(word, candidate_sets.get(word.id, []), 3, used_ids, used_texts, rng)
+        for exclude_ids, exclude_texts in ((used_ids, used_texts), (set(), set())):
+            if len(distractors) >= 3:
+                break
+            distractors += _pick_distractors(
+                correct_word=word,
+                exclude_ids=exclude_ids | {w.id for w in distractors},
+                exclude_texts=exclude_texts | {normalize_persian(w.persian) for w in distractors},
+                k=3 - len(distractors),
+                rng=rng,
+            )
+
+        used_ids.update(w.id for w in distractors)
+        used_texts.update(normalize_persian(w.persian) for w in distractors)
+
+        options = [{"word_id": w.id, "text": (w.persian or "").strip()} for w in [word] + distractors]
+        rng.shuffle(options)
+        questions.append({
+            "prompt": (word.english or "").strip(),
+            "word_id": word.id,
+            "options": options,
+            "answer_word_id": word.id,
+        })
+
+    return questions
+
+
+def build_quiz_questions_for_user(*, user_id, count: int, rng=random) -> List[Dict]:
     word_ids = list(
         UserWord.objects
         .filter(is_deleted=False, user_id=user_id)
@@ -178,38 +148,24 @@ def build_quiz_questions_for_user(*, user_id, count: int) -> List[Dict]:
     if count > len(word_ids):
         count = len(word_ids)
 
-    chosen_ids = random.sample(word_ids, k=count)
+    # Sort first so a seeded rng picks the same words whatever order the database returns.
+    chosen_ids = rng.sample(sorted(word_ids), k=count)
     words = list(Word.objects.filter(is_deleted=False, id__in=chosen_ids))
 
     by_id = {w.id: w for w in words}
     ordered_words = [by_id[i] for i in chosen_ids if i in by_id]
 
-    questions: List[Dict] = []
-    for w in ordered_words:
-        q = build_mcq_for_word(word=w)
-        questions.append(q)
-
-    return questions
+    return build_mcq_batch(ordered_words, rng=rng)
 
 
-def build_game_questions(*, count: int, used_word_ids: Optional[Set[int]] = None) -> List[Dict]:
+def build_game_questions(*, count: int, used_word_ids=None, rng=random) -> List[Dict]:
+    """
+    `count` questions on words not in `used_word_ids` (a set or an IdSet); the picked ids
+    are added to it.
+    """
     if used_word_ids is None:
         used_word_ids = set()
 
-    questions: List[Dict] = []
-    attempts = 0
-    while len(questions) < count and attempts < count * 60:
-        attempts += 1
-        w = _pick_random_word_excluding(used_word_ids)
-        if not w:
-            break
-        try:
-            q = build_mcq_for_word(word=w)
-        except ValueError:
-            used_word_ids.add(w.id)
-            continue
-
-        used_word_ids.add(w.id)
-        questions.append(q)
-
-    return questions
+    words = get_word_pool().sample(count, exclude_ids=used_word_ids, rng=rng)
+    used_word_ids.update(w.id for w in words)
+    return build_mcq_batch(words, rng=rng)
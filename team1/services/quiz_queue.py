@@ -0,0 +1,78 @@
+import random
+from typing import Dict, Optional, Tuple
+
+from django.core.cache import cache
+
+from team1.services.cache_lock import cache_lock
+from team1.services.question_generator import build_quiz_questions_for_user
+
+QUEUE_TIMEOUT = 3600
+
+
+def _queue_key(user_id, quiz_id):
+    return f"quiz_queue:{user_id}:{quiz_id}"
+
+
+def create_quiz_queue(quiz, rng=random) -> int:
+    """
+    Build all of a quiz's questions in one batch and keep them server side.
+
+    Each item is (prompt, answer_id, answer_text, ((option_id, option_text), ...)); clients
+    only ever see the prompt and options. Returns the number of questions queued.
+    """
+    key = _queue_key(quiz.user_id, quiz.quiz_id)
+    with cache_lock(key):
+        state = _build_queue(quiz, rng)
+        cache.set(key, state, QUEUE_TIMEOUT)
+    return len(state["items"])
+
+
+def _build_queue(quiz, rng=random) -> Dict:
+    questions = build_quiz_questions_for_user(user_id=quiz.user_id, count=quiz.question_count or 0, rng=rng)
+    items = []
+    for q in questions:
+        answer_text = next(o["text"] for o in q["options"] if o["word_id"] == q["answer_word_id"])
+        options = tuple((o["word_id"], o["text"]) for o in q["options"])
+        items.append((q["prompt"], q["answer_word_id"], answer_text, options))
+    return {"items": items, "next": 0, "active": None}
+
+
+def next_question(quiz) -> Optional[Tuple[Dict, int]]:
+    """
+    Pop the next queued question as {"prompt", "options"} with its 1-based number and make
+    it the one awaiting an answer. None once the queue is used up. A quiz whose queue has
+    expired (or predates it) gets a fresh one. Runs under the quiz's lock, like
+    `take_active_answer`, so concurrent requests cannot hand out or grade a question twice.
+    """
+    key = _queue_key(quiz.user_id, quiz.quiz_id)
+    with cache_lock(key):
+        state = cache.get(key)
+        if state is None:
+            state = _build_queue(quiz)
+
+        if state["next"] >= len(state["items"]):
+            cache.set(key, state, QUEUE_TIMEOUT)
+            return None
+
+        prompt, answer_id, answer_text, options = state["items"][state["next"]]
+        state["next"] += 1
+        state["active"] = (answer_id, answer_text)
+        cache.set(key, state, QUEUE_TIMEOUT)
+
+    return {
+        "prompt": prompt,
+        "options": [{"word_id": word_id, "text": text} for word_id, text in options],
+    }, state["next"]
+
+
+def take_active_answer(quiz) -> Optional[Tuple[int, str]]:
+    """(answer_id, answer_text) of the question last handed out, cleared so it is graded once."""
+    key = _queue_key(quiz.user_id, quiz.quiz_id)
+    with cache_lock(key):
+        state = cache.get(key)
+        if not state or state["active"] is None:
+            return None
+        active = state["active"]
+        state["active"] = None
+        cache.set(key, state, QUEUE_TIMEOUT)
+    return active
@@ -0,0 +1,160 @@
+"""
+UserStats rollup behind the team1 dashboard.
+
+Every UserWord / Quiz / SurvivalGame row contributes a few counters to its user's
+UserStats row (see `contribution`). Signal receivers apply the difference between a
+row's stored contribution (read in pre_save / pre_delete) and its new one as one `F()`
+update, inside the write's transaction. A user's row is created from a full recount the first time it is touched;
+`manage.py reconcile_user_stats` recounts every user in bulk and fixes drifted rows
+(queryset.update() and raw SQL bypass the signals).
+"""
+import uuid
+from collections import defaultdict
+from typing import Dict, Optional
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Sum
+
+from team1.models import Quiz, SurvivalGame, UserStats, UserWord
+
+QUIZ_TYPE_NAMES = {1: "daily", 2: "weekly", 3: "monthly"}
+LEITNER_FIELDS = {box: f"words_{box}" for box in ("new", "1day", "3days", "7days", "mastered")}
+COUNTER_FIELDS = [
+    f.name for f in UserStats._meta.get_fields() if f.name not in ("user_id", "updated_at")
+]
+
+# Fields each model's contribution is computed from.
+SOURCE_FIELDS = {
+    UserWord: ("user_id", "is_deleted", "leitner_type"),
+    Quiz: ("user_id", "is_deleted", "type", "score"),
+    SurvivalGame: ("user_id", "is_deleted", "score"),
+}
+
+
+def contribution(instance) -> Optional[Dict[str, int]]:
+    """The counters one row adds to its user's stats; None if its fields are not all loaded."""
+    if instance.get_deferred_fields() & set(SOURCE_FIELDS[type(instance)]):
+        return None
+    if instance.is_deleted:
+        return {}
+    if isinstance(instance, UserWord):
+        box = LEITNER_FIELDS.get(instance.leitner_type)
+        return {"words_total": 1, **({box: 1} if box else {})}
+    if isinstance(instance, Quiz):
+        name = QUIZ_TYPE_NAMES.get(instance.type)
+        if name is None:
+            return {}
+        return _scored(f"quiz_{name}_", instance.score)
+    return _scored("game_", instance.score)
+
+
+def _scored(prefix, score) -> Dict[str, int]:
+    # A NULL score counts the row but stays out of the average, as AVG() would.
+    if score is None:
+        return {prefix + "count": 1}
+    return {prefix + "count": 1, prefix + "scored": 1, prefix + "score_sum": score}
+
+
+def stored_contribution(instance) -> Optional[Dict[str, int]]:
+    """The contribution of the instance's row as currently stored ({} if there is none yet)."""
+    if instance.pk is None:
+        return {}
+    model = type(instance)
+    row = model.objects.filter(pk=instance.pk).values(*SOURCE_FIELDS[model]).first()
+    return contribution(model(**row)) if row else {}
+
+
+def diff(old: Dict[str, int], new: Dict[str, int]) -> Dict[str, int]:
+    delta = {k: new.get(k, 0) - old.get(k, 0) for k in old.keys() | new.keys()}
+    return {k: v for k, v in delta.items() if v}
+
+
+def apply_delta(user_id, delta: Dict[str, int]):
+    """Add `delta` to the user's row; a missing row is created from a recount instead."""
+    delta = {k: v for k, v in delta.items() if v}
+    if not delta:
+        return
+    updated = UserStats.objects.filter(user_id=user_id).update(**{k: F(k) + v for k, v in delta.items()})
+    if not updated:
+        ensure_user_stats(user_id)
+
+
+def recount(user_ids=None) -> Dict:
+    """Counters recomputed from the source tables, for the given users (None: everyone)."""
+    totals = defaultdict(lambda: dict.fromkeys(COUNTER_FIELDS, 0))
+
+    def scoped(qs):
+        return qs.filter(is_deleted=False) if user_ids is None else qs.filter(is_deleted=False, user_id__in=user_ids)
+
+    for row in scoped(UserWord.objects).values("user_id", "leitner_type").annotate(n=Count("user_word_id")):
+        stats = totals[row["user_id"]]
+        stats["words_total"] += row["n"]
+        box = LEITNER_FIELDS.get(row["leitner_type"])
+        if box:
+            stats[box] += row["n"]
+
+    quiz_rows = scoped(Quiz.objects).filter(type__in=QUIZ_TYPE_NAMES).values("user_id", "type").annotate(
+        n=Count("quiz_id"), scored=Count("score"), total=Sum("score")
+    )
+    for row in quiz_rows:
+        name = QUIZ_TYPE_NAMES[row["type"]]
+        totals[row["user_id"]][f"quiz_{name}_count"] = row["n"]
+        totals[row["user_id"]][f"quiz_{name}_scored"] = row["scored"]
+        totals[row["user_id"]][f"quiz_{name}_score_sum"] = row["total"] or 0
+
+    game_rows = scoped(SurvivalGame.objects).values("user_id").annotate(
+        n=Count("survival_game_id"), scored=Count("score"), total=Sum("score")
+    )
+    for row in game_rows:
+        totals[row["user_id"]]["game_count"] = row["n"]
+        totals[row["user_id"]]["game_scored"] = row["scored"]
+        totals[row["user_id"]]["game_score_sum"] = row["total"] or 0
+
+    return totals
+
+
+def ensure_user_stats(user_id) -> UserStats:
+    user_id = user_id if isinstance(user_id, uuid.UUID) else uuid.UUID(str(user_id))
+    stats = UserStats.objects.filter(user_id=user_id).first()
+    if stats is not None:
+        return stats
+    counters = recount([user_id]).get(user_id) or dict.fromkeys(COUNTER_FIELDS, 0)
+    try:
+        with transaction.atomic(using="team1"):
+            return UserStats.objects.create(user_id=user_id, **counters)
+    except IntegrityError:
+        return UserStats.objects.get(user_id=user_id)
+
+
+def rebuild_user_stats(user_id) -> UserStats:
+    """Recount one user from scratch (used when a write's old contribution is unknown)."""
+    UserStats.objects.filter(user_id=user_id).delete()
+    return ensure_user_stats(user_id)
+
+
+def reconcile(batch_size=1000, dry_run=False):
+    """Recount every user and rewrite drifted or missing rows. Returns (checked, fixed, created)."""
+    expected = recount()
+    existing = {s.user_id: s for s in UserStats.objects.all()}
+
+    drifted, missing = [], []
+    for user_id, counters in expected.items():
+        stats = existing.pop(user_id, None)
+        if stats is None:
+            missing.append(UserStats(user_id=user_id, **counters))
+        elif any(getattr(stats, k) != v for k, v in counters.items()):
+            for k, v in counters.items():
+                setattr(stats, k, v)
+            drifted.append(stats)
+    # Users whose rows no longer count anything.
+    for stats in existing.values():
+        if any(getattr(stats, k) for k in COUNTER_FIELDS):
+            for k in COUNTER_FIELDS:
+                setattr(stats, k, 0)
+            drifted.append(stats)
+
+    if not dry_run:
+        with transaction.atomic(using="team1"):
+            UserStats.objects.bulk_update(drifted, COUNTER_FIELDS, batch_size=batch_size)
+            UserStats.objects.bulk_create(missing, batch_size=batch_size, ignore_conflicts=True)
+    return len(expected), len(drifted), len(missing)
@@ -1,9 +1,19 @@
+from django.conf import settings
+from django.db import connections, transaction
 from django.utils import timezone
 from team1.models import Word, UserWord
+from team1.services import stats_service
+from team1.services.fuzzy_index import fuzzy_word_ids
+from team1.services.word_service import in_rank_order
+from collections import Counter
 from datetime import timedelta
 
 
-def search_user_words(user_id, search_term):
+def search_user_words(user_id, search_term, fuzzy=False):
+    if fuzzy and search_term:
+        # The user's words among the dictionary's closest spellings, most similar first.
+        word_ids = fuzzy_word_ids(search_term, limit=getattr(settings, "TEAM1_FUZZY_USER_WORD_CANDIDATES", 200))
+        return in_rank_order(UserWord.objects.filter(user_id=user_id, is_deleted=False), word_ids, field="word_id")
     return UserWord.objects.filter(user_id=user_id, word__english__icontains=search_term, word__persian__icontains=search_term)
 
 
@@ -11,6 +21,12 @@ def get_user_words_by_leitner(user_id, leitner_type):
     return UserWord.objects.filter(user_id=user_id, leitner_type=leitner_type)
 
 
+def get_due_user_words(user_id, today=None):
+    """The user's cards due on `today` (default today), a range read on the (user_id, is_deleted, next_due_date) index."""
+    today = today or timezone.now().date()
+    return UserWord.objects.filter(user_id=user_id, is_deleted=False, next_due_date__lte=today)
+
+
 def create_user_word(user_id, word_id, description, image=None):
     try:
         word = Word.objects.get(id=word_id)
@@ -25,7 +41,8 @@ def create_user_word(user_id, word_id, description, image=None):
         user_id=user_id,
         description=description,
         image=image,  # Pass the file object here
-        leitner_type='new'
+        leitner_type='new',
+        next_due_date=compute_next_due_date('new', None),
     )
     return user_word
 
@@ -50,11 +67,87 @@ def edit_user_word(user_word_id, description, image=None, move_to_next_box=False
     elif reset_to_day_1:
         user_word.leitner_type = '1day'
 
+    if move_to_next_box or reset_to_day_1 or user_word.next_due_date is None:
+        user_word.next_due_date = compute_next_due_date(user_word.leitner_type, user_word.last_check_date)
+
     user_word.save()
     user_word.refresh_from_db()
 
     return user_word
 
+REVIEW_RESULTS = ('correct', 'wrong')
+
+
+def _locked_user_words():
+    # Lock only the user_words rows: PostgreSQL refuses FOR UPDATE on the nullable side of the
+    # outer join to categories that select_related adds. Backends without FOR UPDATE OF lock
+    # the joined rows too, which they allow.
+    if connections['team1'].features.has_select_for_update_of:
+        return UserWord.objects.select_for_update(of=('self',))
+    return UserWord.objects.select_for_update()
+
+
+def review_user_words(user_id, reviews):
+    """
+    Apply a review session in one go: `reviews` is a list of {"user_word_id", "result"}, where
+    "correct" moves a card to its next box and "wrong" resets it to '1day' (as `edit_user_word`).
+    Each card may appear once and must be the user's, otherwise nothing is applied. One select, one bulk_update and
+    one UserStats update (bulk_update skips the rollup's signals), in a single transaction.
+    """
+    max_reviews = getattr(settings, "TEAM1_REVIEW_BATCH_MAX", 200)
+    if not isinstance(reviews, list) or not reviews:
+        raise ValueError("reviews must be a non-empty list.")
+    if len(reviews) > max_reviews:
+        raise ValueError(f"At most {max_reviews} reviews can be submitted at once.")
+
+    parsed = []
+    for review in reviews:
+        try:
+            user_word_id, result = int(review['user_word_id']), review['result']
+        except (TypeError, KeyError, ValueError):
+            raise ValueError("Each review needs an integer user_word_id and a result.")
+        if result not in REVIEW_RESULTS:
+            raise ValueError(f"result must be one of {', '.join(REVIEW_RESULTS)}.")
+        parsed.append((user_word_id, result))
+    ids = [i for i, _ in parsed]
+    repeated = sorted(i for i, n in Counter(ids).items() if n > 1)
+    if repeated:
+        raise ValueError(f"Each card can be reviewed once per request: {', '.join(map(str, repeated))}.")
+
+    today = timezone.now().date()
+    now = timezone.now()
+    with transaction.atomic(using="team1"):
+        cards = {
+            card.user_word_id: card
+            for card in _locked_user_words().select_related('word__category').filter(
+                user_id=user_id, is_deleted=False, user_word_id__in=ids
+            )
+        }
+        missing = sorted(set(ids) - cards.keys())
+        if missing:
+            raise ValueError(f"UserWord not found: {', '.join(map(str, missing))}.")
+
+        before = {i: stats_service.contribution(card) for i, card in cards.items()}
+        for user_word_id, result in parsed:
+            card = cards[user_word_id]
+            card.leitner_type = get_next_leitner_box(card.leitner_type) if result == 'correct' else '1day'
+            card.last_check_date = today
+            card.next_due_date = compute_next_due_date(card.leitner_type, today)
+            card.updated_at = now
+
+        UserWord.objects.bulk_update(
+            cards.values(), ['leitner_type', 'last_check_date', 'next_due_date', 'updated_at']
+        )
+        delta = {}
+        for user_word_id, card in cards.items():
+            for field, change in stats_service.diff(before[user_word_id], stats_service.contribution(card)).items():
+                delta[field] = delta.get(field, 0) + change
+        stats_service.apply_delta(user_id, delta)
+
+    # In submission order.
+    return [cards[i] for i in ids]
+
+
 def get_next_leitner_box(current_box):
     box_order = ['new', '1day', '3days', '7days', 'mastered']
     if current_box in box_order and box_order.index(current_box) + 1 < len(box_order):
@@ -88,8 +181,37 @@ INTERVAL_DAYS = {
 }
 
 
+def compute_next_due_date(leitner_type, last_check_date, today=None):
+    """First day a card is due under `is_due`'s rules; unchecked and mastered cards are due from today."""
+    today = today or timezone.now().date()
+    if leitner_type == 'mastered' or not last_check_date:
+        return last_check_date or today
+    return last_check_date + timedelta(days=INTERVAL_DAYS.get(leitner_type, 0))
+
+
+def backfill_next_due_dates(batch_size=1000):
+    """Fill `next_due_date` on cards written before it existed. Returns the number of cards updated."""
+    updated = 0
+    while True:
+        batch = list(
+            UserWord.objects.filter(next_due_date__isnull=True)
+            .only("user_word_id", "leitner_type", "last_check_date", "created_at")[:batch_size]
+        )
+        if not batch:
+            return updated
+        for user_word in batch:
+            user_word.next_due_date = compute_next_due_date(
+                user_word.leitner_type, user_word.last_check_date, today=user_word.created_at.date()
+            )
+        UserWord.objects.bulk_update(batch, ["next_due_date"])
+        updated += len(batch)
+
+
 def is_due(user_word):
     """Check if the word is due based on its leitner_type and last_check_date."""
+    if user_word.next_due_date is not None:
+        return timezone.now().date() >= user_word.next_due_date
+
     if user_word.leitner_type == 'mastered':
         return True  # Mastered words are always due
 
@@ -0,0 +1,223 @@
+import random
+import re
+import threading
+import time
+from array import array
+from typing import Dict, Iterable, List, Optional
+
+from django.conf import settings
+
+from team1.models import Word
+from team1.services.id_set import IdSet
+from team1.services.persian_text import normalize_persian
+
+PERSIAN_CHARS = re.compile(r'[\u0600-\u06FF]')
+
+
+def is_eligible(english, persian) -> bool:
+    """A word can be asked / offered as an option only with both texts and a non-Persian `english`."""
+    return bool(english) and bool((persian or "").strip()) and not PERSIAN_CHARS.search(english)
+
+
+class IdBucket:
+    """
+    Set of ids with O(1) add/remove and O(1) uniform random pick
+    (ids packed in an array, swap-remove via a position map).
+    """
+
+    def __init__(self):
+        self._ids = array("q")
+        self._pos: Dict[int, int] = {}
+
+    def __len__(self):
+        return len(self._ids)
+
+    def __iter__(self):
+        return iter(self._ids)
+
+    def __contains__(self, word_id):
+        return word_id in self._pos
+
+    def add(self, word_id):
+        if word_id in self._pos:
+            return
+        self._pos[word_id] = len(self._ids)
+        self._ids.append(word_id)
+
+    def discard(self, word_id):
+        i = self._pos.pop(word_id, None)
+        if i is None:
+            return
+        last = self._ids.pop()
+        if i < len(self._ids):
+            self._ids[i] = last
+            self._pos[last] = i
+
+    def pick(self, rng=random):
+        return self._ids[rng.randrange(len(self._ids))]
+
+
+class WordPool:
+    """
+    Process-wide snapshot of the words eligible for questions and options.
+
+    Holds every eligible word's texts (with the normalized Persian text used for option
+    dedupe) and a bucket of ids per category, so picking questions and distractors
+    needs no queries.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._words: Dict[int, tuple] = {}
+        self._all = IdBucket()
+        self._by_category: Dict[int, IdBucket] = {}
+        self.built_at = 0.0
+
+    @classmethod
+    def build(cls):
+        pool = cls()
+        rows = (
+            Word.objects
+            .filter(is_deleted=False)
+            .values_list("id", "english", "persian", "category_id")
+        )
+        for word_id, english, persian, category_id in rows.iterator(chunk_size=5000):
+            pool._add(word_id, english, persian, category_id)
+        pool.built_at = time.monotonic()
+        return pool
+
+    def __len__(self):
+        return len(self._all)
+
+    def _add(self, word_id, english, persian, category_id):
+        if not is_eligible(english, persian):
+            return
+        text = normalize_persian(persian)
+        self._words[word_id] = (english, persian, category_id, text)
+        self._all.add(word_id)
+        if category_id is not None:
+            self._by_category.setdefault(category_id, IdBucket()).add(word_id)
+
+    def _remove(self, word_id):
+        entry = self._words.pop(word_id, None)
+        if entry is None:
+            return
+        category_id = entry[2]
+        self._all.discard(word_id)
+        if category_id is not None and category_id in self._by_category:
+            self._by_category[category_id].discard(word_id)
+
+    def update_word(self, word: Word):
+        """Apply one saved/deleted Word row."""
+        with self._lock:
+            self._remove(word.id)
+            if not word.is_deleted:
+                self._add(word.id, word.english, word.persian, word.category_id)
+
+    def remove_word(self, word_id):
+        with self._lock:
+            self._remove(word_id)
+
+    def clear_category(self, category_id):
+        """Move a deleted category's words to no category (the SET_NULL update sends no Word signals)."""
+        with self._lock:
+            for word_id in self._by_category.pop(category_id, ()):
+                english, persian, _, text = self._words[word_id]
+                self._words[word_id] = (english, persian, None, text)
+
+    def get(self, word_id) -> Optional[Word]:
+        entry = self._words.get(word_id)
+        if entry is None:
+            return None
+        english, persian, category_id, _ = entry
+        return Word(id=word_id, english=english, persian=persian, category_id=category_id)
+
+    def word_ids(self) -> List[int]:
+        with self._lock:
+            return list(self._all)
+
+    def text_of(self, word_id) -> Optional[str]:
+        entry = self._words.get(word_id)
+        return entry[3] if entry else None
+
+    def sample(self, k: int, *, exclude_ids: Iterable[int] = (), exclude_texts: Iterable[str] = (),
+               category_id=None, rng=random) -> List[Word]:
+        """
+        Up to `k` random words (from `category_id` if given) with pairwise distinct normalized
+        Persian text, skipping `exclude_ids` and `exclude_texts` (normalized). Rejection sampling keeps this O(k)
+        while exclusions are a small part of the bucket; otherwise it falls back to a scan.
+        `exclude_ids` may be an IdSet, used as is.
+        """
+        exclude_ids = exclude_ids if isinstance(exclude_ids, (set, frozenset, IdSet)) else set(exclude_ids)
+        seen_texts = set(exclude_texts)
+        picked: List[Word] = []
+        picked_ids = set()
+
+        with self._lock:
+            bucket = self._all if category_id is None else self._by_category.get(category_id)
+            if not bucket or k <= 0:
+                return picked
+
+            def accept(word_id):
+                if word_id in exclude_ids or word_id in picked_ids:
+                    return False
+                text = self._words[word_id][3]
+                if text in seen_texts:
+                    return False
+                picked.append(self.get(word_id))
+                picked_ids.add(word_id)
+                seen_texts.add(text)
+                return True
+
+            for _ in range(k * 20):
+                if len(picked) >= k:
+                    return picked
+                accept(bucket.pick(rng))
+
+            candidates = [i for i in bucket if i not in exclude_ids and i not in picked_ids]
+            rng.shuffle(candidates)
+            for word_id in candidates:
+                if len(picked) >= k:
+                    break
+                accept(word_id)
+        return picked
+
+
+_pool: Optional[WordPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_word_pool() -> WordPool:
+    """The shared pool, rebuilt after TEAM1_WORD_POOL_MAX_AGE seconds to pick up other workers' edits."""
+    global _pool
+    max_age = getattr(settings, "TEAM1_WORD_POOL_MAX_AGE", 300)
+    pool = _pool
+    if pool is None or time.monotonic() - pool.built_at > max_age:
+        with _pool_lock:
+            if _pool is pool:
+                _pool = WordPool.build()
+            pool = _pool
+    return pool
+
+
+def apply_word_change(word: Word, deleted=False):
+    """Keep an already built pool in sync with a Word write in this process."""
+    pool = _pool
+    if pool is None:
+        return
+    if deleted:
+        pool.remove_word(word.id)
+    else:
+        pool.update_word(word)
+
+
+def apply_category_delete(category_id):
+    pool = _pool
+    if pool is not None:
+        pool.clear_category(category_id)
+
+
+def reset_word_pool():
+    global _pool
+    with _pool_lock:
+        _pool = None
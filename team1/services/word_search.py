@@ -0,0 +1,184 @@
+"""
+Full-text search over team1 words.
+
+Words are indexed with their English text lowercased and their Persian text passed
+through `normalize_persian`, in an FTS5 table on SQLite or an InnoDB FULLTEXT table on
+MySQL. Queries get the same normalization; every token is matched as a prefix and
+results come back best match first (bm25 / MySQL relevance). Other database backends, or
+SQLite builds without FTS5, fall back to `icontains`.
+
+The index follows Word saves and deletes (team1.signals). Requests never create or fill
+it: `manage.py rebuild_word_search` does both (run it once per deployment and after bulk
+writes). Until it exists, searches use `icontains`; workers re-check for it every
+TEAM1_WORD_SEARCH_RECHECK_SECONDS.
+"""
+import logging
+import re
+import time
+from typing import List, Optional, Tuple
+
+from django.conf import settings
+from django.db import DatabaseError, connections, transaction
+
+from team1.models import Word
+from team1.services.persian_text import normalize_persian
+
+logger = logging.getLogger(__name__)
+
+DB_ALIAS = "team1"
+_TOKEN = re.compile(r"\w+")
+
+_SCHEMA = {
+    "sqlite": [
+        "CREATE VIRTUAL TABLE IF NOT EXISTS word_search USING fts5("
+        "english, persian, tokenize = 'unicode61 remove_diacritics 2')",
+    ],
+    "mysql": [
+        "CREATE TABLE IF NOT EXISTS word_search ("
+        "word_id BIGINT PRIMARY KEY, english TEXT NOT NULL, persian TEXT NOT NULL, "
+        "FULLTEXT KEY word_search_text (english, persian)"
+        ") ENGINE=InnoDB DEFAULT CHARSET=utf8mb4",
+    ],
+}
+_KEY_COLUMN = {"sqlite": "rowid", "mysql": "word_id"}
+
+# Per alias: (index flavour or None when unusable, time.monotonic() of the check).
+_ready = {}
+
+
+def ensure_search_index() -> Optional[str]:
+    """The index flavour if the team1 database has a usable index; never creates or fills it."""
+    connection = connections[DB_ALIAS]
+    if connection.vendor not in _SCHEMA:
+        return None
+    vendor, checked_at = _ready.get(DB_ALIAS, (None, None))
+    if vendor is not None:
+        return vendor
+    recheck = getattr(settings, "TEAM1_WORD_SEARCH_RECHECK_SECONDS", 60)
+    if checked_at is not None and time.monotonic() - checked_at < recheck:
+        return None
+
+    try:
+        exists = "word_search" in connection.introspection.table_names()
+    except DatabaseError:
+        exists = False
+    if not exists:
+        logger.warning("No word_search index on %s; using icontains until `manage.py rebuild_word_search` runs", DB_ALIAS)
+    _ready[DB_ALIAS] = (connection.vendor if exists else None, time.monotonic())
+    return _ready[DB_ALIAS][0]
+
+
+def create_search_index() -> Optional[str]:
+    """Create the (empty) index table if the database supports one. Returns its flavour."""
+    connection = connections[DB_ALIAS]
+    if connection.vendor not in _SCHEMA:
+        return None
+    try:
+        with connection.cursor() as cursor:
+            for statement in _SCHEMA[connection.vendor]:
+                cursor.execute(statement)
+    except DatabaseError:
+        logger.warning("Full-text search unavailable on %s; using icontains", DB_ALIAS, exc_info=True)
+        return None
+    _ready[DB_ALIAS] = (connection.vendor, time.monotonic())
+    return connection.vendor
+
+
+def reset_word_search():
+    """Forget whether the index exists (tests roll the schema back between cases)."""
+    _ready.clear()
+
+
+def _document(english, persian):
+    return (english or "").lower(), normalize_persian(persian)
+
+
+def index_word(word: Word):
+    """Add, refresh or drop one word's entry after a save."""
+    vendor = ensure_search_index()
+    if vendor is None:
+        return
+    with connections[DB_ALIAS].cursor() as cursor:
+        cursor.execute(f"DELETE FROM word_search WHERE {_KEY_COLUMN[vendor]} = %s", [word.id])
+        if not word.is_deleted:
+            cursor.execute(
+                f"INSERT INTO word_search ({_KEY_COLUMN[vendor]}, english, persian) VALUES (%s, %s, %s)",
+                [word.id, *_document(word.english, word.persian)],
+            )
+
+
+def unindex_word(word_id):
+    vendor = ensure_search_index()
+    if vendor is None:
+        return
+    with connections[DB_ALIAS].cursor() as cursor:
+        cursor.execute(f"DELETE FROM word_search WHERE {_KEY_COLUMN[vendor]} = %s", [word_id])
+
+
+def rebuild_index(batch_size=2000) -> int:
+    """Create the index if needed and refill it from every live word. Returns the number of words indexed."""
+    vendor = create_search_index()
+    if vendor is None:
+        return 0
+    key = _KEY_COLUMN[vendor]
+    indexed = 0
+    rows = Word.objects.filter(is_deleted=False).values_list("id", "english", "persian")
+    # One transaction: searches keep seeing the old entries until the refill commits.
+    with transaction.atomic(using=DB_ALIAS), connections[DB_ALIAS].cursor() as cursor:
+        cursor.execute("DELETE FROM word_search")
+        batch = []
+        for word_id, english, persian in rows.iterator(chunk_size=batch_size):
+            batch.append((word_id, *_document(english, persian)))
+            if len(batch) >= batch_size:
+                cursor.executemany(f"INSERT INTO word_search ({key}, english, persian) VALUES (%s, %s, %s)", batch)
+                indexed += len(batch)
+                batch = []
+        if batch:
+            cursor.executemany(f"INSERT INTO word_search ({key}, english, persian) VALUES (%s, %s, %s)", batch)
+            indexed += len(batch)
+    return indexed
+
+
+def _tokens(query):
+    return _TOKEN.findall(normalize_persian(query).lower())
+
+
+def search_word_ids(query, limit: Optional[int] = None) -> Optional[List[int]]:
+    """
+    Ids of live words matching every token of `query` as a prefix, best match first.
+    None when full-text search is unavailable (callers fall back to a plain filter).
+    """
+    found = search_words(query, limit)
+    return None if found is None else found[0]
+
+
+def search_words(query, limit: Optional[int] = None) -> Optional[Tuple[List[int], bool]]:
+    """
+    (ids, truncated): like `search_word_ids`, plus whether more than `limit` (default
+    TEAM1_WORD_SEARCH_MAX_RESULTS) words matched and only the best `limit` were kept.
+    """
+    vendor = ensure_search_index()
+    if vendor is None:
+        return None
+    tokens = _tokens(query)
+    if not tokens:
+        return [], False
+    if limit is None:
+        limit = getattr(settings, "TEAM1_WORD_SEARCH_MAX_RESULTS", 500)
+
+    with connections[DB_ALIAS].cursor() as cursor:
+        if vendor == "sqlite":
+            match = " ".join(f'"{t}"*' for t in tokens)
+            cursor.execute(
+                "SELECT rowid FROM word_search WHERE word_search MATCH %s ORDER BY rank LIMIT %s", [match, limit + 1]
+            )
+        else:
+            # InnoDB ignores tokens shorter than innodb_ft_min_token_size (default 3).
+            match = " ".join(f"+{t}*" for t in tokens)
+            cursor.execute(
+                "SELECT word_id FROM word_search WHERE MATCH(english, persian) AGAINST (%s IN BOOLEAN MODE) "
+                "ORDER BY MATCH(english, persian) AGAINST (%s IN BOOLEAN MODE) DESC LIMIT %s",
+                [match, match, limit + 1],
+            )
+        ids = [row[0] for row in cursor.fetchall()]
+    return ids[:limit], len(ids) > limit
@@ -1,20 +1,44 @@
-from django.db.models import Q
+from django.db.models import Case, IntegerField, Q, When
 
 from team1.models import Word
+from team1.services.fuzzy_index import fuzzy_word_ids
+from team1.services.word_search import search_words
 
 
-def get_all_words_queryset(search_query=None, exact=False):
+def in_rank_order(queryset, ids, field="id"):
+    """`queryset` narrowed to `ids`, in that order."""
+    if not ids:
+        return queryset.none()
+    rank = Case(*[When(**{field: pk}, then=i) for i, pk in enumerate(ids)], output_field=IntegerField())
+    return queryset.filter(**{f"{field}__in": ids}).order_by(rank)
+
+
+def get_all_words_queryset(search_query=None, exact=False, fuzzy=False):
+    return search_words_queryset(search_query, exact=exact, fuzzy=fuzzy)[0]
+
+
+def search_words_queryset(search_query=None, exact=False, fuzzy=False):
+    """(queryset, truncated): `truncated` tells that full-text search kept only its best matches."""
     words = Word.objects.filter(is_deleted=False)
 
     if search_query:
+        if fuzzy:
+            # Nearest spellings through the trigram index (services.fuzzy_index), most similar first.
+            return in_rank_order(words, fuzzy_word_ids(search_query)), False
         if exact:
             words = words.filter(
                 Q(english__iexact=search_query) | Q(persian__iexact=search_query)
             )
         else:
-            # Partial match - Slower
-            words = words.filter(
-                Q(english__icontains=search_query) | Q(persian__icontains=search_query)
-            )
+            # Prefix match through the full-text index, best match first (services.word_search).
+            found = search_words(search_query)
+            if found is None:
+                # No full-text index on this database - Slower
+                words = words.filter(
+                    Q(english__icontains=search_query) | Q(persian__icontains=search_query)
+                )
+            else:
+                ids, truncated = found
+                return in_rank_order(words, ids), truncated
 
-    return words.order_by('-created_at')
\ No newline at end of file
+    return words.order_by('-created_at'), False
@@ -0,0 +1,93 @@
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from .models import Category, Quiz, SurvivalGame, UserWord, Word
+from .services import stats_service
+from .services.distractor_service import mark_categories_stale, mark_word_changed, mark_words_stale
+from .services.fuzzy_index import forget_word, refresh_word_trigrams
+from .services.word_pool import apply_category_delete, apply_word_change
+from .services.word_search import index_word, unindex_word
+
+
+@receiver(pre_save, sender=Word)
+def remember_word_category(sender, instance, **kwargs):
+    # The category the row had before this save, whose words' distractor sets may rank it.
+    instance._old_category_id = (
+        Word.objects.filter(pk=instance.pk).values_list("category_id", flat=True).first() if instance.pk else None
+    )
+
+
+@receiver(post_save, sender=Word)
+def sync_word_pool_on_save(sender, instance, **kwargs):
+    apply_word_change(instance)
+    # Sets are only flagged here and recomputed on their next read (or by precompute_distractors);
+    # the stored set is dropped with the word on delete (CASCADE).
+    mark_word_changed(instance, getattr(instance, "_old_category_id", None))
+    index_word(instance)
+    refresh_word_trigrams(instance)
+
+
+@receiver(post_delete, sender=Word)
+def sync_word_pool_on_delete(sender, instance, **kwargs):
+    apply_word_change(instance, deleted=True)
+    unindex_word(instance.id)
+    forget_word(instance)
+
+
+@receiver(post_save, sender=Category)
+def mark_category_sets_stale(sender, instance, created, **kwargs):
+    if not created:
+        mark_categories_stale([instance.id])
+
+
+@receiver(pre_delete, sender=Category)
+def mark_category_sets_stale_on_delete(sender, instance, **kwargs):
+    # Before the SET_NULL update, which sends no Word signals, while the words can still be found by category.
+    mark_words_stale(Word.objects.filter(category_id=instance.id).values_list("id", flat=True))
+
+
+@receiver(post_delete, sender=Category)
+def sync_word_pool_on_category_delete(sender, instance, **kwargs):
+    apply_category_delete(instance.id)
+
+
+_STATS_SENDERS = (UserWord, Quiz, SurvivalGame)
+
+
+_UNCHANGED = object()
+
+
+def _remember_stats_contribution(sender, instance, raw=False, update_fields=None, **kwargs):
+    # What the stored row adds to UserStats, so the save can apply just the difference.
+    # Saves that cannot touch the counted fields skip the lookup.
+    if update_fields is not None and not set(update_fields) & set(stats_service.SOURCE_FIELDS[sender]):
+        instance._stats_before = _UNCHANGED
+    else:
+        instance._stats_before = stats_service.stored_contribution(instance)
+
+
+def _update_stats_on_save(sender, instance, created, **kwargs):
+    old = instance.__dict__.pop("_stats_before", None)
+    if old is _UNCHANGED:
+        return
+    new = stats_service.contribution(instance)
+    if old is None or new is None:
+        # Loaded with deferred fields: the difference is unknown, so recount this user.
+        stats_service.rebuild_user_stats(instance.user_id)
+    else:
+        stats_service.apply_delta(instance.user_id, stats_service.diff(old, new))
+
+
+def _update_stats_on_delete(sender, instance, **kwargs):
+    old = instance.__dict__.pop("_stats_before", None)
+    if old is None:
+        stats_service.rebuild_user_stats(instance.user_id)
+    else:
+        stats_service.apply_delta(instance.user_id, stats_service.diff(old, {}))
+
+
+for _model in _STATS_SENDERS:
+    pre_save.connect(_remember_stats_contribution, sender=_model, dispatch_uid=f"team1-stats-pre-save-{_model.__name__}")
+    pre_delete.connect(_remember_stats_contribution, sender=_model, dispatch_uid=f"team1-stats-pre-delete-{_model.__name__}")
+    post_save.connect(_update_stats_on_save, sender=_model, dispatch_uid=f"team1-stats-save-{_model.__name__}")
+    post_delete.connect(_update_stats_on_delete, sender=_model, dispatch_uid=f"team1-stats-delete-{_model.__name__}")
@@ -1,6 +1,782 @@
-from django.test import TestCase
+import base64
+import json
+import pickle
+import random
+import uuid
+from datetime import date, timedelta
+from io import StringIO
+from unittest import mock
+from urllib.parse import parse_qs, urlsplit
+
+from django.apps import apps
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connections
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.exceptions import NotFound
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from team1.models import (
+    Category, Quiz, SurvivalGame, SurvivalLeaderboardEntry, UserStats, UserWord, Word, WordDistractorSet,
+    WordTrigramSet,
+)
+from team1.pagination import DueDatePagination, KeysetPagination
+from team1.services import game_session, leaderboard, question_generator, quiz_queue
+from team1.services.cache_lock import cache_lock
+from team1.services.dashboard_service import get_user_dashboard_stats
+from team1.services.fuzzy_index import fuzzy_word_ids, get_fuzzy_index, reset_fuzzy_index, trigrams
+from team1.services.distractor_service import get_precomputed_distractors, precompute_all
+from team1.services.game_service import create_survival_game, delete_survival_game
+from team1.services.id_set import IdSet
+from team1.services.persian_text import normalize_persian
+from team1.services.stats_service import ensure_user_stats
+from team1.services.user_words_service import (
+    _locked_user_words, compute_next_due_date, create_user_word, edit_user_word, get_due_user_words, is_due,
+    review_user_words,
+)
+from team1.services.word_pool import get_word_pool, reset_word_pool
+from team1.services.word_search import (
+    create_search_index, ensure_search_index, reset_word_search, search_word_ids, search_words,
+)
+from team1.services.word_service import get_all_words_queryset, in_rank_order, search_words_queryset
+from team1.views.games_view import SurvivalGameDetailAPIView
+from team1.views.user_words_view import UserWordReviewAPIView
+
+
+def _ensure_team1_tables():
+    # team1 ships without migrations, so the test database starts without its tables.
+    connection = connections["team1"]
+    existing = set(connection.introspection.table_names())
+    with connection.schema_editor() as editor:
+        for model in apps.get_app_config("team1").get_models():
+            if model._meta.db_table not in existing:
+                editor.create_model(model)
+    # Create the full-text index outside the test transactions so it outlives them.
+    reset_word_search()
+    create_search_index()
+
+
+class Team1TestCase(TestCase):
+    databases = {"default", "team1"}
+
+    @classmethod
+    def setUpClass(cls):
+        _ensure_team1_tables()
+        super().setUpClass()
+
 
 class TeamPingTests(TestCase):
     def test_ping_requires_auth(self):
         res = self.client.get("/team1/ping/")
         self.assertEqual(res.status_code, 401)
+
+
+class QuestionGeneratorTests(Team1TestCase):
+    def setUp(self):
+        reset_word_pool()
+        self.addCleanup(reset_word_pool)
+        self.fruit = Category.objects.create(name="fruit")
+        self.words = [
+            Word.objects.create(english=f"word{i}", persian=f"کلمه{i}", category=self.fruit if i < 4 else None)
+            for i in range(8)
+        ]
+        # Ineligible: Persian text in `english`, duplicate Persian text.
+        Word.objects.create(english="سیب", persian="سیب", category=self.fruit)
+        Word.objects.create(english="dup", persian="کلمه1", category=self.fruit)
+
+    def test_mcq_reads_only_the_precomputed_distractor_set(self):
+        question_generator.build_mcq_for_word(word=self.words[0])
+        with self.assertNumQueries(1, using="team1"):
+            q = question_generator.build_mcq_for_word(word=self.words[0])
+        texts = [o["text"] for o in q["options"]]
+        self.assertEqual(len(texts), 4)
+        self.assertEqual(len(set(texts)), 4)
+        self.assertIn("کلمه0", texts)
+
+    def test_precomputed_distractors_prefer_category_and_distinct_text(self):
+        self.assertEqual(precompute_all(), 9)
+        stored = WordDistractorSet.objects.get(word=self.words[0]).distractor_ids
+        ranked = Word.objects.in_bulk(stored)
+        texts = [ranked[i].persian for i in stored]
+        self.assertEqual(len(texts), len(set(texts)))
+        self.assertNotIn("کلمه0", texts)
+        self.assertEqual(len(stored), 7)
+        # Same-category candidates (word2, word3 and one of word1/"dup") come first.
+        self.assertTrue(all(ranked[i].category_id == self.fruit.id for i in stored[:3]))
+        self.assertIn(self.words[2].id, stored[:3])
+
+        # A deleted candidate is skipped when reading; the row of a deleted word goes with it.
+        self.words[2].is_deleted = True
+        self.words[2].save()
+        picked = [w.id for w in get_precomputed_distractors(self.words[0], k=3)]
+        self.assertEqual(len(picked), 3)
+        self.assertNotIn(self.words[2].id, picked)
+        self.assertFalse(WordDistractorSet.objects.filter(word=self.words[2]).exists())
+
+    def test_word_and_category_edits_mark_sets_stale_until_read(self):
+        precompute_all()
+        stale = lambda: set(WordDistractorSet.objects.filter(is_stale=True).values_list("word_id", flat=True))
+        # Eligible fruits ("سیب" has no set).
+        fruits = {w.id for w in self.words[:4]} | {Word.objects.get(english="dup").id}
+        self.assertEqual(stale(), set())
+
+        # A new fruit flags its own set and every other fruit's, without ranking anything yet.
+        kiwi = Word.objects.create(english="kiwi", persian="کیوی", category=self.fruit)
+        self.assertEqual(stale(), fruits | {kiwi.id})
+        self.assertEqual(WordDistractorSet.objects.get(word=kiwi).distractor_ids, [])
+
+        # Reading a stale set recomputes and stores it; the new word is now a same-category candidate.
+        self.assertEqual(len(get_precomputed_distractors(self.words[0], k=3)), 3)
+        row = WordDistractorSet.objects.get(word=self.words[0])
+        self.assertFalse(row.is_stale)
+        self.assertIn(kiwi.id, row.distractor_ids)
+        call_command("precompute_distractors", "--stale-only", stdout=StringIO())
+        self.assertEqual(stale(), set())
+
+        # Moving a word flags both categories; deleting a category flags its words despite the SET_NULL.
+        veg = Category.objects.create(name="veg")
+        self.words[5].category = veg
+        self.words[5].save()
+        self.assertEqual(stale(), {self.words[5].id})
+        self.words[3].category = veg
+        self.words[3].save()
+        self.assertEqual(stale(), fruits | {kiwi.id, self.words[5].id})
+        precompute_all()
+        self.fruit.name = "fruits"
+        self.fruit.save()
+        self.assertEqual(stale(), (fruits | {kiwi.id}) - {self.words[3].id})
+        precompute_all()
+        self.fruit.delete()
+        self.assertEqual(stale(), (fruits | {kiwi.id}) - {self.words[3].id})
+        self.assertIsNone(get_word_pool().get(self.words[0].id).category_id)
+
+    def test_quiz_batch_is_reproducible_unique_and_constant_in_queries(self):
+        user_id = uuid.uuid4()
+        for w in self.words[:4]:
+            UserWord.objects.create(user_id=user_id, word=w, description="")
+        precompute_all()
+        get_word_pool()
+
+        with self.assertNumQueries(3, using="team1"):
+            first = question_generator.build_quiz_questions_for_user(user_id=user_id, count=2, rng=random.Random(7))
+        with self.assertNumQueries(3, using="team1"):
+            larger = question_generator.build_quiz_questions_for_user(user_id=user_id, count=4, rng=random.Random(7))
+        self.assertEqual(len(larger), 4)
+        self.assertEqual(
+            first, question_generator.build_quiz_questions_for_user(user_id=user_id, count=2, rng=random.Random(7))
+        )
+
+        offered = [o["word_id"] for q in first for o in q["options"]]
+        self.assertEqual(len(offered), 8)
+        self.assertEqual(len(set(offered)), 8)
+        for q in first:
+            self.assertIn(q["answer_word_id"], [o["word_id"] for o in q["options"]])
+
+    def test_quiz_queue_hands_out_each_question_once_without_queries(self):
+        user_id = uuid.uuid4()
+        for w in self.words[:3]:
+            UserWord.objects.create(user_id=user_id, word=w, description="")
+        quiz = Quiz.objects.create(user_id=user_id, type=1, question_count=3, correct_count=0)
+        self.assertEqual(quiz_queue.create_quiz_queue(quiz), 3)
+
+        asked = []
+        for number in (1, 2, 3):
+            with self.assertNumQueries(0, using="team1"):
+                question, n = quiz_queue.next_question(quiz)
+            self.assertEqual(n, number)
+            self.assertEqual(set(question), {"prompt", "options"})
+            answer_id, answer_text = quiz_queue.take_active_answer(quiz)
+            self.assertIn({"word_id": answer_id, "text": answer_text}, question["options"])
+            self.assertIsNone(quiz_queue.take_active_answer(quiz))
+            asked.append(answer_id)
+
+        self.assertCountEqual(asked, [w.id for w in self.words[:3]])
+        self.assertIsNone(quiz_queue.next_question(quiz))
+
+    def test_quiz_queue_serves_a_rebuilt_queue_the_cache_did_not_keep(self):
+        user_id = uuid.uuid4()
+        for w in self.words[:2]:
+            UserWord.objects.create(user_id=user_id, word=w, description="")
+        quiz = Quiz.objects.create(user_id=user_id, type=1, question_count=2, correct_count=0)
+        # A cache that drops writes (full, or the entry too large) must not break the first question.
+        with mock.patch.object(cache, "set"):
+            question, number = quiz_queue.next_question(quiz)
+        self.assertEqual(number, 1)
+        self.assertEqual(len(question["options"]), 4)
+        self.assertIsNone(cache.get("quiz_queue:%s:%s:lock" % (user_id, quiz.quiz_id)))
+
+    @override_settings(TEAM1_GAME_BUFFER_SIZE=5, TEAM1_GAME_LOW_WATER=1)
+    def test_game_buffer_pops_prepared_questions_and_never_repeats_a_word(self):
+        game = SurvivalGame.objects.create(user_id=uuid.uuid4(), score=0, lives=100)
+        game_session.start_game_session(game)
+
+        asked = []
+        for i in range(9):
+            with game_session.game_session(game.user_id, game.survival_game_id) as session:
+                if i < 4:
+                    with self.assertNumQueries(0, using="team1"):
+                        question = game_session.next_game_question(session)
+                else:
+                    question = game_session.next_game_question(session)
+                answer_id, _ = session["active"]
+            self.assertIn(answer_id, [o["word_id"] for o in question["options"]])
+            asked.append(answer_id)
+
+        self.assertEqual(len(set(asked)), 9)
+        with game_session.game_session(game.user_id, game.survival_game_id) as session:
+            self.assertIsNone(game_session.next_game_question(session))
+
+    @override_settings(TEAM1_GAME_CHECKPOINT_ANSWERS=3, TEAM1_GAME_CHECKPOINT_SECONDS=3600,
+                       TEAM1_GAME_BACKGROUND_FLUSH=False)
+    def test_game_session_writes_the_row_behind(self):
+        game = SurvivalGame.objects.create(user_id=uuid.uuid4(), score=0, lives=3)
+        game_session.start_game_session(game)
+
+        def play(correct):
+            with game_session.game_session(game.user_id, game.survival_game_id) as session:
+                game_session.next_game_question(session)
+                answer_id = session["active"][0]
+                return game_session.answer_game_question(session, answer_id if correct else -1)
+
+        with self.assertNumQueries(0, using="team1"):
+            play(True)
+            result = play(False)
+        self.assertEqual((result["score"], result["lives"]), (1, 2))
+        game.refresh_from_db()
+        self.assertEqual((game.score, game.lives), (0, 3))
+
+        play(True)  # third answer: checkpoint
+        game.refresh_from_db()
+        self.assertEqual((game.score, game.lives), (2, 2))
+
+        play(False)
+        self.assertTrue(game_session.flush_game_session(game.user_id, game.survival_game_id))
+        game.refresh_from_db()
+        self.assertEqual((game.score, game.lives), (2, 1))
+
+        result = play(False)  # game over is written at once
+        self.assertTrue(result["game_over"])
+        game.refresh_from_db()
+        self.assertEqual(game.lives, 0)
+
+        # Answers are graded once; an unknown game has no session.
+        with game_session.game_session(game.user_id, game.survival_game_id) as session:
+            self.assertIsNone(game_session.answer_game_question(session, 1))
+        with game_session.game_session(game.user_id, 0) as session:
+            self.assertIsNone(session)
+
+    @override_settings(TEAM1_GAME_BUFFER_SIZE=2, TEAM1_GAME_LOW_WATER=0, TEAM1_GAME_CHECKPOINT_ANSWERS=2,
+                       TEAM1_GAME_CHECKPOINT_SECONDS=3600, TEAM1_GAME_BACKGROUND_FLUSH=False)
+    def test_session_reopened_after_expiry_keeps_score_and_used_words(self):
+        game = SurvivalGame.objects.create(user_id=uuid.uuid4(), score=0, lives=3)
+        game_session.start_game_session(game)
+        asked = []
+        for correct in (True, False):  # the second answer is a checkpoint
+            with game_session.game_session(game.user_id, game.survival_game_id) as session:
+                game_session.next_game_question(session)
+                asked.append(session["active"][0])
+                game_session.answer_game_question(session, asked[-1] if correct else -1)
+        game.refresh_from_db()
+        self.assertTrue(set(asked) <= set(game.used_word_ids))
+
+        # The cache entry expires; the next request reopens the game from its row.
+        cache.delete(game_session._session_key(game.user_id, game.survival_game_id))
+        later = []
+        with game_session.game_session(game.user_id, game.survival_game_id) as session:
+            self.assertEqual((session["score"], session["lives"]), (1, 2))
+            while game_session.next_game_question(session):
+                later.append(session["active"][0])
+        self.assertTrue(later)
+        self.assertFalse(set(later) & set(game.used_word_ids))
+
+    def test_cache_lock_is_released_only_by_its_owner(self):
+        with cache_lock("team1:test"):
+            self.assertIsNotNone(cache.get("team1:test:lock"))
+        self.assertIsNone(cache.get("team1:test:lock"))
+
+        # The holder overran the TTL and another request took the lock: leaving must not free it.
+        held = cache_lock("team1:test")
+        held.__enter__()
+        cache.set("team1:test:lock", "other-owner", 60)
+        with self.assertLogs("team1.services.cache_lock", "WARNING"):
+            held.__exit__(None, None, None)
+        self.assertEqual(cache.get("team1:test:lock"), "other-owner")
+        cache.delete("team1:test:lock")
+
+    def test_id_set_is_compact_and_accepted_by_the_generator(self):
+        ids = IdSet([5, 70_000, 3, 5])
+        self.assertEqual((len(ids), list(ids)), (3, [3, 5, 70_000]))
+        self.assertIn(70_000, ids)
+        self.assertNotIn(4, ids)
+
+        dense = IdSet(range(0, 20_000, 2))  # past 4096 ids per group: bitmap
+        self.assertIn(19_998, dense)
+        self.assertNotIn(19_999, dense)
+        self.assertEqual(len(dense), 10_000)
+        restored = pickle.loads(pickle.dumps(dense))
+        self.assertEqual(restored, dense)
+        self.assertLess(len(pickle.dumps(dense)), 8_400)  # one 8 KiB bitmap
+        self.assertLess(len(pickle.dumps(IdSet(range(100_000, 100_300)))), 700)  # two bytes per id
+
+        used = IdSet(w.id for w in self.words[1:])
+        questions = question_generator.build_game_questions(count=3, used_word_ids=used)
+        self.assertTrue(all(q["word_id"] not in [w.id for w in self.words[1:]] for q in questions))
+        self.assertIn(questions[0]["word_id"], used)
+
+    def test_persian_text_normalization(self):
+        self.assertEqual(normalize_persian("  كتاب‌ها  "), "کتاب ها")
+        self.assertEqual(normalize_persian("عليّ"), "علی")
+
+    def test_pool_follows_word_writes(self):
+        questions = question_generator.build_game_questions(count=3)
+        self.assertEqual(len(questions), 3)
+
+        Word.objects.exclude(id=self.words[5].id).update(is_deleted=True)
+        for w in Word.objects.all():
+            w.save()
+        used = set()
+        self.assertEqual(question_generator.build_game_questions(count=1, used_word_ids=used)[0]["word_id"], self.words[5].id)
+        self.assertEqual(question_generator.build_game_questions(count=1, used_word_ids=used), [])
+
+
+class SurvivalLeaderboardTests(Team1TestCase):
+    def test_best_scores_ranks_and_periods(self):
+        a, b, c = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+        monday = date(2026, 3, 2)
+        leaderboard.record_score(a, 7, monday)
+        leaderboard.record_score(b, 9, monday)
+        leaderboard.record_score(c, 7, monday + timedelta(days=1))
+        leaderboard.record_score(b, 3, monday + timedelta(days=1))  # not an improvement
+
+        top = leaderboard.top_scores(limit=2, day=monday)
+        self.assertEqual([(r["user_id"], r["max_score"]) for r in top], [(b, 9), (a, 7)])
+        self.assertEqual(leaderboard.user_rank(c, day=monday)[0], 3)  # tie with a, reached later
+        self.assertEqual(leaderboard.user_rank(c, "week", day=monday)[0], 3)
+
+        tuesday = leaderboard.top_scores("day", day=monday + timedelta(days=1))
+        self.assertEqual([(r["user_id"], r["max_score"]) for r in tuesday], [(c, 7), (b, 3)])
+        self.assertEqual(leaderboard.user_rank(a, "day", day=monday + timedelta(days=1)), (None, None))
+
+    def test_rebuild_matches_incremental_updates(self):
+        a, b = uuid.uuid4(), uuid.uuid4()
+        for user_id, score in ((a, 4), (b, 6), (a, 8)):
+            create_survival_game(user_id, score, 3)
+        expected = leaderboard.top_scores()
+
+        SurvivalLeaderboardEntry.objects.all().delete()
+        call_command("rebuild_survival_leaderboard", stdout=StringIO())
+        self.assertEqual(leaderboard.top_scores(), expected)
+        self.assertEqual([r["max_score"] for r in expected], [8, 6])
+        self.assertEqual(SurvivalLeaderboardEntry.objects.count(), 6)
+
+
+    def test_lowered_patch_and_delete_recompute_the_user_entries(self):
+        a, b = uuid.uuid4(), uuid.uuid4()
+        first = create_survival_game(a, 5, 3)
+        best = create_survival_game(a, 9, 3)
+        create_survival_game(b, 7, 3)
+
+        view = SurvivalGameDetailAPIView.as_view()
+        request = APIRequestFactory().patch(f"/team1/survival_games/{best.pk}/", {"score": 2}, format="json")
+        force_authenticate(request, user=mock.Mock(id=a, is_authenticated=True))
+        self.assertEqual(view(request, game_id=best.pk).status_code, 200)
+        for period in leaderboard.PERIODS:
+            top = leaderboard.top_scores(period)
+            self.assertEqual([(r["user_id"], r["max_score"]) for r in top], [(b, 7), (a, 5)])
+        self.assertEqual(leaderboard.user_rank(a, "day")[0], 2)
+
+        delete_survival_game(first.pk, a)
+        self.assertEqual([r["max_score"] for r in leaderboard.top_scores("week")], [7, 2])
+        delete_survival_game(best.pk, a)
+        self.assertFalse(SurvivalLeaderboardEntry.objects.filter(user_id=a).exists())
+
+
+class UserStatsRollupTests(Team1TestCase):
+    def test_rollup_follows_writes_and_reconciles(self):
+        user_id = uuid.uuid4()
+        words = [Word.objects.create(english=f"w{i}", persian=f"ک{i}") for i in range(3)]
+        user_words = [UserWord.objects.create(user_id=user_id, word=w, description="") for w in words]
+        user_words[0].leitner_type = "3days"
+        user_words[0].save()
+        UserWord.objects.get(pk=user_words[1].pk).delete()
+        Quiz.objects.create(user_id=user_id, type=1, score=40)
+        quiz = Quiz.objects.create(user_id=user_id, type=1, score=0)
+        quiz.score = 80
+        quiz.save()
+        create_survival_game(user_id, 6, 3)
+
+        with self.assertNumQueries(3, using="team1"):
+            stats = get_user_dashboard_stats(user_id=user_id)
+        self.assertEqual(stats["words"]["total"], 2)
+        self.assertEqual(stats["words"]["by_leitner"]["3_days"], 1)
+        self.assertEqual(stats["words"]["by_leitner"]["new"], 1)
+        self.assertEqual(stats["quizzes"]["daily"], {"count": 2, "avg_score": 60.0})
+        self.assertEqual((stats["games"]["count"], stats["games"]["avg_score"]), (1, 6.0))
+
+        UserStats.objects.filter(user_id=user_id).update(words_total=99)
+        out = StringIO()
+        call_command("reconcile_user_stats", stdout=out)
+        self.assertIn("Fixed 1 drifted rows", out.getvalue())
+        self.assertEqual(UserStats.objects.get(user_id=user_id).words_total, 2)
+
+    def test_null_scores_stay_out_of_the_average(self):
+        user_id = uuid.uuid4()
+        Quiz.objects.create(user_id=user_id, type=2, score=50)
+        pending = Quiz.objects.create(user_id=user_id, type=2)
+        SurvivalGame.objects.create(user_id=user_id, score=None, lives=3)
+        stats = get_user_dashboard_stats(user_id=user_id)
+        self.assertEqual(stats["quizzes"]["weekly"], {"count": 2, "avg_score": 50.0})
+        self.assertEqual((stats["games"]["count"], stats["games"]["avg_score"]), (1, 0.0))
+
+        pending.score = 70
+        pending.save()
+        self.assertEqual(get_user_dashboard_stats(user_id=user_id)["quizzes"]["weekly"]["avg_score"], 60.0)
+        out = StringIO()
+        call_command("reconcile_user_stats", stdout=out)
+        self.assertIn("Fixed 0 drifted rows", out.getvalue())
+
+    def test_only_saves_read_the_stored_row(self):
+        user_id = uuid.uuid4()
+        Quiz.objects.create(user_id=user_id, type=1, score=10)
+        quiz = Quiz.objects.get(user_id=user_id)
+        self.assertNotIn("_stats_before", quiz.__dict__)  # loading a row takes no snapshot
+
+        # A save that cannot change the counters skips the lookup and the rollup update.
+        with CaptureQueriesContext(connections["team1"]) as ctx:
+            quiz.date = date(2024, 1, 1)
+            quiz.save(update_fields=["date", "updated_at"])
+        self.assertEqual(len([q for q in ctx.captured_queries if "SAVEPOINT" not in q["sql"]]), 1)
+
+
+class WordSearchTests(Team1TestCase):
+    def setUp(self):
+        self.apple = Word.objects.create(english="Apple", persian="سیب")
+        self.pineapple = Word.objects.create(english="pineapple", persian="آناناس")
+        self.apply = Word.objects.create(english="apply", persian="درخواست کردن")
+        self.teacher = Word.objects.create(english="teacher", persian="معلم كلاس")  # Arabic kaf
+
+    def test_prefix_match_on_word_start(self):
+        ids = search_word_ids("app")
+        self.assertCountEqual(ids, [self.apple.id, self.apply.id])
+        self.assertEqual(search_word_ids("APPLE"), [self.apple.id])
+
+    def test_persian_query_is_normalized_like_the_index(self):
+        self.assertEqual(search_word_ids("كلا"), [self.teacher.id])
+        self.assertEqual(search_word_ids("کلاس"), [self.teacher.id])
+        self.assertEqual(search_word_ids("درخواست کردن"), [self.apply.id])
+
+    def test_index_follows_saves_and_deletes(self):
+        self.apple.english = "orange"
+        self.apple.save()
+        self.assertEqual(search_word_ids("apple"), [])
+        self.assertEqual(search_word_ids("ora"), [self.apple.id])
+
+        self.apply.is_deleted = True
+        self.apply.save()
+        self.pineapple.delete()
+        self.assertEqual(search_word_ids("app"), [])
+        self.assertEqual(search_word_ids("pine"), [])
+
+    def test_queryset_keeps_rank_order_and_exact_mode(self):
+        Word.objects.create(english="apple tree", persian="درخت سیب")
+        results = list(get_all_words_queryset("apple"))
+        self.assertEqual(results[0].id, self.apple.id)
+        self.assertEqual(len(results), 2)
+        self.assertEqual(list(get_all_words_queryset("apple", exact=True)), [self.apple])
+        self.assertEqual(list(get_all_words_queryset("!!!")), [])
+
+    def test_rebuild_command_reindexes_rows_written_without_signals(self):
+        Word.objects.filter(id=self.apple.id).update(english="banana")
+        self.assertEqual(search_word_ids("banana"), [])
+        out = StringIO()
+        call_command("rebuild_word_search", stdout=out)
+        self.assertIn("Indexed 4 words", out.getvalue())
+        self.assertEqual(search_word_ids("banana"), [self.apple.id])
+
+    def test_failed_rebuild_leaves_the_index_untouched(self):
+        with mock.patch("team1.services.word_search._document", side_effect=RuntimeError("boom")):
+            with self.assertRaises(RuntimeError):
+                call_command("rebuild_word_search", stdout=StringIO())
+        self.assertEqual(search_word_ids("APPLE"), [self.apple.id])
+
+    def test_capped_results_are_reported_as_truncated(self):
+        self.assertEqual(search_words("app", limit=1), ([self.apple.id], True))
+        self.assertEqual(search_words("apple", limit=1), ([self.apple.id], False))
+        with override_settings(TEAM1_WORD_SEARCH_MAX_RESULTS=1):
+            words, truncated = search_words_queryset("app")
+        self.assertEqual((len(words), truncated), (1, True))
+
+    def test_requests_never_create_the_index(self):
+        with connections["team1"].cursor() as cursor:
+            cursor.execute("DROP TABLE word_search")
+        self.addCleanup(create_search_index)
+        reset_word_search()
+        self.assertIsNone(ensure_search_index())
+        self.assertIsNone(search_word_ids("app"))
+        self.assertNotIn("word_search", connections["team1"].introspection.table_names())
+        self.assertEqual(len(get_all_words_queryset("app")), 3)  # icontains fallback, pineapple included
+
+
+class FuzzyWordLookupTests(Team1TestCase):
+    def setUp(self):
+        reset_fuzzy_index()
+        self.addCleanup(reset_fuzzy_index)
+        self.receive = Word.objects.create(english="receive", persian="دریافت کردن")
+        self.recipe = Word.objects.create(english="recipe", persian="دستور پخت")
+        self.believe = Word.objects.create(english="believe", persian="باور کردن")
+        self.library = Word.objects.create(english="library", persian="كتابخانه")  # Arabic kaf
+
+    def test_trigrams_are_padded_per_token(self):
+        self.assertEqual(trigrams("Cat"), ["  c", " ca", "at ", "cat"])
+        self.assertEqual(trigrams("كتاب", "persian"), trigrams("کتاب", "persian"))
+
+    def test_misspellings_find_the_closest_words_first(self):
+        self.assertEqual(fuzzy_word_ids("receve")[0], self.receive.id)
+        self.assertEqual(fuzzy_word_ids("belive"), [self.believe.id])
+        self.assertEqual(fuzzy_word_ids("librery"), [self.library.id])
+        self.assertEqual(fuzzy_word_ids("zzzz"), [])
+        self.assertEqual(fuzzy_word_ids("کتابخونه")[:1], [self.library.id])
+
+    def test_threshold_and_limit(self):
+        self.assertEqual(fuzzy_word_ids("rec", min_similarity=0.2, limit=1), [self.recipe.id])
+        self.assertCountEqual(fuzzy_word_ids("rec", min_similarity=0.2), [self.receive.id, self.recipe.id])
+
+    def test_loaded_index_follows_saves_and_deletes(self):
+        get_fuzzy_index()
+        with self.captureOnCommitCallbacks(using="team1") as callbacks:
+            self.recipe.english = "recite"
+            self.recipe.save()
+            # Until the save commits, the shared index still has the old spelling.
+            self.assertIn(self.recipe.id, fuzzy_word_ids("recipe", min_similarity=0.5))
+        for callback in callbacks:
+            callback()
+        self.assertNotIn(self.recipe.id, fuzzy_word_ids("recipe", min_similarity=0.5))
+        self.assertEqual(fuzzy_word_ids("recyte")[:1], [self.recipe.id])
+
+        with self.captureOnCommitCallbacks(using="team1", execute=True):
+            self.believe.is_deleted = True
+            self.believe.save()
+            self.receive.delete()
+        self.assertEqual(fuzzy_word_ids("belive"), [])
+        self.assertEqual(fuzzy_word_ids("recieve", min_similarity=0.4), [])
+        self.assertFalse(WordTrigramSet.objects.filter(word_id=self.believe.id).exists())
+
+    def test_index_is_loaded_from_the_trigram_table(self):
+        WordTrigramSet.objects.all().delete()
+        reset_fuzzy_index()
+        # Loading never fills the table; only the command does.
+        self.assertEqual(len(get_fuzzy_index()), 0)
+        self.assertFalse(WordTrigramSet.objects.exists())
+        out = StringIO()
+        call_command("rebuild_fuzzy_index", stdout=out)
+        self.assertIn("for 4 words", out.getvalue())
+        self.assertEqual(len(get_fuzzy_index()), 4)
+        with self.assertNumQueries(0, using="team1"):
+            fuzzy_word_ids("recieve")
+
+    def test_words_endpoint_fuzzy_mode(self):
+        words = get_all_words_queryset("receve", fuzzy=True)
+        self.assertEqual(list(words)[0], self.receive)
+
+
+class KeysetPaginationTests(Team1TestCase):
+    def setUp(self):
+        self.user_id = uuid.uuid4()
+        self.games = [SurvivalGame.objects.create(user_id=self.user_id, score=i, lives=3) for i in range(7)]
+        # Two games sharing a timestamp are still ordered (and split) by id.
+        SurvivalGame.objects.filter(pk=self.games[3].pk).update(created_at=self.games[4].created_at)
+
+    def _page(self, queryset, link=None, **params):
+        request = Request(APIRequestFactory().get(link or "/team1/survival_games/", params))
+        paginator = KeysetPagination()
+        rows = paginator.paginate_queryset(queryset, request)
+        return rows, paginator.get_paginated_response([r.pk for r in rows]).data
+
+    def test_walks_forward_and_back_without_gaps(self):
+        qs = SurvivalGame.objects.filter(user_id=self.user_id)
+        expected = list(qs.order_by("-created_at", "-pk").values_list("pk", flat=True))
+        seen, link, pages = [], None, []
+        while True:
+            _, data = self._page(qs, link, page_size=3) if link is None else self._page(qs, link)
+            seen += data["results"]
+            pages.append(data)
+            link = data["next"]
+            if link is None:
+                break
+        self.assertEqual(seen, expected)
+        self.assertEqual(len(pages), 3)
+        self.assertIsNone(pages[0]["previous"])
+        self.assertNotIn("count", pages[0])
+
+        _, back = self._page(qs, pages[2]["previous"])
+        self.assertEqual(back["results"], pages[1]["results"])
+        _, first = self._page(qs, back["previous"])
+        self.assertEqual(first["results"], pages[0]["results"])
+        self.assertIsNone(first["previous"])
+
+    def test_deep_page_is_a_single_query(self):
+        qs = SurvivalGame.objects.filter(user_id=self.user_id)
+        _, data = self._page(qs, page_size=5)
+        with self.assertNumQueries(1, using="team1"):
+            rows, _ = self._page(qs, data["next"])
+        self.assertEqual(len(rows), 2)
+
+    def test_ranked_querysets_page_by_position(self):
+        words = [Word.objects.create(english=f"w{i}", persian=f"ک{i}") for i in range(5)]
+        ranked = in_rank_order(Word.objects.all(), [w.id for w in reversed(words)])
+        rows, data = self._page(ranked, page_size=2)
+        self.assertEqual(rows, [words[4], words[3]])
+        rows, data = self._page(ranked, data["next"])
+        self.assertEqual(rows, [words[2], words[1]])
+
+        # Position paging stops at TEAM1_PAGINATION_MAX_POSITION; a forged deeper cursor is refused.
+        with override_settings(TEAM1_PAGINATION_MAX_POSITION=5):
+            rows, data = self._page(ranked, data["next"])
+            self.assertEqual((rows, data["next"]), ([words[0]], None))
+            with self.assertRaises(NotFound):
+                self._page(ranked, cursor=base64.urlsafe_b64encode(b'{"o":500}').decode())
+
+    def test_unranked_orderings_are_paged_by_keyset(self):
+        qs = SurvivalGame.objects.filter(user_id=self.user_id).order_by("score")
+        _, data = self._page(qs, page_size=3)
+        self.assertEqual(data["results"], [g.pk for g in reversed(self.games)][:3])
+        cursor = parse_qs(urlsplit(data["next"]).query)["cursor"][0]
+        self.assertIn("c", json.loads(base64.urlsafe_b64decode(cursor)))  # a keyset cursor, not {"o": ...}
+
+    def test_optional_count_and_bad_cursor(self):
+        qs = SurvivalGame.objects.filter(user_id=self.user_id)
+        _, data = self._page(qs, include_count="true")
+        self.assertEqual(data["count"], 7)
+        with self.assertRaises(NotFound):
+            self._page(qs, cursor="not-a-cursor")
+
+
+class DueQueueTests(Team1TestCase):
+    def setUp(self):
+        self.user_id = uuid.uuid4()
+        self.today = timezone.now().date()
+        self.word = Word.objects.create(english="due", persian="موعد")
+
+    def _card(self, leitner_type, last_check_date, english):
+        word = Word.objects.create(english=english, persian=english)
+        return UserWord.objects.create(
+            user_id=self.user_id, word=word, description="", leitner_type=leitner_type,
+            last_check_date=last_check_date,
+            next_due_date=compute_next_due_date(leitner_type, last_check_date),
+        )
+
+    def test_next_due_date_agrees_with_is_due(self):
+        cases = [
+            ("new", None), ("1day", self.today), ("1day", self.today - timedelta(days=1)),
+            ("3days", self.today - timedelta(days=2)), ("7days", self.today - timedelta(days=9)),
+            ("mastered", self.today),
+        ]
+        for i, (box, checked) in enumerate(cases):
+            card = self._card(box, checked, f"c{i}")
+            legacy = UserWord(leitner_type=box, last_check_date=checked)
+            self.assertEqual(is_due(card), is_due(legacy), (box, checked))
+
+    def test_create_and_edit_maintain_next_due_date(self):
+        card = create_user_word(self.user_id, self.word.id, "")
+        self.assertEqual(card.next_due_date, self.today)
+        card = edit_user_word(card.user_word_id, "", move_to_next_box=True)
+        self.assertEqual((card.leitner_type, card.next_due_date), ("1day", self.today + timedelta(days=1)))
+        self.assertFalse(is_due(card))
+        card = edit_user_word(card.user_word_id, "", move_to_next_box=True)
+        self.assertEqual(card.next_due_date, self.today + timedelta(days=3))
+
+    def test_due_queue_in_due_order_with_cursor(self):
+        late = self._card("7days", self.today - timedelta(days=10), "late")
+        fresh = self._card("new", None, "fresh")
+        self._card("3days", self.today, "later")
+        other = self._card("new", None, "other")
+        UserWord.objects.filter(pk=other.pk).update(user_id=uuid.uuid4())
+        mid = self._card("1day", self.today - timedelta(days=2), "mid")
+
+        due = get_due_user_words(self.user_id)
+        self.assertEqual([c.pk for c in due.order_by("next_due_date", "pk")], [late.pk, mid.pk, fresh.pk])
+
+        request = Request(APIRequestFactory().get("/team1/userwords/due/", {"page_size": 2}))
+        paginator = DueDatePagination()
+        self.assertEqual(paginator.paginate_queryset(due, request), [late, mid])
+        data = paginator.get_paginated_response([]).data
+        request = Request(APIRequestFactory().get(data["next"]))
+        with self.assertNumQueries(1, using="team1"):
+            self.assertEqual(DueDatePagination().paginate_queryset(due, request), [fresh])
+
+    def test_backfill_command(self):
+        card = self._card("3days", self.today - timedelta(days=1), "old")
+        UserWord.objects.filter(pk=card.pk).update(next_due_date=None)
+        out = StringIO()
+        call_command("backfill_due_dates", stdout=out)
+        self.assertIn("on 1 user words", out.getvalue())
+        card.refresh_from_db()
+        self.assertEqual(card.next_due_date, self.today + timedelta(days=2))
+
+
+class BatchReviewTests(Team1TestCase):
+    def setUp(self):
+        self.user_id = uuid.uuid4()
+        self.today = timezone.now().date()
+        self.cards = [
+            create_user_word(self.user_id, Word.objects.create(english=f"r{i}", persian=f"ر{i}").id, "")
+            for i in range(6)
+        ]
+        ensure_user_stats(self.user_id)
+
+    def test_session_is_applied_in_three_queries(self):
+        reviews = [{"user_word_id": c.user_word_id, "result": "correct"} for c in self.cards[:5]]
+        reviews.append({"user_word_id": self.cards[5].user_word_id, "result": "wrong"})
+        with CaptureQueriesContext(connections["team1"]) as ctx:
+            reviewed = review_user_words(self.user_id, reviews)
+        # The transaction shows up as a savepoint inside the test case's own transaction.
+        statements = [q["sql"] for q in ctx.captured_queries if "SAVEPOINT" not in q["sql"]]
+        self.assertEqual(len(statements), 3)
+
+        self.assertEqual([c.user_word_id for c in reviewed], [c.user_word_id for c in self.cards])
+        rows = {c.user_word_id: c for c in UserWord.objects.filter(user_id=self.user_id)}
+        for card in self.cards:
+            row = rows[card.user_word_id]
+            self.assertEqual(row.leitner_type, "1day")
+            self.assertEqual(row.last_check_date, self.today)
+            self.assertEqual(row.next_due_date, self.today + timedelta(days=1))
+
+        stats = UserStats.objects.get(user_id=self.user_id)
+        self.assertEqual((stats.words_new, stats.words_1day, stats.words_total), (0, 6, 6))
+
+    def test_repeated_card_is_rejected(self):
+        card_id = self.cards[0].user_word_id
+        with self.assertRaisesMessage(ValueError, str(card_id)):
+            review_user_words(self.user_id, [
+                {"user_word_id": card_id, "result": "correct"},
+                {"user_word_id": self.cards[1].user_word_id, "result": "correct"},
+                {"user_word_id": str(card_id), "result": "wrong"},
+            ])
+        self.assertFalse(UserWord.objects.filter(user_id=self.user_id).exclude(leitner_type="new").exists())
+
+    def test_foreign_or_invalid_reviews_change_nothing(self):
+        other = create_user_word(uuid.uuid4(), self.cards[0].word_id, "")
+        with self.assertRaises(ValueError):
+            review_user_words(self.user_id, [
+                {"user_word_id": self.cards[0].user_word_id, "result": "correct"},
+                {"user_word_id": other.user_word_id, "result": "correct"},
+            ])
+        for bad in ([], [{"user_word_id": "x", "result": "correct"}], [{"user_word_id": 1, "result": "maybe"}]):
+            with self.assertRaises(ValueError):
+                review_user_words(self.user_id, bad)
+        self.assertFalse(UserWord.objects.filter(user_id=self.user_id).exclude(leitner_type="new").exists())
+
+    def test_endpoint_rejects_bodies_that_are_not_a_list_or_object(self):
+        view = UserWordReviewAPIView.as_view()
+        for body in ("oops", 7):
+            request = APIRequestFactory().post("/team1/userwords/review/", body, format="json")
+            force_authenticate(request, user=mock.Mock(id=self.user_id, is_authenticated=True))
+            self.assertEqual(view(request).status_code, 400)
+
+    def test_locking_query_locks_only_user_words(self):
+        features = connections["team1"].features
+        with mock.patch.object(type(features), "has_select_for_update_of", True):
+            self.assertEqual(_locked_user_words().query.select_for_update_of, ("self",))
@@ -1,18 +1,19 @@
-from django.core.cache import cache
 from django.utils.decorators import method_decorator
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 
 from core.auth import api_login_required
-from team1.models import SurvivalGame, Word
-from team1.pagination import CustomPagination
+from team1.models import SurvivalLeaderboardEntry
+from team1.pagination import KeysetPagination
 from team1.serializers import SurvivalGameSerializer
 from team1.services.answer_service import cache_game_questions, grade_game_answers, set_active_question, \
     validate_and_grade_single_answer
 from team1.services.game_service import create_survival_game, get_user_survival_games, get_survival_game_by_id, \
     update_survival_game, delete_survival_game, get_user_survival_game_rank, get_top_survival_game_rankings
-from team1.services.question_generator import build_game_questions
+from team1.services.game_session import answer_game_question, current_score_and_lives, drop_game_session, \
+    game_session, next_game_question, start_game_session, sync_game_session
+from team1.services.leaderboard import PERIODS
 
 
 class SurvivalGameCreateAPIView(APIView):
@@ -24,6 +25,7 @@ class SurvivalGameCreateAPIView(APIView):
 
         # Create the survival game
         game = create_survival_game(user_id, score, lives)
+        start_game_session(game)
         serializer = SurvivalGameSerializer(game)
         return Response(serializer.data, status=status.HTTP_201_CREATED)
 
@@ -33,8 +35,10 @@ class SurvivalGameListAPIView(APIView):
     def get(self, request):
         user_id = request.user.id
         games = get_user_survival_games(user_id)
-        serializer = SurvivalGameSerializer(games, many=True)
-        return Response(serializer.data)
+        paginator = KeysetPagination()
+        page = paginator.paginate_queryset(games, request)
+        serializer = SurvivalGameSerializer(page, many=True)
+        return paginator.get_paginated_response(serializer.data)
 
 
 class SurvivalGameDetailAPIView(APIView):
@@ -46,6 +50,11 @@ class SurvivalGameDetailAPIView(APIView):
         if not game:
             return Response({"detail": "Survival game not found."}, status=status.HTTP_404_NOT_FOUND)
 
+        # A running game's row is written behind; show the live values.
+        live = current_score_and_lives(user_id, game_id)
+        if live:
+            game.score, game.lives = live
+
         serializer = SurvivalGameSerializer(game)
         return Response(serializer.data)
 
@@ -59,6 +68,7 @@ class SurvivalGameDetailAPIView(APIView):
 
         if not game:
             return Response({"detail": "Survival game not found or unauthorized."}, status=status.HTTP_404_NOT_FOUND)
+        sync_game_session(game)
 
         serializer = SurvivalGameSerializer(game)
         return Response(serializer.data)
@@ -78,6 +88,7 @@ class SurvivalGameDeleteAPIView(APIView):
 
         try:
             delete_survival_game(game_id, user_id)
+            drop_game_session(user_id, game_id)
             return Response({"detail": "Survival game deleted successfully."}, status=status.HTTP_204_NO_CONTENT)
         except ValueError as e:
             return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
@@ -86,7 +97,15 @@ class SurvivalGameDeleteAPIView(APIView):
 class TopSurvivalGameRankingAPIView(APIView):
     @method_decorator(api_login_required)
     def get(self, request):
-        top_users = get_top_survival_game_rankings()
+        period_type = request.GET.get("period", SurvivalLeaderboardEntry.PERIOD_ALL_TIME)
+        if period_type not in PERIODS:
+            return Response({"detail": f"period must be one of {', '.join(PERIODS)}."}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            limit = min(max(int(request.GET.get("limit", 5)), 1), 100)
+        except ValueError:
+            return Response({"detail": "limit must be an integer."}, status=status.HTTP_400_BAD_REQUEST)
+
+        top_users = get_top_survival_game_rankings(period_type, limit)
         return Response(top_users, status=status.HTTP_200_OK)
 
 
@@ -94,12 +113,15 @@ class UserSurvivalGameRankingAPIView(APIView):
     @method_decorator(api_login_required)
     def get(self, request):
         user_id = request.user.id
+        period_type = request.GET.get("period", SurvivalLeaderboardEntry.PERIOD_ALL_TIME)
+        if period_type not in PERIODS:
+            return Response({"detail": f"period must be one of {', '.join(PERIODS)}."}, status=status.HTTP_400_BAD_REQUEST)
 
-        rank, user_data = get_user_survival_game_rank(user_id)
+        rank, user_data = get_user_survival_game_rank(user_id, period_type)
 
         if rank is None:
             return Response(
-                {"detail": "You are not in the top 5 ranking."},
+                {"detail": "You have no survival score in this period."},
                 status=status.HTTP_404_NOT_FOUND
             )
 
@@ -115,67 +137,31 @@ class SurvivalGameQuestionsAPIView(APIView):
     @method_decorator(api_login_required)
     def get(self, request, game_id):
         user = request.user
-        game = get_survival_game_by_id(game_id, user.id)
-        if not game:
-            return Response({"detail": "Game not found."}, status=status.HTTP_404_NOT_FOUND)
-
-        # Get exactly ONE question
-        key = f"team1:game_used_words:{user.id}:{game_id}"
-        used = cache.get(key) or []
+        # Questions are prepared ahead in the game's session; answers stay server side.
+        with game_session(user.id, game_id) as session:
+            if session is None:
+                return Response({"detail": "Game not found."}, status=status.HTTP_404_NOT_FOUND)
+            question_data = next_game_question(session)
 
-        # We only need 1 question at a time now
-        question_list = build_game_questions(count=1, used_word_ids=set(used))
-        if not question_list:
+        if question_data is None:
             return Response({"detail": "No more questions available."}, status=404)
 
-        question_data = question_list[0]
-
-        # --- ANTI-CHEAT LOGIC ---
-        # 1. Remove the answer IDs from the dictionary so they aren't in the JSON
-        correct_answer_id = question_data.pop("answer_word_id")
-        question_data.pop("word_id")  # Remove the other ID shown in your screenshot
-
-        # 2. Save the correct ID in the CACHE where the user can't see it
-        # This makes this specific ID the "Active Question" for this game
-        cache.set(f"active_q:{user.id}:{game_id}", correct_answer_id, timeout=300)
-
-        # 3. Update used words
-        used.append(correct_answer_id)
-        cache.set(key, used, timeout=60 * 60)
-        # -------------------------
-
-        return Response(question_data)  # This now only contains 'prompt' and 'options'
+        return Response(question_data)  # This only contains 'prompt' and 'options'
 
 
 class SurvivalGameAnswerAPIView(APIView):
     @method_decorator(api_login_required)
     def post(self, request, game_id):
         user = request.user
-        game = SurvivalGame.objects.filter(survival_game_id=game_id, user_id=user.id).first()
         selected_id = request.data.get("selected_word_id")
-        correct_id = cache.get(f"active_q:{user.id}:{game_id}")
-
-        if correct_id is None:
-            return Response({"detail": "No active question found."}, status=400)
 
-        is_correct = int(selected_id) == int(correct_id)
+        # Score and lives change in the session; the SurvivalGame row is written behind.
+        with game_session(user.id, game_id) as session:
+            if session is None:
+                return Response({"detail": "Game not found."}, status=status.HTTP_404_NOT_FOUND)
+            result = answer_game_question(session, selected_id)
 
-        correct_word_obj = Word.objects.filter(id=correct_id).first()
-        correct_text = correct_word_obj.persian if correct_word_obj else ""
-
-        if is_correct:
-            game.score += 1
-        else:
-            game.lives -= 1
-
-        game.save(update_fields=["score", "lives", "updated_at"])
-        cache.delete(f"active_q:{user.id}:{game_id}")
+        if result is None:
+            return Response({"detail": "No active question found."}, status=400)
 
-        return Response({
-            "is_correct": is_correct,
-            "correct_word_id": correct_id,
-            "correct_answer_text": correct_text,  # <--- NEW FIELD
-            "score": game.score,
-            "lives": game.lives,
-            "game_over": game.lives <= 0
-        })
\ No newline at end of file
+        return Response(result)
@@ -2,15 +2,13 @@ from django.utils.decorators import method_decorator
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
-from django.core.cache import cache
 from core.auth import api_login_required
-from ..models import UserWord, Word
-from ..pagination import CustomPagination
+from ..models import UserWord
+from ..pagination import KeysetPagination
 from ..serializers import QuizSerializer
 from ..services.answer_service import  grade_quiz_answers
-from ..services.question_generator import build_quiz_questions_for_user, build_mcq_for_word
+from ..services.quiz_queue import create_quiz_queue, next_question, take_active_answer
 from ..services.quiz_service import update_quiz, get_user_quizzes, create_quiz, get_quiz_by_id, delete_quiz
-import random
 
 
 class QuizCreateAPIView(APIView):
@@ -29,6 +27,8 @@ class QuizCreateAPIView(APIView):
 
         try:
             quiz = create_quiz(user_id, score, quiz_type)
+            # All questions are generated here, once; the questions endpoint just pops them.
+            create_quiz_queue(quiz)
             serializer = QuizSerializer(quiz)
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         except ValueError as e:
@@ -43,8 +43,10 @@ class QuizListAPIView(APIView):
         end_date = request.GET.get('end_date', None)
 
         quizzes = get_user_quizzes(user_id, start_date, end_date)
-        serializer = QuizSerializer(quizzes, many=True)
-        return Response(serializer.data)
+        paginator = KeysetPagination()
+        page = paginator.paginate_queryset(quizzes, request)
+        serializer = QuizSerializer(page, many=True)
+        return paginator.get_paginated_response(serializer.data)
 
 
 class QuizUpdateAPIView(APIView):
@@ -95,44 +97,14 @@ class QuizQuestionsAPIView(APIView):
         if not quiz:
             return Response({"detail": "Quiz not found."}, status=404)
 
-        # 1. Get history of used words from cache
-        used_key = f"quiz_used_ids:{user.id}:{quiz_id}"
-        used_ids = cache.get(used_key) or []
-
-        # 2. Check if quiz is already finished
-        if len(used_ids) >= quiz.question_count:
+        item = next_question(quiz)
+        if item is None:
             return Response({"detail": "Quiz completed.", "finished": True}, status=200)
 
-        # 3. Pick a new word from UserWord that hasn't been used yet
-        available_words = UserWord.objects.filter(
-            user_id=user.id, is_deleted=False
-        ).exclude(word_id__in=used_ids)
-
-        if not available_words.exists():
-            return Response({"detail": "No more user words available."}, status=404)
-
-        target_user_word = random.choice(list(available_words))
-        word_obj = target_user_word.word
-
-        # 4. Build MCQ
-        question_data = build_mcq_for_word(word=word_obj)
-
-        # Ensure we are popping an INTEGER id
-        correct_id = question_data.pop("answer_word_id")
-        if isinstance(correct_id, dict):  # Just in case build_mcq returns a dict
-            correct_id = correct_id.get("word_id")
-
-        question_data.pop("word_id", None)
-
-        # 5. Store answer as a clean integer
-        cache.set(f"active_quiz_q:{user.id}:{quiz_id}", int(correct_id), timeout=600)
-
-        used_ids.append(int(correct_id))
-        cache.set(used_key, used_ids, timeout=3600)
-
+        question_data, number = item
         return Response({
             "question": question_data,
-            "current_number": len(used_ids),
+            "current_number": number,
             "total_questions": quiz.question_count
         })
 
@@ -149,18 +121,13 @@ class QuizAnswerAPIView(APIView):
         else:
             selected_id = raw_data
 
-        cache_key = f"active_quiz_q:{user.id}:{quiz_id}"
-        correct_id = cache.get(cache_key)
+        if not quiz:
+            return Response({"detail": "Quiz not found."}, status=404)
 
-        if selected_id is None or correct_id is None:
+        active = take_active_answer(quiz) if selected_id is not None else None
+        if active is None:
             return Response({"detail": "The answer is not found."}, status=400)
-
-        correct_word_text = ""
-        try:
-            word_obj = Word.objects.get(id=correct_id)
-            correct_word_text = word_obj.persian
-        except Word.DoesNotExist:
-            correct_word_text = "Unknown"
+        correct_id, correct_word_text = active
 
         is_correct = int(selected_id) == int(correct_id)
 
@@ -170,8 +137,6 @@ class QuizAnswerAPIView(APIView):
                 quiz.score = int((quiz.correct_count / quiz.question_count) * 100)
             quiz.save()
 
-        cache.delete(cache_key)
-
         return Response({
             "is_correct": is_correct,
             "correct_id": correct_id,
@@ -4,9 +4,10 @@ from rest_framework.response import Response
 from rest_framework import status
 
 from core.auth import api_login_required
+from ..pagination import DueDatePagination, KeysetPagination
 from ..serializers import UserWordSerializer
 from ..services.user_words_service import create_user_word, search_user_words, get_user_words_by_leitner, \
-    delete_user_word, edit_user_word, get_user_word_by_id
+    delete_user_word, edit_user_word, get_user_word_by_id, get_due_user_words, review_user_words
 from rest_framework.parsers import MultiPartParser, FormParser, JSONParser
 
 
@@ -16,9 +17,12 @@ class UserWordSearchAPIView(APIView):
     def get(self, request):
         user_id = request.user.id
         search_term = request.GET.get('search', '')
-        user_words = search_user_words(user_id, search_term)
-        serializer = UserWordSerializer(user_words, many=True)
-        return Response(serializer.data)
+        fuzzy = request.GET.get('fuzzy', 'false').lower() == 'true'
+        user_words = search_user_words(user_id, search_term, fuzzy=fuzzy).select_related('word__category')
+        paginator = KeysetPagination()
+        page = paginator.paginate_queryset(user_words, request)
+        serializer = UserWordSerializer(page, many=True)
+        return paginator.get_paginated_response(serializer.data)
 
 
 class UserWordListByLeitnerAPIView(APIView):
@@ -26,9 +30,22 @@ class UserWordListByLeitnerAPIView(APIView):
 
     def get(self, request, leitner_type):
         user_id = request.user.id
-        user_words = get_user_words_by_leitner(user_id, leitner_type)
-        serializer = UserWordSerializer(user_words, many=True)
-        return Response(serializer.data)
+        user_words = get_user_words_by_leitner(user_id, leitner_type).select_related('word__category')
+        paginator = KeysetPagination()
+        page = paginator.paginate_queryset(user_words, request)
+        serializer = UserWordSerializer(page, many=True)
+        return paginator.get_paginated_response(serializer.data)
+
+
+class UserWordDueAPIView(APIView):
+    @method_decorator(api_login_required)
+    def get(self, request):
+        user_id = request.user.id
+        user_words = get_due_user_words(user_id).select_related('word__category')
+        paginator = DueDatePagination()
+        page = paginator.paginate_queryset(user_words, request)
+        serializer = UserWordSerializer(page, many=True)
+        return paginator.get_paginated_response(serializer.data)
 
 
 class UserWordCreateAPIView(APIView):
@@ -77,6 +94,27 @@ class UserWordEditAPIView(APIView):
             return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
 
+class UserWordReviewAPIView(APIView):
+    @method_decorator(api_login_required)
+    def post(self, request):
+        user_id = request.user.id
+        # Either a bare list of reviews or {"reviews": [...]}.
+        if isinstance(request.data, list):
+            reviews = request.data
+        elif isinstance(request.data, dict):
+            reviews = request.data.get('reviews')
+        else:
+            return Response({"detail": "Expected a list of reviews or {\"reviews\": [...]}."},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            user_words = review_user_words(user_id, reviews)
+            serializer = UserWordSerializer(user_words, many=True)
+            return Response(serializer.data, status=status.HTTP_200_OK)
+        except ValueError as e:
+            return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+
 class UserWordGetByIdAPIView(APIView):
     @method_decorator(api_login_required)
     def get(self, request, user_word_id):
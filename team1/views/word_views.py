@@ -1,11 +1,10 @@
 from django.utils.decorators import method_decorator
-from rest_framework.pagination import PageNumberPagination
 from rest_framework.views import APIView
 
 from core.auth import api_login_required
-from ..services.word_service import get_all_words_queryset
+from ..services.word_service import search_words_queryset
 from ..serializers import WordSerializer
-from ..pagination import CustomPagination
+from ..pagination import KeysetPagination
 
 
 class WordListAPIView(APIView):
@@ -13,11 +12,15 @@ class WordListAPIView(APIView):
     def get(self, request):
         search_query = request.GET.get('search', '')
         exact = request.GET.get('exact', 'false').lower() == 'true'
+        fuzzy = request.GET.get('fuzzy', 'false').lower() == 'true'
 
-        words = get_all_words_queryset(search_query, exact=exact)
+        words, truncated = search_words_queryset(search_query, exact=exact, fuzzy=fuzzy)
+        words = words.select_related('category')
 
-        paginator = CustomPagination()
+        paginator = KeysetPagination()
         paginator.page_size = 100  # Set page size to 100
+        if search_query:
+            paginator.truncated = truncated
 
         paginated_queryset = paginator.paginate_queryset(words, request)
         serializer = WordSerializer(paginated_queryset, many=True)
@@ -2,7 +2,6 @@ from django.http import JsonResponse
 from django.shortcuts import render, redirect
 from django.utils import timezone
 from django.db.models import Avg, Count
-from django.contrib.auth import get_user_model
 from functools import wraps
 from collections import defaultdict
 from datetime import timedelta
@@ -10,7 +9,7 @@ import calendar
 from rest_framework.decorators import api_view, authentication_classes, permission_classes
 from rest_framework.response import Response
 from rest_framework import status
-from core.jwt_utils import decode_token
+from core.auth_context import get_auth_context
 
 from .models import Test, Question, TestAttempt, Answer
 from .serializers import (
@@ -22,7 +21,6 @@ from .serializers import (
 from .scoring import calculate_score, calculate_accuracy
 
 TEAM_NAME = "team15"
-User = get_user_model()
 
 
 def _request_user(request):
@@ -35,26 +33,8 @@ def _request_user(request):
     if raw_user is not None and getattr(raw_user, "is_authenticated", False):
         return raw_user
 
-    cookies = getattr(request, "COOKIES", None) or getattr(raw_request, "COOKIES", {}) or {}
-    access_token = cookies.get("access_token")
-    if not access_token:
-        return None
-
-    try:
-        payload = decode_token(access_token)
-        if payload.get("type") != "access":
-            return None
-        user_id = payload.get("sub")
-        tv = payload.get("tv")
-        user = User.objects.filter(id=user_id, is_active=True).first()
-        if not user:
-            return None
-        if user.token_version != tv:
-            return None
-        return user
-    except Exception:
-        return None
-    return None
+    # Same per-request context the core middleware uses, so the token is decoded at most once.
+    return get_auth_context(request).resolve()
 
 
 def _get_user_id(request, data=None):
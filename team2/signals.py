@@ -1,39 +1,43 @@
-from django.db.models.signals import post_save
-from django.dispatch import receiver
-from core.models import User
+from django.db import IntegrityError, transaction
+
+from core.outbox import register_user_event_handler
 from .models import UserDetails
 
 
-@receiver(post_save, sender=User)
-def create_user_details(sender, instance, created, using=None, **kwargs):
-    
-    if created:
-        try:
-            UserDetails.objects.using('team2').get_or_create(
-                user_id=instance.id,
-                defaults={
-                    'email': instance.email,
-                    'role': 'student',
-                }
-            )
-        except Exception as e:
-            print(f"خطا در ایجاد UserDetails: {str(e)}")
+def apply_user_events(events):
+    """
+    Mirror core users into team2 UserDetails (outbox handler, see core.outbox).
 
+    New users get a student profile; existing profiles only have their email updated,
+    so roles assigned in team2 are kept.
+    """
+    latest = {}
+    for e in events:
+        latest[e.user_id] = e.email
 
-@receiver(post_save, sender=User)
-def update_user_details(sender, instance, created, using=None, **kwargs):
-    if not created:
-        try:
-            user_details = UserDetails.objects.using('team2').get(user_id=instance.id)
-            if user_details.email != instance.email:
-                user_details.email = instance.email
-                user_details.save(using='team2')
-        except UserDetails.DoesNotExist:
+    rows = [UserDetails(user_id=user_id, email=email, role='student') for user_id, email in latest.items()]
+    try:
+        with transaction.atomic(using='team2'):
+            UserDetails.objects.using('team2').bulk_create(
+                rows,
+                update_conflicts=True,
+                unique_fields=['user_id'],
+                update_fields=['email', 'updated_at'],
+            )
+    except IntegrityError:
+        # e.g. an email already owned by another profile: apply what we can, one by one.
+        for row in rows:
             try:
-                UserDetails.objects.using('team2').create(
-                    user_id=instance.id,
-                    email=instance.email,
-                    role='student'
-                )
-            except Exception:
-                pass
+                with transaction.atomic(using='team2'):
+                    details, created = UserDetails.objects.using('team2').get_or_create(
+                        user_id=row.user_id,
+                        defaults={'email': row.email, 'role': 'student'},
+                    )
+                    if not created and details.email != row.email:
+                        details.email = row.email
+                        details.save(using='team2', update_fields=['email', 'updated_at'])
+            except IntegrityError as e:
+                print(f"خطا در همگام‌سازی UserDetails: {str(e)}")
+
+
+register_user_event_handler('team2', apply_user_events)